@@ -0,0 +1,211 @@
+# =======================================================================
+#
+#   ⏱️ BENCHMARK SKALA QC (DATA SINTETIS) ⏱️
+#
+# =======================================================================
+# Mengukur waktu & memori puncak setiap check, setiap modul, dan I/O pada
+# beberapa ukuran data (10 ribu s/d 50 juta baris), lalu menyimpan hasilnya
+# ke JSON agar regresi antar versi terlihat.
+#
+#   python benchmark_qc.py                               # ukuran default
+#   python benchmark_qc.py --ukuran 10000 1000000 50000000
+#   python benchmark_qc.py --bandingkan benchmark_hasil/benchmark_lama.json
+
+import os
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tempfile
+import tracemalloc
+
+import pandas as pd
+import numpy as np
+
+from qc_sintetis import buat_data_aws
+from qc_hujan import run_qc_hujan
+from qc_tekanan import run_qc_tekanan
+from qc_radiasi import run_qc_radiasi
+from qc_registry import PARAMETERS, CHECKS, KonteksQC, tabel_prioritas, resolusi_flag
+from qc_io import baca_data, tulis_data
+from qc_metrik import senyap
+from qc_waktu import fitur_waktu
+
+# ==================================================
+#   --- ⚙️ KONFIGURASI BENCHMARK ---
+# ==================================================
+UKURAN_DEFAULT = [10_000, 100_000, 1_000_000]
+OUTPUT_DIR = 'benchmark_hasil'
+SEED = 42
+
+# Excel dibatasi 1.048.576 baris per sheet dan sangat lambat -> hanya ukuran kecil
+EXCEL_MAKS_BARIS = 100_000
+FORMAT_IO = ['parquet', 'feather', 'csv', 'excel']
+EKSTENSI_IO = {'parquet': '.parquet', 'feather': '.feather', 'csv': '.csv', 'excel': '.xlsx'}
+
+MODUL = [('hujan', run_qc_hujan), ('tekanan', run_qc_tekanan), ('radiasi', run_qc_radiasi)]
+
+
+# ==================================================
+#   --- 1️⃣ Alat Ukur ---
+# ==================================================
+
+def ukur(fn, *args, **kwargs):
+    """Menjalankan fn sekali; mengembalikan (hasil, detik, memori_puncak_MB). Log QC dimatikan."""
+    tracemalloc.start()
+    mulai = time.perf_counter()
+    with senyap():
+        hasil = fn(*args, **kwargs)
+    detik = time.perf_counter() - mulai
+    _, puncak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return hasil, detik, puncak / 1e6
+
+
+def catat(hasil, kategori, nama, n_baris, detik, memori_mb):
+    hasil.append({
+        'kategori': kategori, 'nama': nama, 'n_baris': n_baris,
+        'detik': round(detik, 6),
+        'baris_per_detik': round(n_baris / detik) if detik > 0 else None,
+        'memori_puncak_mb': round(memori_mb, 2),
+    })
+    print(f"  {kategori:<7} {nama:<28} {n_baris:>11,d} baris  {detik:9.3f} s  "
+          f"{n_baris / max(detik, 1e-9):>13,.0f} baris/s  {memori_mb:9.1f} MB")
+
+
+# ==================================================
+#   --- 2️⃣ Skenario ---
+# ==================================================
+
+def bench_checks(df, hasil):
+    """Waktu setiap check terdaftar (ke bitmask, seperti runner registry) dan resolusi flag-nya."""
+    n = len(df)
+    cache = {}
+    waktu, detik, mem = ukur(fitur_waktu, df['Tanggal'], cache)
+    catat(hasil, 'check', 'fitur_waktu', n, detik, mem)
+    for nama_param, param in PARAMETERS.items():
+        nilai = pd.to_numeric(df[param['kolom']], errors='coerce').to_numpy(dtype='float64')
+        if param['siapkan'] is not None:
+            (series, masks), detik, mem = ukur(param['siapkan'], nilai, waktu)
+            catat(hasil, 'check', f"{nama_param}.siapkan", n, detik, mem)
+        else:
+            series, masks = {'nilai': nilai}, {}
+        ctx = KonteksQC(param['kolom'], waktu, series, masks, cache=cache)
+        ctx.tabel = tabel_prioritas(param['checks'])
+        for i, cfg in enumerate(param['checks']):
+            ctx.sebelum = (1 << i) - 1
+            cond, detik, mem = ukur(CHECKS[cfg['check']], ctx, cfg)
+            ctx.bits[cond] |= 1 << i
+            catat(hasil, 'check', f"{nama_param}.{cfg['check']}", n, detik, mem)
+        _, detik, mem = ukur(resolusi_flag, ctx.bits, param['checks'], ctx.flags)
+        catat(hasil, 'check', f"{nama_param}.resolusi_flag", n, detik, mem)
+
+
+def bench_modul(df, hasil):
+    n = len(df)
+    total = 0.0
+    for nama, fn in MODUL:
+        _, detik, mem = ukur(fn, df.copy())
+        total += detik
+        catat(hasil, 'modul', nama, n, detik, mem)
+    catat(hasil, 'modul', 'total (3 modul)', n, total, 0.0)
+
+
+def bench_io(df, hasil, folder):
+    n = len(df)
+    for fmt in FORMAT_IO:
+        if fmt == 'excel' and n > EXCEL_MAKS_BARIS:
+            continue
+        path = os.path.join(folder, f"bench{EKSTENSI_IO[fmt]}")
+        try:
+            _, detik, mem = ukur(tulis_data, df.copy(), path, fmt)
+            catat(hasil, 'io', f"tulis.{fmt}", n, detik, mem)
+            _, detik, mem = ukur(baca_data, path, fmt)
+            catat(hasil, 'io', f"baca.{fmt}", n, detik, mem)
+        except ImportError as e:
+            print(f"  ⚠️ Lewati {fmt}: {e}")
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+# ==================================================
+#   --- 3️⃣ Simpan & Bandingkan ---
+# ==================================================
+
+def info_versi():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'commit': commit or None,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'mesin': platform.platform(),
+        'waktu': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def simpan_hasil(hasil, output_dir=OUTPUT_DIR):
+    os.makedirs(output_dir, exist_ok=True)
+    versi = info_versi()
+    nama = f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}_{versi['commit'] or 'nogit'}.json"
+    path = os.path.join(output_dir, nama)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'versi': versi, 'hasil': hasil}, f, indent=2)
+    return path
+
+
+def bandingkan(hasil, path_lama):
+    """Mencetak rasio throughput (baru / lama) untuk skenario yang sama."""
+    with open(path_lama, encoding='utf-8') as f:
+        lama = json.load(f)
+    indeks = {(h['kategori'], h['nama'], h['n_baris']): h for h in lama['hasil']}
+    print("\n" + "=" * 70)
+    print(f"📈 Perbandingan dengan {path_lama} (commit {lama['versi'].get('commit')})")
+    print("=" * 70)
+    for h in hasil:
+        ref = indeks.get((h['kategori'], h['nama'], h['n_baris']))
+        if not ref or not ref['baris_per_detik'] or not h['baris_per_detik']:
+            continue
+        rasio = h['baris_per_detik'] / ref['baris_per_detik']
+        tanda = "⚠️ " if rasio < 0.8 else "   "
+        print(f"{tanda}{h['kategori']:<7} {h['nama']:<28} {h['n_baris']:>11,d}  x{rasio:6.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark skala QC dengan data AWS sintetis.")
+    parser.add_argument('--ukuran', type=int, nargs='+', default=UKURAN_DEFAULT,
+                        help="Jumlah baris yang diuji (default: 10rb, 100rb, 1jt).")
+    parser.add_argument('--tanpa-io', action='store_true', help="Lewati benchmark baca/tulis file.")
+    parser.add_argument('--tanpa-check', action='store_true', help="Lewati benchmark per check.")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR)
+    parser.add_argument('--bandingkan', metavar='JSON', help="File hasil benchmark sebelumnya.")
+    args = parser.parse_args(argv)
+
+    hasil = []
+    for n in args.ukuran:
+        print(f"\n🧪 Data sintetis {n:,d} baris...")
+        df, detik, mem = ukur(buat_data_aws, n, seed=SEED)
+        catat(hasil, 'data', 'buat_data_aws', n, detik, mem)
+        if not args.tanpa_check:
+            bench_checks(df, hasil)
+        bench_modul(df, hasil)
+        if not args.tanpa_io:
+            with tempfile.TemporaryDirectory() as folder:
+                bench_io(df, hasil, folder)
+        del df
+
+    path = simpan_hasil(hasil, args.output_dir)
+    print(f"\n💾 Hasil benchmark disimpan di: {path}")
+    if args.bandingkan:
+        bandingkan(hasil, args.bandingkan)
+    return hasil
+
+
+if __name__ == "__main__":
+    main()
@@ -5,135 +5,721 @@
 # =======================================================================
 
 import pandas as pd
-import sys 
+import sys
+import os
+import json
+import time
+import argparse
+import contextlib
+from dataclasses import dataclass, replace
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # Impor fungsi spesifik dari setiap file modul
 try:
     from qc_hujan import run_qc_hujan
+    from qc_radiasi import atur_lokasi, lokasi_stasiun
     from qc_tekanan import run_qc_tekanan
     from qc_radiasi import run_qc_radiasi
+    from qc_io import baca_data, tulis_data, deteksi_format, SUPPORTED_EXTENSIONS
+    from qc_sqlite import pisah_path, daftar_stasiun_sqlite
+    from qc_io import baca_data_per_chunk, PenulisBertahap
+    from qc_chunk import run_qc_per_chunk
+    from qc_cache import CacheQC, jalankan_qc_dengan_cache, CACHE_MAKS_MB
+    from qc_patch import patch_qc
+    from qc_arsip import ArsipQC, PenulisArsip
+    from qc_rekap import RekapQC, PenulisRekap, rekapkan
+    from qc_waktu import snap_grid
+    from qc_paralel import jalankan_modul_paralel, MODE_PARALEL
+    from qc_ambang import baca_tabel_ambang, atur_ambang, ambang_aktif
+    from qc_multi import run_qc_multi_stasiun, snap_grid_multi
+    from qc_common import KOLOM_STASIUN
+    from qc_registry import atur_bitmask
+    from qc_konsistensi import cek_konsistensi, atur_konsistensi, ringkasan_akhir
+    from qc_spasial import (baca_metadata_stasiun, atur_metadata_stasiun, metadata_aktif,
+                            lokasi_dari_metadata)
+    from qc_radiasi import LOKASI_STASIUN
+    from qc_metrik import (logger, atur_log, kumpulkan_metrik, ukur,
+                           profil_cprofile, LEVEL_LOG)
 except ImportError as e:
     print(f"❌ ERROR: Gagal mengimpor modul.")
     print("Pastikan file 'qc_hujan.py', 'qc_tekanan.py', dan 'qc_radiasi.py' berada di folder yang sama dengan 'main.py'.")
     print(f"Detail Error: {e}")
-    sys.exit() 
+    sys.exit()
 
 # ==================================================
 #   --- 📂 KONFIGURASI FILE I/O ---
 # ==================================================
 
-# File input (rr, pp_air, sr_avg)
+# File input (rr, pp_air, sr_avg). Format dipilih dari ekstensi:
+# .xlsx/.xls (Excel), .parquet/.pq, .feather/.arrow, .csv
 INPUT_FILE = 'Data_AWS_Gabungan_QC_2.xlsx'
 
-# File output 
+# File output
 OUTPUT_FILE = 'hasil_qc_data_lengkap(Tangsel).xlsx'
 
+# --- Mode batch (banyak stasiun) ---
+# Database SQLite bukan file stasiun (sumber batch SQLite = semua stasiun di dalamnya)
+BATCH_INPUT_EXTENSIONS = tuple(e for e in SUPPORTED_EXTENSIONS if deteksi_format(f"x{e}") != 'sqlite')
+BATCH_OUTPUT_SUFFIX = '_qc'
+BATCH_OUTPUT_EXTENSION = '.xlsx'
+BATCH_MANIFEST_FILE = 'manifest_qc.json'
+# Output batch SQLite: semua stasiun di satu database (output_dir/BATCH_SQLITE_FILE)
+BATCH_SQLITE_FILE = 'hasil_qc.sqlite'
+BATCH_WORKERS = os.cpu_count() or 1
+# Level log di setiap worker: output konsol ratusan stasiun memperlambat batch
+BATCH_LOG_LEVEL = 'warning'
+
+# --- Mode chunk (arsip besar, out-of-core) ---
+# Jumlah baris per chunk; None = baca seluruh file sekaligus
+CHUNK_SIZE = None
+
+# --- Hemat memori ---
+# True = kolom ukur numerik disimpan float32 (setengah memori float64).
+# 'rr' sengaja tidak ikut: interval hujan adalah selisih nilai kumulatif, dan
+# pembulatan float32 (~1e-7) melebihi toleransi flat line hujan (1e-9).
+DOWNCAST_FLOAT32 = False
+FLOAT32_COLUMNS = ['pp_air', 'sr_avg']
+
+# --- Grid waktu ---
+# True = 'Tanggal' dibulatkan ke grid 10 menit dan timestamp yang hilang diisi
+# baris kosong, sehingga jendela QC (dalam baris) selalu sama dengan jendela waktu.
+GRID_10_MENIT = True
+
+# --- Log, laporan & profiling ---
+# Level log: 'debug', 'info', 'warning', 'error', 'senyap'
+LOG_LEVEL = 'info'
+# File laporan JSON (waktu, jumlah baris & flag per tahap/modul/check); None = tidak disimpan
+REPORT_FILE = None
+# File statistik cProfile; None = tanpa profiling
+PROFILE_FILE = None
+
+# ==================================================
+
+# --- Cache hasil QC per stasiun-hari ---
+# Folder cache; None = tanpa cache. Hari yang datanya (termasuk halo) dan
+# konfigurasi QC-nya tidak berubah memakai flag tersimpan.
+CACHE_DIR = None
+
+# --- Arsip flag append-only ---
+# Folder arsip memory-mapped per stasiun & parameter (qc_arsip); None = tidak
+# diarsipkan. Hasil QC yang lebih baru dari akhir arsip ditambahkan setiap run.
+ARSIP_DIR = None
+
+# --- Rekap harian per stasiun ---
+# Folder rekap (qc_rekap): satu file Parquet per stasiun berisi jumlah flag,
+# kelengkapan, dan total hujan per hari; None = tanpa rekap. Hari yang ada di
+# run menggantikan rekap lamanya.
+REKAP_DIR = None
+
+# --- Modul QC paralel ---
+# None = ketiga modul berurutan; 'thread' / 'process' = berjalan bersamaan
+# (masing-masing hanya membaca 'Tanggal' + kolomnya), hasil identik.
+PARALEL_MODUL = None
+
+# --- Tabel ambang per stasiun / bulan ---
+# File CSV/Excel (qc_ambang) yang menimpa threshold check per stasiun dan
+# (opsional) per bulan; None = threshold konfigurasi modul untuk semua stasiun.
+AMBANG_FILE = None
+
+# --- Metadata stasiun (koordinat & elevasi) ---
+# File CSV/Excel (stasiun, lintang, bujur, elevasi). Dipakai untuk lokasi QC
+# radiasi dan, pada input multi-stasiun, buddy check spasial antar stasiun
+# tetangga (qc_spasial). None = tanpa metadata.
+METADATA_STASIUN_FILE = None
+
+# --- Bitmask check (diagnosis) ---
+# True = output juga berisi kolom '<kolom>_qcbit' (uint16): bit ke-i menyala bila
+# check ke-i parameter itu gagal, termasuk kegagalan yang kalah prioritas di
+# kolom '*_flagging'. Kolom flag tidak berubah.
+SIMPAN_BITMASK = False
+
+# --- Konsistensi antar parameter ---
+# True = setelah modul QC, kombinasi hujan lebat saat radiasi penuh ditandai
+# Flag 7 dan periode logger mati dicatat (qc_konsistensi); False = flag modul apa adanya.
+CEK_KONSISTENSI = True
+
+
+
+@dataclass
+class PengaturanQC:
+    """
+    Pengaturan satu run QC (default = konstanta di atas), dibagi semua mode:
+    tunggal, chunk, patch, dan batch (dikirim utuh ke setiap worker).
+
+    `lokasi` = (lintang, bujur) untuk QC radiasi; None = dari LOKASI_STASIUN
+    (nama stasiun) atau lokasi default. `log_level` None = level yang sedang aktif.
+    """
+    input_format: str = None
+    output_format: str = None
+    ukuran_chunk: int = CHUNK_SIZE
+    float32: bool = DOWNCAST_FLOAT32
+    grid: bool = GRID_10_MENIT
+    cache_dir: str = CACHE_DIR
+    paralel: str = PARALEL_MODUL
+    arsip_dir: str = ARSIP_DIR
+    rekap_dir: str = REKAP_DIR
+    ambang_file: str = AMBANG_FILE
+    meta_file: str = METADATA_STASIUN_FILE
+    bitmask: bool = SIMPAN_BITMASK
+    konsistensi: bool = CEK_KONSISTENSI
+    lokasi: tuple = None
+    log_level: str = None
+    laporan_file: str = REPORT_FILE
+    profil_file: str = PROFILE_FILE
+
+    @classmethod
+    def dari_args(cls, args):
+        """Pengaturan dari hasil parse_args()."""
+        return cls(input_format=args.input_format, output_format=args.output_format,
+                   ukuran_chunk=args.chunk_size, float32=args.float32, grid=not args.tanpa_grid,
+                   cache_dir=args.cache, paralel=args.paralel_modul, arsip_dir=args.arsip,
+                   rekap_dir=args.rekap, ambang_file=args.ambang, meta_file=args.stasiun_meta,
+                   bitmask=args.bitmask, konsistensi=not args.tanpa_konsistensi, lokasi=args.lokasi,
+                   log_level=args.log_level, laporan_file=args.laporan, profil_file=args.profil)
+
+# Urutan modul QC: (judul, nama untuk log, fungsi, kolom flag)
+MODUL_QC = [
+    ("🌧️ 1. Menjalankan QC Curah Hujan (rr)...", "QC Curah Hujan", run_qc_hujan, 'rr_flagging'),
+    ("🌬️ 2. Menjalankan QC Tekanan Udara (pp_air)...", "QC Tekanan Udara", run_qc_tekanan, 'pp_air_flagging'),
+    ("☀️ 3. Menjalankan QC Radiasi Matahari (sr_avg)...", "QC Radiasi Matahari", run_qc_radiasi, 'sr_avg_flagging'),
+]
+
+
+# ==================================================
+#   --- 1️⃣ Tahapan Proses (dipakai mode tunggal & batch) ---
 # ==================================================
 
+def terapkan_metadata(meta_file):
+    """Membaca metadata stasiun: lokasi radiasi per stasiun + metadata aktif untuk buddy check."""
+    meta = baca_metadata_stasiun(meta_file) if meta_file else None
+    if meta is not None:
+        LOKASI_STASIUN.update(lokasi_dari_metadata(meta))
+    atur_metadata_stasiun(meta)
+
+def terapkan_pengaturan(pengaturan, stasiun):
+    """
+    Menerapkan pengaturan per proses (log, metadata, lokasi radiasi, bitmask,
+    tahap konsistensi, tabel ambang) untuk `stasiun`.
+    """
+    if pengaturan.log_level is not None:
+        atur_log(pengaturan.log_level)
+    terapkan_metadata(pengaturan.meta_file)
+    atur_lokasi(*(pengaturan.lokasi or lokasi_stasiun(stasiun)))
+    atur_bitmask(pengaturan.bitmask)
+    atur_konsistensi(pengaturan.konsistensi)
+    atur_ambang(baca_tabel_ambang(pengaturan.ambang_file) if pengaturan.ambang_file else None, stasiun)
+
+def nama_stasiun(path):
+    """Nama stasiun dari path: 'db.sqlite#Tangsel' -> 'Tangsel', 'data/Tangsel.xlsx' -> 'Tangsel'."""
+    file, stasiun = pisah_path(path)
+    return stasiun or os.path.splitext(os.path.basename(file))[0]
+
+def baca_input(input_file, fmt=None, tanpa_flag=False):
+    """
+    Membaca file input (Excel/Parquet/Feather/CSV/SQLite) menjadi DataFrame.
+    `tanpa_flag`: dari SQLite hanya kolom data yang dibaca (flag dihitung ulang).
+    """
+    return baca_data(input_file, fmt, tanpa_flag)
+
+def siapkan_data(df, float32=DOWNCAST_FLOAT32, grid=GRID_10_MENIT, isi_gap=True, setelah=None):
+    """
+    Membersihkan nama kolom, mengonversi 'Tanggal' ke datetime (UTC),
+    membuang tanggal tidak valid, lalu mengurutkan berdasarkan 'Tanggal'
+    (frame multi-stasiun dengan kolom 'stasiun': per stasiun lalu 'Tanggal').
+    Jika `float32`, kolom ukur yang sudah numerik diturunkan ke float32.
+    Jika `grid`, 'Tanggal' dibulatkan ke grid 10 menit dan (jika `isi_gap`)
+    timestamp yang hilang diisi baris kosong; `setelah` = timestamp terakhir
+    chunk sebelumnya (mode chunk).
+    """
+    # Bersihkan nama kolom (menghapus spasi, dll.)
+    df.columns = [c.strip().replace(' ', '_') for c in df.columns]
+
+    # Konversi 'Tanggal' ke tipe datetime
+    if 'Tanggal' not in df.columns:
+        raise KeyError("Kolom 'Tanggal' tidak ditemukan di file input.")
+
+    df['Tanggal'] = pd.to_datetime(df.get('Tanggal'), errors='coerce', utc=True)
+
+    # Hapus baris dengan Tanggal yang tidak valid
+    initial_rows = len(df)
+    df.dropna(subset=['Tanggal'], inplace=True)
+    if initial_rows > len(df):
+        logger.info(f"  - Membuang {initial_rows - len(df)} baris dengan tanggal tidak valid.")
+
+    if float32:
+        for col in FLOAT32_COLUMNS:
+            if col in df.columns and pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = df[col].astype('float32')
+
+    # Urutkan berdasarkan 'Tanggal' (per stasiun pada frame multi-stasiun)
+    multi = KOLOM_STASIUN in df.columns
+    if multi:
+        df[KOLOM_STASIUN] = df[KOLOM_STASIUN].astype(str)
+        df = df.sort_values([KOLOM_STASIUN, 'Tanggal'], kind='stable').reset_index(drop=True)
+    else:
+        df = df.sort_values('Tanggal').reset_index(drop=True)
+
+    if grid:
+        with ukur('tahap', 'grid', len(df)) as catatan:
+            if multi:
+                df, info = snap_grid_multi(df, isi_gap=isi_gap)
+            else:
+                df, info = snap_grid(df, isi_gap=isi_gap, setelah=setelah)
+            catatan.update(info)
+        if info['duplikat_dibuang']:
+            logger.info(f"  - Membuang {info['duplikat_dibuang']} baris dengan timestamp ganda (grid 10 menit).")
+        if info['baris_disisipkan']:
+            logger.info(f"  - Mengisi {info['jumlah_gap']} gap waktu dengan {info['baris_disisipkan']} baris kosong "
+                        f"(gap terpanjang {info['gap_terpanjang_menit']} menit).")
+    return df
 
-def main():
+def jalankan_semua_qc(df):
+    """
+    Menjalankan ketiga modul QC secara berurutan. Modul yang gagal dilewati.
+    Waktu & jumlah flag tiap modul dicatat ke metrik (kategori 'modul').
+    Fitur waktu dari 'Tanggal' dihitung sekali dan dibagi ke semua modul (cache bersama).
+    Setelah modul, tahap konsistensi antar parameter (qc_konsistensi) dijalankan sekali;
+    ringkasan & jumlah flag tiap modul dihitung dari flag akhir setelah tahap itu.
+    """
+    cache, catatan_modul = {}, {}
+    for judul, selesai, fn, flag_kolom in MODUL_QC:
+        logger.info("\n" + "=" * 50)
+        logger.info(judul)
+        logger.info("=" * 50)
+        with ukur('modul', fn.__name__, len(df)) as catatan:
+            try:
+                df = fn(df, cache=cache, ringkasan=False)
+                catatan_modul[flag_kolom] = catatan
+                logger.info(f"\n✅ {selesai} Selesai.")
+            except Exception as e:
+                catatan['error'] = f"{type(e).__name__}: {e}"
+                logger.error(f"❌ ERROR saat menjalankan {selesai}: {e}")
+
+    df = cek_konsistensi(df, cache)
+    ringkasan_akhir(df, catatan_modul)
+    return df
+
+def jalankan_qc(df, stasiun, cache_dir=CACHE_DIR, paralel=PARALEL_MODUL):
+    """
+    QC lengkap: lewat cache stasiun-hari jika `cache_dir` diisi, selain itu
+    jalankan_semua_qc (atau jalankan_modul_paralel jika `paralel` diisi).
+    Frame multi-stasiun (kolom 'stasiun') di-QC sekaligus dengan tabel ambang aktif.
+    """
+    if KOLOM_STASIUN in df.columns:
+        if cache_dir or paralel:
+            logger.warning("⚠️ --cache / --paralel-modul tidak berlaku untuk frame multi-stasiun.")
+        return run_qc_multi_stasiun(df, ambang_aktif()[0], metadata_aktif())
+    if not cache_dir:
+        if paralel:
+            return jalankan_modul_paralel(df, paralel)
+        return jalankan_semua_qc(df)
+    return jalankan_qc_dengan_cache(df, stasiun, CacheQC(cache_dir, CACHE_MAKS_MB))
+
+def simpan_output(df, output_file, fmt=None, arsip_dir=ARSIP_DIR, stasiun=None, rekap_dir=REKAP_DIR):
+    """
+    Menyimpan DataFrame hasil QC. Untuk Excel zona waktu 'Tanggal' dilepas (di
+    salinan yang ditulis, df tidak diubah);
+    Parquet/Feather/CSV menyimpan 'Tanggal' lengkap dengan zona waktunya.
+    Jika `arsip_dir` diisi, baris baru juga ditambahkan ke arsip flag `stasiun`.
+    Jika `rekap_dir` diisi, rekap harian hari-hari di df diperbarui.
+    """
+    fmt = deteksi_format(output_file, fmt)
+    logger.info(f"  - Menyimpan DataFrame ke: {output_file} ({fmt})...")
+    # Frame multi-stasiun: stasiun tiap baris dari kolom 'stasiun'
+    tulis_data(df, output_file, fmt, None if KOLOM_STASIUN in df.columns else stasiun)
+    if arsip_dir:
+        arsipkan(df, stasiun, arsip_dir)
+    if rekap_dir:
+        rekapkan(df, stasiun, rekap_dir)
+
+def arsipkan(df, stasiun, arsip_dir):
+    """Menambahkan hasil QC ke arsip flag append-only `arsip_dir` (per stasiun pada frame multi-stasiun)."""
+    arsip = ArsipQC(arsip_dir)
+    if KOLOM_STASIUN in df.columns:
+        bagian = [(str(s), grup.drop(columns=KOLOM_STASIUN)) for s, grup in df.groupby(KOLOM_STASIUN, sort=False)]
+    else:
+        bagian = [(stasiun, df)]
+    for stasiun, grup in bagian:
+        ditambah = arsip.tambah(stasiun, grup)
+        logger.info(f"  - Arsip '{stasiun}': " + ", ".join(f"{p} +{n}" for p, n in ditambah.items()) + " baris.")
+
+def tolak_multi_stasiun(df, mode):
+    """Mode chunk & patch memproses satu stasiun; frame multi-stasiun ditolak dengan pesan jelas."""
+    if KOLOM_STASIUN in df.columns:
+        raise ValueError(f"Mode {mode} hanya untuk satu stasiun; gunakan 'db.sqlite#STASIUN' atau --batch.")
+
+def proses_per_chunk(input_file, output_file, pengaturan, stasiun=None):
+    """
+    Membaca, QC, dan menulis secara bertahap per `pengaturan.ukuran_chunk` baris.
+    Input harus sudah berurutan waktu antar chunk. Mengembalikan jumlah baris.
+    Jika `arsip_dir` diisi, setiap chunk final juga ditambahkan ke arsip flag;
+    jika `rekap_dir` diisi, rekap harian disimpan per batch hari (lihat PenulisRekap).
+    """
+    p = pengaturan
+    logger.info(f"  - Mode chunk: {p.ukuran_chunk} baris per chunk.")
+
+    def chunk_siap():
+        # Gap di antara dua chunk juga diisi: grid dilanjutkan dari timestamp terakhir
+        terakhir = None
+        for chunk in baca_data_per_chunk(input_file, p.ukuran_chunk, p.input_format, tanpa_flag=True):
+            tolak_multi_stasiun(chunk, 'chunk')
+            chunk = siapkan_data(chunk, p.float32, p.grid, setelah=terakhir)
+            if not chunk.empty:
+                terakhir = chunk['Tanggal'].iloc[-1]
+            yield chunk
+
+    with PenulisBertahap(output_file, p.output_format, stasiun) as penulis:
+        if p.arsip_dir:
+            penulis = PenulisArsip(ArsipQC(p.arsip_dir), stasiun, teruskan=penulis)
+        if p.rekap_dir:
+            penulis = PenulisRekap(RekapQC(p.rekap_dir), stasiun, teruskan=penulis)
+        jumlah = run_qc_per_chunk(chunk_siap(), penulis)
+        if p.rekap_dir:
+            penulis.tutup()
+        return jumlah
+
+def proses_patch(input_file, patch_file, output_file, pengaturan, stasiun=None):
+    """
+    Mode patch: menerapkan data susulan/koreksi `patch_file` ke file hasil QC
+    `input_file` dan hanya mengevaluasi ulang rentang yang terdampak.
+    Mengembalikan jumlah baris hasil. Arsip append-only hanya menerima baris
+    yang lebih baru dari akhir arsip (koreksi baris lama tidak diarsipkan).
+    """
+    p = pengaturan
+    with ukur('tahap', 'baca'):
+        df_qc = siapkan_data(baca_input(input_file, p.input_format), p.float32, p.grid)
+        # Baris patch hanya dibulatkan ke grid (tanpa mengisi gap di antaranya)
+        df_patch = siapkan_data(baca_input(patch_file), p.float32, p.grid, isi_gap=False)
+    tolak_multi_stasiun(df_qc, 'patch')
+    logger.info(f"  - {len(df_patch)} baris patch untuk {len(df_qc)} baris hasil QC.")
+    with ukur('tahap', 'patch', len(df_qc)):
+        df, _ = patch_qc(df_qc, df_patch)
+    with ukur('tahap', 'simpan', len(df)):
+        simpan_output(df, output_file, p.output_format, p.arsip_dir, stasiun, p.rekap_dir)
+    return len(df)
+
+
+# ==================================================
+#   --- 2️⃣ Mode Batch (Banyak Stasiun, Paralel) ---
+# ==================================================
+
+def daftar_file_stasiun(sumber):
+    """
+    Mengembalikan daftar (stasiun, path_input) dari sebuah folder atau file manifest.
+
+    - Folder  : semua file dengan ekstensi BATCH_INPUT_EXTENSIONS, nama stasiun = nama file.
+    - Manifest: file teks, satu stasiun per baris dengan format `path` atau `stasiun,path`.
+      Baris kosong dan baris diawali '#' diabaikan. Path relatif dihitung dari lokasi manifest.
+    - SQLite  : semua stasiun di database, path input 'db.sqlite#stasiun'.
+    """
+    if os.path.isdir(sumber):
+        daftar = []
+        for nama in sorted(os.listdir(sumber)):
+            if nama.lower().endswith(BATCH_INPUT_EXTENSIONS) and not nama.startswith('~$'):
+                daftar.append((os.path.splitext(nama)[0], os.path.join(sumber, nama)))
+        return daftar
+    if sumber.lower().endswith(tuple(e for e in SUPPORTED_EXTENSIONS if e not in BATCH_INPUT_EXTENSIONS)):
+        return [(stasiun, f"{sumber}#{stasiun}") for stasiun in daftar_stasiun_sqlite(sumber)]
+
+    base_dir = os.path.dirname(os.path.abspath(sumber))
+    daftar = []
+    with open(sumber, encoding='utf-8') as f:
+        for baris in f:
+            baris = baris.strip()
+            if not baris or baris.startswith('#'):
+                continue
+            if ',' in baris:
+                stasiun, path = [b.strip() for b in baris.split(',', 1)]
+            else:
+                path = baris
+                stasiun = nama_stasiun(path)
+            if not os.path.isabs(path):
+                path = os.path.join(base_dir, path)
+            daftar.append((stasiun, path))
+    return daftar
+
+def proses_stasiun(stasiun, input_file, output_file, pengaturan):
+    """
+    Menjalankan baca -> siapkan -> QC -> simpan untuk satu stasiun.
+    Tidak pernah melempar exception: kegagalan dicatat pada hasil (status 'gagal').
+    Metrik run (waktu per tahap/modul/check) disertakan pada hasil['metrik'].
+    """
+    p = pengaturan
+    mulai = time.time()
+    hasil = {
+        'stasiun': stasiun, 'input': input_file, 'output': output_file,
+        'status': 'gagal', 'jumlah_baris': 0, 'error': None,
+    }
+    with kumpulkan_metrik(stasiun) as metrik:
+        try:
+            terapkan_pengaturan(p, stasiun)
+            if p.ukuran_chunk:
+                with ukur('tahap', 'chunk'):
+                    hasil['jumlah_baris'] = proses_per_chunk(input_file, output_file, p, stasiun)
+            else:
+                with ukur('tahap', 'baca'):
+                    df = baca_input(input_file, p.input_format, tanpa_flag=True)
+                with ukur('tahap', 'siapkan', len(df)):
+                    df = siapkan_data(df, p.float32, p.grid)
+                hasil['jumlah_baris'] = len(df)
+                with ukur('tahap', 'qc', len(df)):
+                    df = jalankan_qc(df, stasiun, p.cache_dir, p.paralel)
+                with ukur('tahap', 'simpan', len(df)):
+                    simpan_output(df, output_file, p.output_format, p.arsip_dir, stasiun, p.rekap_dir)
+            hasil['status'] = 'sukses'
+        except Exception as e:
+            hasil['error'] = f"{type(e).__name__}: {e}"
+    hasil['durasi_detik'] = round(time.time() - mulai, 3)
+    hasil['metrik'] = {'ringkasan_detik': metrik.ringkasan(), 'catatan': metrik.catatan}
+    return hasil
+
+def run_batch(sumber, output_dir, pengaturan=None, *, workers=BATCH_WORKERS, manifest_file=BATCH_MANIFEST_FILE,
+              output_extension=BATCH_OUTPUT_EXTENSION):
+    """
+    Menjalankan QC untuk banyak stasiun secara paralel (process pool).
+    Satu file output per stasiun ditulis ke `output_dir`, ditambah satu
+    manifest JSON berisi status setiap stasiun. Stasiun yang gagal tidak
+    menghentikan batch. `pengaturan` (PengaturanQC) dikirim ke setiap worker:
+    log_level None = BATCH_LOG_LEVEL; setiap worker membaca tabel ambang
+    sekali dan memakai ambang stasiunnya. `pengaturan.lokasi` diabaikan
+    (lokasi radiasi per stasiun dari LOKASI_STASIUN / metadata).
+    """
+    pengaturan = pengaturan or PengaturanQC()
+    pengaturan = replace(pengaturan, lokasi=None, log_level=pengaturan.log_level or BATCH_LOG_LEVEL)
+    daftar = daftar_file_stasiun(sumber)
+    os.makedirs(output_dir, exist_ok=True)
+    logger.info(f"\n📦 Mode batch: {len(daftar)} stasiun, {workers} worker.")
+
+    mulai = time.time()
+    hasil_semua = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for stasiun, input_file in daftar:
+            if deteksi_format(f"x{output_extension}") == 'sqlite':
+                output_file = f"{os.path.join(output_dir, BATCH_SQLITE_FILE)}#{stasiun}"
+            else:
+                output_file = os.path.join(output_dir, f"{stasiun}{BATCH_OUTPUT_SUFFIX}{output_extension}")
+            future = executor.submit(proses_stasiun, stasiun, input_file, output_file,
+                                     replace(pengaturan, output_format=None))
+            futures[future] = (stasiun, input_file, output_file)
+
+        for future in as_completed(futures):
+            stasiun, input_file, output_file = futures[future]
+            try:
+                hasil = future.result()
+            except Exception as e:
+                # Worker mati (mis. kehabisan memori) -> tetap dicatat sebagai gagal
+                hasil = {
+                    'stasiun': stasiun, 'input': input_file, 'output': output_file,
+                    'status': 'gagal', 'jumlah_baris': 0,
+                    'error': f"{type(e).__name__}: {e}", 'durasi_detik': None,
+                }
+            simbol = "✅" if hasil['status'] == 'sukses' else "❌"
+            logger.info(f"  {simbol} {stasiun}: {hasil['status']} ({hasil['durasi_detik']} s)")
+            hasil_semua.append(hasil)
+
+    hasil_semua.sort(key=lambda h: h['stasiun'])
+    jumlah_sukses = sum(h['status'] == 'sukses' for h in hasil_semua)
+    manifest = {
+        'sumber': sumber,
+        'output_dir': output_dir,
+        'workers': workers,
+        'jumlah_stasiun': len(hasil_semua),
+        'jumlah_sukses': jumlah_sukses,
+        'jumlah_gagal': len(hasil_semua) - jumlah_sukses,
+        'durasi_detik': round(time.time() - mulai, 3),
+        'stasiun': hasil_semua,
+    }
+    manifest_path = os.path.join(output_dir, manifest_file)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    logger.info(f"\n🎉 Batch selesai: {jumlah_sukses}/{len(hasil_semua)} stasiun sukses.")
+    logger.info(f"Manifest disimpan di: {manifest_path}")
+    return manifest
+
+
+# ==================================================
+#   --- 3️⃣ Mode Tunggal (Satu File) ---
+# ==================================================
+
+def main(input_file=INPUT_FILE, output_file=OUTPUT_FILE, pengaturan=None, *, patch_file=None):
     """
     Fungsi utama untuk menjalankan semua skrip QC secara berurutan
-    pada satu file.
+    pada satu file dengan `pengaturan` (PengaturanQC; None = konstanta
+    modul). Mengembalikan laporan metrik run (dict); jika
+    `pengaturan.laporan_file` diisi, laporan juga disimpan sebagai JSON. Jika
+    `pengaturan.profil_file` diisi, run dibungkus cProfile dan statistiknya disimpan.
+    Jika `patch_file` diisi, `input_file` adalah hasil QC sebelumnya (mode patch).
+    Input multi-stasiun (kolom 'stasiun', mis. 'db.sqlite' tanpa '#') memakai
+    ambang dan metadata tiap stasiunnya (buddy check spasial).
     """
-    print("==================================================")
-    print("🚀 MEMULAI PROSES QUALITY CONTROL (QC) DATA AWS 🚀")
-    print("==================================================")
-    
+    p = pengaturan or PengaturanQC()
+    stasiun = nama_stasiun(input_file)
+    terapkan_pengaturan(p, stasiun)
+    profil = profil_cprofile(p.profil_file) if p.profil_file else contextlib.nullcontext()
+    with kumpulkan_metrik(input_file) as metrik, profil:
+        if patch_file:
+            jalankan_patch(input_file, patch_file, output_file, p)
+        else:
+            jalankan_tunggal(input_file, output_file, p)
+
+    laporan = metrik.laporan()
+    if p.laporan_file:
+        metrik.simpan_json(p.laporan_file)
+        logger.info(f"📈 Laporan metrik disimpan di: {p.laporan_file}")
+    return laporan
+
+
+def jalankan_patch(input_file, patch_file, output_file, pengaturan):
+    """Mode patch satu file dengan pesan konsol seperti mode tunggal."""
+    logger.info("==================================================")
+    logger.info("🩹 MENERAPKAN DATA SUSULAN/KOREKSI KE HASIL QC 🩹")
+    logger.info("==================================================")
+    try:
+        logger.info(f"\n📥 Hasil QC: {input_file} | Patch: {patch_file}...")
+        stasiun = nama_stasiun(input_file)
+        jumlah = proses_patch(input_file, patch_file, output_file, pengaturan, stasiun)
+        logger.info(f"\n🎉 PATCH SELESAI ({jumlah} baris).")
+        logger.info(f"File hasil disimpan di: {output_file}")
+    except FileNotFoundError as e:
+        logger.error(f"❌ ERROR: File tidak ditemukan: {e.filename}")
+    except Exception as e:
+        logger.error(f"❌ ERROR saat menerapkan patch: {e}")
+
+
+def jalankan_tunggal(input_file, output_file, pengaturan):
+    """Baca -> siapkan -> QC -> simpan satu file, dengan waktu tiap tahap dicatat ke metrik."""
+    p = pengaturan
+    logger.info("==================================================")
+    logger.info("🚀 MEMULAI PROSES QUALITY CONTROL (QC) DATA AWS 🚀")
+    logger.info("==================================================")
+    stasiun = nama_stasiun(input_file)
+
+    if p.ukuran_chunk:
+        try:
+            logger.info(f"\n📥 Memproses file input per chunk: {input_file}...")
+            with ukur('tahap', 'chunk'):
+                jumlah = proses_per_chunk(input_file, output_file, p, stasiun)
+            logger.info(f"\n🎉 SEMUA PROSES QC TELAH SELESAI DIJALANKAN ({jumlah} baris).")
+            logger.info(f"File hasil disimpan di: {output_file}")
+        except FileNotFoundError:
+            logger.error(f"❌ ERROR: File input '{input_file}' tidak ditemukan.")
+        except Exception as e:
+            logger.error(f"❌ ERROR saat memproses per chunk: {e}")
+        return
+
     # --- 1. Membaca File Input ---
     try:
-        print(f"\n📥 Membaca file input tunggal: {INPUT_FILE}...")
-        df = pd.read_excel(INPUT_FILE, engine="openpyxl")
-        print(f"✅ Berhasil membaca {len(df)} baris data.")
+        logger.info(f"\n📥 Membaca file input tunggal: {input_file}...")
+        with ukur('tahap', 'baca'):
+            df = baca_input(input_file, p.input_format, tanpa_flag=True)
+        logger.info(f"✅ Berhasil membaca {len(df)} baris data.")
     except FileNotFoundError:
-        print(f"❌ ERROR: File input '{INPUT_FILE}' tidak ditemukan.")
-        print("Pastikan nama file sudah benar dan file ada di folder yang sama.")
-        return 
+        logger.error(f"❌ ERROR: File input '{input_file}' tidak ditemukan.")
+        logger.error("Pastikan nama file sudah benar dan file ada di folder yang sama.")
+        return
     except Exception as e:
-        print(f"❌ ERROR saat membaca file Excel: {e}")
-        return 
-    
+        logger.error(f"❌ ERROR saat membaca file input: {e}")
+        return
+
     # --- 2. Pembersihan & Persiapan Data ---
-    print("\n🔄 Melakukan pembersihan dan persiapan data awal...")
+    logger.info("\n🔄 Melakukan pembersihan dan persiapan data awal...")
     try:
-        # Bersihkan nama kolom (menghapus spasi, dll.)
-        df.columns = [c.strip().replace(' ', '_') for c in df.columns]
-        
-        # Konversi 'Tanggal' ke tipe datetime
-        if 'Tanggal' not in df.columns:
-            print("❌ ERROR: Kolom 'Tanggal' tidak ditemukan di file input.")
-            return
-            
-        df['Tanggal'] = pd.to_datetime(df.get('Tanggal'), errors='coerce', utc=True)
-        
-        # Hapus baris dengan Tanggal yang tidak valid
-        initial_rows = len(df)
-        df.dropna(subset=['Tanggal'], inplace=True)
-        if initial_rows > len(df):
-            print(f"  - Membuang {initial_rows - len(df)} baris dengan tanggal tidak valid.")
-            
-        # Urutkan berdasarkan 'Tanggal'
-        df = df.sort_values('Tanggal').reset_index(drop=True)
-        print("✅ Data telah dibersihkan dan diurutkan berdasarkan 'Tanggal'.")
-        
+        with ukur('tahap', 'siapkan', len(df)):
+            df = siapkan_data(df, p.float32, p.grid)
+        logger.info("✅ Data telah dibersihkan dan diurutkan berdasarkan 'Tanggal'.")
+    except KeyError:
+        logger.error("❌ ERROR: Kolom 'Tanggal' tidak ditemukan di file input.")
+        return
     except Exception as e:
-        print(f"❌ ERROR saat persiapan data: {e}")
+        logger.error(f"❌ ERROR saat persiapan data: {e}")
         return
 
     # --- 3. Menjalankan Modul QC secara Berurutan ---
-    
-    # --- QC Curah Hujan ---
-    print("\n" + "=" * 50)
-    print("🌧️ 1. Menjalankan QC Curah Hujan (rr)...")
-    print("=" * 50)
-    try:
-        df = run_qc_hujan(df) 
-        print("\n✅ QC Curah Hujan Selesai.")
-    except Exception as e:
-        print(f"❌ ERROR saat menjalankan QC Curah Hujan: {e}")
-    
-    # --- QC Tekanan Udara ---
-    print("\n" + "=" * 50)
-    print("🌬️ 2. Menjalankan QC Tekanan Udara (pp_air)...")
-    print("=" * 50)
-    try:
-        df = run_qc_tekanan(df) 
-        print("\n✅ QC Tekanan Udara Selesai.")
-    except Exception as e:
-        print(f"❌ ERROR saat menjalankan QC Tekanan Udara: {e}")
-        
-    # --- QC Radiasi Matahari ---
-    print("\n" + "=" * 50)
-    print("☀️ 3. Menjalankan QC Radiasi Matahari (sr_avg)...")
-    print("=" * 50)
-    try:
-        df = run_qc_radiasi(df) 
-        print("\n✅ QC Radiasi Matahari Selesai.")
-    except Exception as e:
-        print(f"❌ ERROR saat menjalankan QC Radiasi Matahari: {e}")
-    
+    with ukur('tahap', 'qc', len(df)):
+        df = jalankan_qc(df, stasiun, p.cache_dir, p.paralel)
+
     # --- 4. Menyimpan File Output ---
-    print("\n" + "=" * 50)
-    print("💾 MENYIMPAN HASIL AKHIR")
-    print("=" * 50)
+    logger.info("\n" + "=" * 50)
+    logger.info("💾 MENYIMPAN HASIL AKHIR")
+    logger.info("=" * 50)
     try:
-        print(f"  - Menyiapkan kolom 'Tanggal' untuk Excel...")
-        for col in df.select_dtypes(include=["datetimetz"]).columns:
-            df[col] = df[col].dt.tz_localize(None)
-            
-        print(f"  - Menyimpan DataFrame ke: {OUTPUT_FILE}...")
-        df.to_excel(OUTPUT_FILE, index=False, engine="openpyxl")
-        
-        print("\n🎉 SEMUA PROSES QC TELAH SELESAI DIJALANKAN.")
-        print(f"File hasil disimpan di: {OUTPUT_FILE}")
-        print("==================================================")
-        
+        with ukur('tahap', 'simpan', len(df)):
+            simpan_output(df, output_file, p.output_format, p.arsip_dir, stasiun, p.rekap_dir)
+
+        logger.info("\n🎉 SEMUA PROSES QC TELAH SELESAI DIJALANKAN.")
+        logger.info(f"File hasil disimpan di: {output_file}")
+        logger.info("==================================================")
+
     except Exception as e:
-        print(f"❌ ERROR saat menyimpan file output: {e}")
-        print("Pastikan Anda memiliki izin tulis dan file tidak sedang dibuka.")
+        logger.error(f"❌ ERROR saat menyimpan file output: {e}")
+        logger.error("Pastikan Anda memiliki izin tulis dan file tidak sedang dibuka.")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="QC data AWS (hujan, tekanan, radiasi).")
+    parser.add_argument('--input', default=INPUT_FILE,
+                        help=f"File input mode tunggal (default: {INPUT_FILE}).")
+    parser.add_argument('--output', default=OUTPUT_FILE,
+                        help=f"File output mode tunggal (default: {OUTPUT_FILE}).")
+    parser.add_argument('--input-format', choices=['excel', 'parquet', 'feather', 'csv', 'sqlite'],
+                        help="Paksa format input (default: dari ekstensi file).")
+    parser.add_argument('--output-format', choices=['excel', 'parquet', 'feather', 'csv', 'sqlite'],
+                        help="Paksa format output (default: dari ekstensi file).")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help="Proses per N baris (out-of-core). Output harus Parquet/Feather/CSV.")
+    parser.add_argument('--float32', action='store_true', default=DOWNCAST_FLOAT32,
+                        help="Simpan kolom ukur (pp_air, sr_avg) sebagai float32 untuk menghemat memori.")
+    parser.add_argument('--batch', metavar='SUMBER',
+                        help="Folder berisi file stasiun atau file manifest (satu stasiun per baris).")
+    parser.add_argument('--output-dir', default='hasil_qc',
+                        help="Folder output untuk mode batch (default: hasil_qc).")
+    parser.add_argument('--workers', type=int, default=BATCH_WORKERS,
+                        help="Jumlah proses paralel untuk mode batch (default: jumlah CPU).")
+    parser.add_argument('--tanpa-grid', action='store_true', default=not GRID_10_MENIT,
+                        help="Jangan bulatkan 'Tanggal' ke grid 10 menit / isi timestamp yang hilang.")
+    parser.add_argument('--log-level', choices=list(LEVEL_LOG), default=None,
+                        help=f"Tingkat log konsol (default: {LOG_LEVEL}; worker batch: {BATCH_LOG_LEVEL}).")
+    parser.add_argument('--laporan', metavar='JSON', default=REPORT_FILE,
+                        help="Simpan laporan metrik (waktu, jumlah baris & flag per tahap/modul/check) ke JSON.")
+    parser.add_argument('--profil', metavar='FILE', default=PROFILE_FILE,
+                        help="Jalankan dengan cProfile dan simpan statistiknya (mode tunggal).")
+    parser.add_argument('--patch', metavar='FILE',
+                        help="Data susulan/koreksi yang diterapkan ke --input (hasil QC sebelumnya); "
+                             "hanya rentang terdampak yang di-QC ulang.")
+    parser.add_argument('--cache', metavar='FOLDER', default=CACHE_DIR,
+                        help="Pakai ulang flag stasiun-hari yang tidak berubah dari cache di folder ini (tidak untuk --chunk-size).")
+    parser.add_argument('--arsip', metavar='FOLDER', default=ARSIP_DIR,
+                        help="Tambahkan hasil QC ke arsip flag append-only (memory-mapped) di folder ini.")
+    parser.add_argument('--rekap', metavar='FOLDER', default=REKAP_DIR,
+                        help="Perbarui rekap harian per stasiun (jumlah flag, kelengkapan, total hujan; "
+                             "Parquet) di folder ini.")
+    parser.add_argument('--lokasi', nargs=2, type=float, metavar=('LINTANG', 'BUJUR'),
+                        help="Lokasi stasiun untuk QC radiasi (default: qc_radiasi.LOKASI_STASIUN / lokasi default).")
+    parser.add_argument('--ambang', metavar='FILE', default=AMBANG_FILE,
+                        help="Tabel ambang per stasiun/bulan (CSV/Excel: stasiun,bulan,parameter,check,kunci,nilai).")
+    parser.add_argument('--stasiun-meta', metavar='FILE', default=METADATA_STASIUN_FILE,
+                        help="Metadata stasiun (CSV/Excel: stasiun,lintang,bujur,elevasi) untuk lokasi radiasi "
+                             "dan buddy check spasial antar stasiun (input multi-stasiun).")
+    parser.add_argument('--bitmask', action='store_true', default=SIMPAN_BITMASK,
+                        help="Tambahkan kolom bitmask check '<kolom>_qcbit' (semua check yang gagal per baris).")
+    parser.add_argument('--tanpa-konsistensi', action='store_true', default=not CEK_KONSISTENSI,
+                        help="Jangan jalankan tahap konsistensi antar parameter (Flag 7) setelah modul QC.")
+    parser.add_argument('--paralel-modul', choices=list(MODE_PARALEL), default=PARALEL_MODUL,
+                        help="Jalankan modul hujan, tekanan & radiasi bersamaan (thread atau process).")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-   
-    main()
 
+    args = parse_args()
+    atur_log(args.log_level or LOG_LEVEL)
+    pengaturan = PengaturanQC.dari_args(args)
+    if args.batch:
+        ekstensi = {'excel': '.xlsx', 'parquet': '.parquet', 'feather': '.feather', 'csv': '.csv',
+                    'sqlite': '.sqlite'}
+        run_batch(args.batch, args.output_dir, pengaturan, workers=args.workers,
+                  output_extension=ekstensi.get(args.output_format, BATCH_OUTPUT_EXTENSION))
+    else:
+        main(args.input, args.output, pengaturan, patch_file=args.patch)
@@ -0,0 +1,157 @@
+import os
+import functools
+import pandas as pd
+import numpy as np
+
+from qc_metrik import logger
+
+# =====================================================================
+#   --- 📏 TABEL AMBANG PER STASIUN / BULAN ---
+# =====================================================================
+# Threshold check di konfigurasi modul (PARAMETERS) berlaku untuk semua
+# stasiun. Tabel ambang menimpanya per stasiun dan (opsional) per bulan,
+# dalam format panjang (CSV / Excel):
+#
+#   stasiun,bulan,parameter,check,kunci,nilai
+#   Lembang,,tekanan,range,min,780
+#   Lembang,,tekanan,range,max,900
+#   Tangsel,12,hujan,rapid_change,threshold,35
+#
+# Prioritas per baris data: (stasiun, bulan) > (stasiun, bulan kosong) >
+# konfigurasi check. Nilai berlaku untuk semua check bertipe `check` pada
+# parameter itu (mis. 'threshold' spike & rapid change diatur terpisah).
+#
+# Tabel dibaca sekali, lalu disebar ke per baris dengan satu gather NumPy
+# [kode stasiun, bulan] per (check, kunci): frame gabungan banyak stasiun
+# cukup di-QC dalam satu pass tervektorisasi (lihat qc_multi).
+
+KOLOM_TABEL = ['stasiun', 'bulan', 'parameter', 'check', 'kunci', 'nilai']
+
+# Kunci threshold yang bisa ditimpa per jenis check
+KUNCI_AMBANG = {
+    'range': ('min', 'max'),
+    'gap': ('threshold',),
+    'rapid_change': ('threshold',),
+    'spike': ('threshold',),
+    'drop': ('threshold',),
+}
+
+
+def bulan_dari_fitur(fitur):
+    """Bulan (1-12) per baris dari fitur_waktu (id hari pada jam dinding 'Tanggal')."""
+    bulan = fitur['id_hari'].astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    return (bulan % 12 + 1).astype(np.int8)
+
+
+class TabelAmbang:
+    """Tabel ambang tervalidasi; `baris` = DataFrame dengan kolom KOLOM_TABEL."""
+
+    def __init__(self, baris):
+        hilang = [c for c in KOLOM_TABEL if c not in baris.columns]
+        if hilang:
+            raise ValueError(f"Tabel ambang tidak memiliki kolom: {', '.join(hilang)}.")
+        baris = baris[KOLOM_TABEL].copy()
+        for col in ('stasiun', 'parameter', 'check', 'kunci'):
+            baris[col] = baris[col].astype(str).str.strip()
+        bulan = pd.to_numeric(baris['bulan'], errors='coerce')
+        if (bulan.notna() & ((bulan < 1) | (bulan > 12) | (bulan % 1 != 0))).any():
+            raise ValueError("Kolom 'bulan' tabel ambang harus 1-12 atau kosong (semua bulan).")
+        baris['bulan'] = bulan.fillna(0).astype(np.int8)   # 0 = semua bulan
+        baris['nilai'] = pd.to_numeric(baris['nilai'], errors='coerce')
+        if baris['nilai'].isna().any():
+            raise ValueError("Kolom 'nilai' tabel ambang harus numerik dan tidak boleh kosong.")
+        for check, kunci in baris[['check', 'kunci']].drop_duplicates().itertuples(index=False):
+            if kunci not in KUNCI_AMBANG.get(check, ()):
+                raise ValueError(f"Ambang '{check}.{kunci}' tidak didukung "
+                                 f"(pilih: {', '.join(f'{c}.{k}' for c, ks in KUNCI_AMBANG.items() for k in ks)}).")
+        ganda = baris.duplicated(['stasiun', 'bulan', 'parameter', 'check', 'kunci'])
+        if ganda.any():
+            contoh = baris[ganda].iloc[0]
+            raise ValueError(f"Ambang ganda di tabel: {contoh['stasiun']} bulan {contoh['bulan']} "
+                             f"{contoh['parameter']}.{contoh['check']}.{contoh['kunci']}.")
+        self.baris = baris.reset_index(drop=True)
+
+    def __len__(self):
+        return len(self.baris)
+
+    def daftar_stasiun(self):
+        return sorted(self.baris['stasiun'].unique())
+
+    def untuk_stasiun(self, stasiun):
+        """Baris tabel satu stasiun (untuk hash cache / log)."""
+        return self.baris[self.baris['stasiun'] == str(stasiun)]
+
+    def per_baris(self, nama, kode_stasiun, daftar_stasiun, bulan):
+        """
+        Ambang per baris data untuk parameter `nama`:
+        {(check, kunci): array float64} dengan NaN = pakai konfigurasi check.
+        `kode_stasiun` = indeks ke `daftar_stasiun` per baris, `bulan` = 1-12 per baris.
+        """
+        sub = self.baris[(self.baris['parameter'] == nama) & self.baris['stasiun'].isin(daftar_stasiun)]
+        if sub.empty:
+            return {}
+        posisi = {str(s): i for i, s in enumerate(daftar_stasiun)}
+        kode_stasiun = np.asarray(kode_stasiun, dtype=np.intp)
+        bulan = np.asarray(bulan, dtype=np.intp)
+        hasil = {}
+        for (check, kunci), grup in sub.groupby(['check', 'kunci'], sort=False):
+            tabel = np.full((len(daftar_stasiun), 13), np.nan)    # kolom 0 = semua bulan
+            tabel[[posisi[s] for s in grup['stasiun']], grup['bulan'].to_numpy(np.intp)] = grup['nilai'].to_numpy()
+            per_bulan = tabel[kode_stasiun, bulan]
+            hasil[(check, kunci)] = np.where(np.isnan(per_bulan), tabel[kode_stasiun, 0], per_bulan)
+        return hasil
+
+
+@functools.lru_cache(maxsize=8)
+def _baca_tabel(path, mtime):
+    if path.lower().endswith(('.xlsx', '.xls')):
+        baris = pd.read_excel(path)
+    else:
+        baris = pd.read_csv(path, dtype={'stasiun': str})
+    tabel = TabelAmbang(baris)
+    logger.info(f"📏 Tabel ambang '{path}': {len(tabel)} ambang untuk {len(tabel.daftar_stasiun())} stasiun.")
+    return tabel
+
+
+def baca_tabel_ambang(path):
+    """Membaca tabel ambang (CSV / Excel); di-cache per (path, mtime) sehingga dibaca sekali per proses."""
+    path = os.path.abspath(path)
+    return _baca_tabel(path, os.path.getmtime(path))
+
+
+# =====================================================================
+#   --- 🎯 Ambang Aktif (run satu stasiun) ---
+# =====================================================================
+# Run satu stasiun (main, batch, chunk, cache, patch) memakai ambang stasiun
+# yang diatur lewat atur_ambang(); registry mengambilnya per baris sesuai bulan.
+
+_AKTIF = (None, None)
+
+
+def atur_ambang(tabel=None, stasiun=None):
+    """Mengatur tabel ambang & stasiun untuk QC berikutnya (berlaku per proses)."""
+    global _AKTIF
+    _AKTIF = (tabel, None if stasiun is None else str(stasiun))
+
+
+def ambang_aktif():
+    """(tabel, stasiun) yang sedang dipakai, atau (None, None)."""
+    return _AKTIF
+
+
+def ringkasan_ambang_aktif():
+    """Ambang stasiun aktif sebagai list baris (untuk hash konfigurasi cache)."""
+    tabel, stasiun = _AKTIF
+    if tabel is None or stasiun is None:
+        return []
+    sub = tabel.untuk_stasiun(stasiun)
+    return [[r.bulan, r.parameter, r.check, r.kunci, r.nilai] for r in sub.itertuples(index=False)]
+
+
+def ambang_stasiun_aktif(nama, fitur):
+    """Ambang per baris parameter `nama` untuk stasiun aktif ({} jika tidak ada)."""
+    tabel, stasiun = _AKTIF
+    if tabel is None or stasiun is None:
+        return {}
+    n = len(fitur['id_hari'])
+    return tabel.per_baris(nama, np.zeros(n, dtype=np.intp), [stasiun], bulan_dari_fitur(fitur))
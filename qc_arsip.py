@@ -0,0 +1,221 @@
+import os
+import re
+import json
+import pandas as pd
+import numpy as np
+
+from qc_common import FLAG_DTYPE
+from qc_registry import PARAMETERS
+from qc_metrik import logger, ukur
+import qc_hujan    # noqa: F401  (mendaftarkan parameter)
+import qc_tekanan  # noqa: F401
+import qc_radiasi  # noqa: F401
+
+# =====================================================================
+#   --- 🗄️ ARSIP FLAG APPEND-ONLY (MEMORY-MAPPED, PER STASIUN-PARAMETER) ---
+# =====================================================================
+# Hasil QC disimpan per stasiun & parameter sebagai array biner mentah:
+#
+#   <folder>/<stasiun>/<parameter>/
+#       waktu.bin   datetime64[s] UTC, naik tegas (indeks waktu)
+#       nilai.bin   float64, nilai ukur
+#       flag.bin    uint8, kode flag
+#       meta.json   jumlah baris yang sudah di-commit + kolom asal
+#
+# Menambah data = menulis byte di ujung file lalu memperbarui meta.json
+# (atomik). Byte di luar `jumlah` (append yang terputus) diabaikan dan
+# dipotong pada append berikutnya. Membaca rentang tanggal = np.memmap +
+# pencarian biner pada waktu.bin; hasilnya view tanpa salin, jadi hanya
+# halaman file rentang itu yang dimuat dari disk.
+
+ARSIP_VERSI = 1
+FILE_ARRAY = {
+    'waktu': ('waktu.bin', np.dtype('datetime64[s]')),
+    'nilai': ('nilai.bin', np.dtype('float64')),
+    'flag': ('flag.bin', np.dtype(FLAG_DTYPE)),
+}
+FILE_META = 'meta.json'
+
+
+def _nama_aman(nama):
+    return re.sub(r'[^\w.-]', '_', str(nama))
+
+
+def _waktu_utc(tanggal):
+    """'Tanggal' (tz-aware atau naive = UTC) -> datetime64[s] UTC."""
+    tanggal = pd.Series(tanggal)
+    if getattr(tanggal.dt, 'tz', None) is not None:
+        tanggal = tanggal.dt.tz_convert('UTC').dt.tz_localize(None)
+    return tanggal.to_numpy().astype('datetime64[s]')
+
+
+def _ke_datetime64(waktu):
+    """Batas rentang (str / Timestamp / datetime64) -> datetime64[s] UTC."""
+    ts = pd.Timestamp(waktu)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return np.datetime64(ts, 's')
+
+
+class ArsipQC:
+    """
+    Arsip flag append-only di folder `folder`:
+    - tambah(stasiun, df)                      : menambahkan hasil QC baru
+    - baca(stasiun, parameter, mulai, akhir)   : view memmap satu rentang tanggal
+    - baca_dataframe(...)                      : sama, sebagai DataFrame (salinan)
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+
+    def _folder(self, stasiun, parameter):
+        return os.path.join(self.folder, _nama_aman(stasiun), parameter)
+
+    def _baca_meta(self, folder):
+        try:
+            with open(os.path.join(folder, FILE_META), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _tulis_meta(self, folder, meta):
+        path = os.path.join(folder, FILE_META)
+        sementara = f"{path}.{os.getpid()}.tmp"
+        with open(sementara, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(sementara, path)
+
+    def daftar_stasiun(self):
+        return sorted(d for d in os.listdir(self.folder) if os.path.isdir(os.path.join(self.folder, d)))
+
+    def daftar_parameter(self, stasiun):
+        folder = os.path.join(self.folder, _nama_aman(stasiun))
+        if not os.path.isdir(folder):
+            return []
+        return sorted(p for p in os.listdir(folder) if os.path.exists(os.path.join(folder, p, FILE_META)))
+
+    def _memmap(self, folder, jumlah):
+        """{nama: np.memmap read-only} sepanjang `jumlah` baris yang sudah di-commit."""
+        arrays = {}
+        for nama, (file, dtype) in FILE_ARRAY.items():
+            if jumlah == 0:
+                arrays[nama] = np.empty(0, dtype=dtype)
+            else:
+                arrays[nama] = np.memmap(os.path.join(folder, file), dtype=dtype, mode='r', shape=(jumlah,))
+        return arrays
+
+    # --- Tulis ---
+    def tambah(self, stasiun, df):
+        """
+        Menambahkan hasil QC `df` (berisi 'Tanggal', kolom data & kolom flag)
+        untuk setiap parameter terdaftar. Baris dengan 'Tanggal' <= akhir arsip
+        parameter itu dilewati (arsip append-only). Mengembalikan
+        {parameter: jumlah baris ditambahkan}.
+        """
+        waktu = _waktu_utc(df['Tanggal'])
+        ditambah = {}
+        for nama, param in PARAMETERS.items():
+            kolom, flag_kolom = param['kolom'], param['flag_kolom']
+            if kolom not in df.columns or flag_kolom not in df.columns:
+                continue
+            with ukur('arsip', nama, len(df)) as catatan:
+                ditambah[nama] = self._tambah_parameter(stasiun, nama, kolom, flag_kolom, waktu,
+                                                        df[kolom], df[flag_kolom])
+                catatan['baris_ditambah'] = ditambah[nama]
+        return ditambah
+
+    def _tambah_parameter(self, stasiun, nama, kolom, flag_kolom, waktu, nilai, flag):
+        folder = self._folder(stasiun, nama)
+        os.makedirs(folder, exist_ok=True)
+        meta = self._baca_meta(folder) or {
+            'versi': ARSIP_VERSI, 'stasiun': str(stasiun), 'parameter': nama,
+            'kolom': kolom, 'flag_kolom': flag_kolom, 'jumlah': 0,
+        }
+        jumlah = meta['jumlah']
+
+        # Hanya baris setelah akhir arsip, tanpa timestamp ganda
+        baru = ~np.isnat(waktu)
+        if jumlah:
+            terakhir = self._memmap(folder, jumlah)['waktu'][-1]
+            baru &= waktu > terakhir
+        idx = np.flatnonzero(baru)
+        if idx.size > 1:
+            idx = idx[np.concatenate(([True], np.diff(waktu[idx]) > np.timedelta64(0, 's')))]
+        dilewati = int(len(waktu) - idx.size)
+        if dilewati:
+            logger.info(f"  - Arsip '{stasiun}/{nama}': {dilewati} baris dilewati "
+                        f"(tidak lebih baru dari akhir arsip / timestamp ganda).")
+        if idx.size == 0:
+            return 0
+
+        data = {
+            'waktu': waktu[idx],
+            'nilai': pd.to_numeric(nilai, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)[idx],
+            'flag': pd.to_numeric(flag, errors='coerce').fillna(0).to_numpy().astype(FLAG_DTYPE)[idx],
+        }
+        for key, (file, dtype) in FILE_ARRAY.items():
+            path = os.path.join(folder, file)
+            with open(path, 'ab') as f:
+                # Potong sisa append yang terputus (di luar baris yang sudah di-commit)
+                f.truncate(jumlah * dtype.itemsize)
+                f.write(np.ascontiguousarray(data[key], dtype=dtype).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        meta['jumlah'] = jumlah + int(idx.size)
+        self._tulis_meta(folder, meta)
+        return int(idx.size)
+
+    # --- Baca ---
+    def rentang(self, stasiun, parameter):
+        """(waktu pertama, waktu terakhir, jumlah baris) arsip satu parameter, atau None."""
+        folder = self._folder(stasiun, parameter)
+        meta = self._baca_meta(folder)
+        if not meta or not meta['jumlah']:
+            return None
+        waktu = self._memmap(folder, meta['jumlah'])['waktu']
+        return waktu[0], waktu[-1], meta['jumlah']
+
+    def baca(self, stasiun, parameter, mulai=None, akhir=None):
+        """
+        View memmap (tanpa salin) untuk rentang [mulai, akhir] (inklusif, UTC):
+        {'waktu': datetime64[s], 'nilai': float64, 'flag': uint8}.
+        """
+        folder = self._folder(stasiun, parameter)
+        meta = self._baca_meta(folder)
+        if meta is None:
+            raise KeyError(f"Arsip '{stasiun}/{parameter}' tidak ditemukan di '{self.folder}'.")
+        arrays = self._memmap(folder, meta['jumlah'])
+        waktu = arrays['waktu']
+        a = 0 if mulai is None else int(np.searchsorted(waktu, _ke_datetime64(mulai), side='left'))
+        b = len(waktu) if akhir is None else int(np.searchsorted(waktu, _ke_datetime64(akhir), side='right'))
+        return {nama: arr[a:b] for nama, arr in arrays.items()}
+
+    def baca_dataframe(self, stasiun, parameter, mulai=None, akhir=None):
+        """Seperti baca(), sebagai DataFrame ['Tanggal', <kolom>, <kolom flag>] (salinan)."""
+        meta = self._baca_meta(self._folder(stasiun, parameter))
+        if meta is None:
+            raise KeyError(f"Arsip '{stasiun}/{parameter}' tidak ditemukan di '{self.folder}'.")
+        data = self.baca(stasiun, parameter, mulai, akhir)
+        return pd.DataFrame({
+            'Tanggal': pd.to_datetime(np.array(data['waktu'])).tz_localize('UTC'),
+            meta['kolom']: np.array(data['nilai']),
+            meta['flag_kolom']: np.array(data['flag']),
+        })
+
+
+class PenulisArsip:
+    """
+    Penulis bertahap (mode chunk) yang menambahkan setiap chunk hasil QC ke
+    arsip, lalu meneruskannya ke penulis lain (`teruskan`, mis. PenulisBertahap).
+    """
+
+    def __init__(self, arsip, stasiun, teruskan=None):
+        self.arsip = arsip
+        self.stasiun = stasiun
+        self.teruskan = teruskan
+
+    def tulis(self, df):
+        if self.teruskan is not None:
+            self.teruskan.tulis(df)
+        self.arsip.tambah(self.stasiun, df)
@@ -0,0 +1,279 @@
+import os
+import re
+import json
+import hashlib
+import pandas as pd
+import numpy as np
+
+from qc_common import BIT_SUFFIX, new_flag_array, new_bit_array
+from qc_registry import PARAMETERS, bitmask_aktif
+from qc_metrik import logger, ukur
+from qc_inkremental import jalankan_modul, HALO_BARIS
+from qc_ambang import ringkasan_ambang_aktif
+from qc_konsistensi import konfigurasi_konsistensi, ringkasan_akhir
+import qc_hujan
+import qc_tekanan
+import qc_radiasi
+import qc_surya
+
+# =====================================================================
+#   --- ♻️ CACHE HASIL QC PER STASIUN-HARI (CONTENT HASH) ---
+# =====================================================================
+# Job harian menjalankan ulang QC atas riwayat yang hampir tidak berubah.
+# Cache ini menyimpan flag setiap stasiun-hari di disk dengan kunci:
+#
+#   hash( stasiun, konfigurasi QC (semua check & threshold),
+#         nilai hari itu + HALO_BARIS baris sebelum & sesudahnya,
+#         nilai 'pp_air' valid terakhir sebelum halo (Gap Check) )
+#
+# Flag baris i hanya bergantung pada baris [i - HALO_BARIS, i + HALO_BARIS]
+# (lihat qc_inkremental), jadi hari dengan kunci sama pasti punya flag sama.
+# Hari yang berubah (atau tetangganya berubah) di-QC ulang pada potongan
+# [awal - HALO, akhir + HALO); sisanya diambil dari cache.
+#
+# Ukuran cache dibatasi: setiap kali cache bertambah, file stasiun lain yang
+# paling lama tidak dipakai dihapus dulu; stasiun yang sendirian melebihi batas
+# tidak di-cache sama sekali.
+
+CACHE_DIR = '.qc_cache'
+CACHE_MAKS_MB = 512
+# Naikkan jika logika check berubah tanpa mengubah konfigurasi (membatalkan semua entri)
+CACHE_VERSI = 3
+
+# (kolom data, kolom flag) yang ikut di-cache
+KOLOM_QC = [
+    (qc_hujan.CUMULATIVE_COLUMN, qc_hujan.FLAG_COLUMN),
+    (qc_tekanan.COLUMN_TO_CHECK, qc_tekanan.FLAG_COLUMN),
+    (qc_radiasi.COLUMN_TO_CHECK, qc_radiasi.FLAG_COLUMN),
+]
+
+NANODETIK_PER_HARI = 86_400 * 10**9
+
+
+def hash_konfigurasi():
+    """
+    Hash seluruh konfigurasi check terdaftar + HALO_BARIS + jam reset hujan
+    + lokasi stasiun radiasi, batas langit cerah & elevasi malam + ambang
+    stasiun aktif + threshold tahap konsistensi + CACHE_VERSI.
+    """
+    konfigurasi = {
+        'versi': CACHE_VERSI,
+        'halo': HALO_BARIS,
+        'reset_hujan': qc_hujan.HARDCODED_RESET_TIMES,
+        'lokasi_radiasi': qc_radiasi.lokasi_aktif(),
+        'elevasi_malam': qc_radiasi.ELEVASI_MALAM,
+        'langit_cerah': [qc_surya.CERAH_FAKTOR, qc_surya.CERAH_PANGKAT, qc_surya.CERAH_OFFSET],
+        'ambang': ringkasan_ambang_aktif(),
+        'konsistensi': konfigurasi_konsistensi(),
+        'parameter': {nama: {'kolom': p['kolom'], 'checks': p['checks']} for nama, p in PARAMETERS.items()},
+    }
+    teks = json.dumps(konfigurasi, sort_keys=True, default=str)
+    return hashlib.blake2b(teks.encode('utf-8'), digest_size=16).digest()
+
+
+class CacheQC:
+    """
+    Cache flag per stasiun-hari di folder `folder`, satu file per stasiun:
+    <folder>/<stasiun>.npz berisi id hari, kunci, panjang, dan flag tiap hari
+    (uint8, + bitmask uint16 bila aktif; disambung per kolom). Satu baca + satu
+    tulis per run stasiun. Hari dengan set kolom berbeda dianggap tidak ada.
+    """
+
+    def __init__(self, folder=CACHE_DIR, maks_mb=CACHE_MAKS_MB):
+        self.folder = folder
+        self.maks_byte = int(maks_mb * 1024 * 1024)
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, stasiun):
+        return os.path.join(self.folder, re.sub(r'[^\w.-]', '_', str(stasiun)) + '.npz')
+
+    def baca_stasiun(self, stasiun):
+        """
+        {id_hari: (kunci, {kolom_flag: array})} untuk satu stasiun ({} jika belum ada).
+        File yang dibaca ditandai baru dipakai (LRU).
+        """
+        path = self._path(stasiun)
+        try:
+            with np.load(path) as data:
+                hari, kunci, panjang = data['hari'], data['kunci'], data['panjang']
+                kolom = [str(k) for k in data['kolom']]
+                flag = {k: data[f'flag__{k}'] for k in kolom}
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            return {}
+        batas = np.concatenate(([0], np.cumsum(panjang)))
+        return {
+            int(h): (str(k), {col: flag[col][batas[i]:batas[i + 1]] for col in kolom})
+            for i, (h, k) in enumerate(zip(hari, kunci))
+        }
+
+    def tulis_stasiun(self, stasiun, entri, kolom):
+        """
+        Menulis ulang cache satu stasiun dari {id_hari: (kunci, {kolom_flag: array})}.
+        Mengembalikan pertambahan ukuran cache (byte, bisa negatif). File yang
+        sendirian melebihi batas tidak disimpan.
+        """
+        hari = sorted(h for h, (_, f) in entri.items() if set(f) == set(kolom))
+        data = {
+            'hari': np.array(hari, dtype=np.int64),
+            'kunci': np.array([entri[h][0] for h in hari], dtype='U32'),
+            'panjang': np.array([len(entri[h][1][kolom[0]]) for h in hari], dtype=np.int64),
+            'kolom': np.array(kolom, dtype='U64'),
+        }
+        for col in kolom:
+            data[f'flag__{col}'] = (np.concatenate([entri[h][1][col] for h in hari]) if hari
+                                    else new_flag_array(0))
+        path = self._path(stasiun)
+        try:
+            lama = os.path.getsize(path)
+        except OSError:
+            lama = 0
+        sementara = f"{path}.{os.getpid()}.tmp"
+        with open(sementara, 'wb') as f:
+            np.savez(f, **data)
+        baru = os.path.getsize(sementara)
+        if baru > self.maks_byte:
+            # Satu stasiun melebihi seluruh batas: tidak di-cache (entri lamanya juga basi)
+            logger.warning(f"⚠️ Cache '{stasiun}' ({baru / 1024**2:.1f} MB) melebihi batas "
+                           f"{self.maks_byte / 1024**2:.0f} MB; stasiun ini tidak di-cache.")
+            for berkas in (sementara, path):
+                try:
+                    os.remove(berkas)
+                except OSError:
+                    pass
+            return -lama
+        os.replace(sementara, path)
+        return baru - lama
+
+    def rapikan(self, kecuali=None):
+        """
+        Menghapus file stasiun yang paling lama tidak dipakai hingga ukuran cache <= batas.
+        File stasiun `kecuali` (mis. yang baru ditulis) tidak ikut dihapus.
+        """
+        lindungi = None if kecuali is None else os.path.basename(self._path(kecuali))
+        entri = []
+        for nama in os.listdir(self.folder):
+            if nama.endswith('.npz'):
+                path = os.path.join(self.folder, nama)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entri.append((st.st_mtime, st.st_size, path))
+        total = sum(e[1] for e in entri)
+        dihapus = 0
+        for _, ukuran, path in sorted(entri):
+            if total <= self.maks_byte:
+                break
+            if os.path.basename(path) == lindungi:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= ukuran
+            dihapus += 1
+        return dihapus
+
+
+def _epoch_ns(tanggal):
+    """'Tanggal' (tz-aware atau naive) -> int64 nanodetik UTC."""
+    if getattr(tanggal.dt, 'tz', None) is not None:
+        tanggal = tanggal.dt.tz_convert('UTC').dt.tz_localize(None)
+    return tanggal.to_numpy().astype('datetime64[ns]').view('int64')
+
+
+def jalankan_qc_dengan_cache(df, stasiun, cache):
+    """
+    Menjalankan ketiga modul QC pada df (sudah disiapkan & berurutan waktu),
+    memakai ulang flag stasiun-hari yang kuncinya ada di `cache`.
+    Hasilnya identik dengan jalankan_semua_qc(df).
+    """
+    n = len(df)
+    # Sama seperti modul QC: kolom tekanan & radiasi dikonversi ke numerik di df
+    for col in (qc_tekanan.COLUMN_TO_CHECK, qc_radiasi.COLUMN_TO_CHECK):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    aktif = [(data, flag) for data, flag in KOLOM_QC if data in df.columns]
+    kolom_data = ['Tanggal'] + [data for data, _ in aktif]
+    if n == 0 or not aktif:
+        return df
+
+    # --- Bahan kunci: nilai numerik + mask kosong asli ---
+    epoch = _epoch_ns(df['Tanggal'])
+    bahan = [epoch]
+    for data, _ in aktif:
+        bahan.append(pd.to_numeric(df[data], errors='coerce').to_numpy(dtype='float64', na_value=np.nan))
+        bahan.append(df[data].isna().to_numpy())
+    pp = (df[qc_tekanan.COLUMN_TO_CHECK].to_numpy(dtype='float64', na_value=np.nan)
+          if qc_tekanan.COLUMN_TO_CHECK in df.columns else np.full(n, np.nan))
+    idx_pp_valid = np.flatnonzero(~np.isnan(pp))
+
+    def pp_valid_sebelum(posisi):
+        k = np.searchsorted(idx_pp_valid, posisi) - 1
+        return pp[idx_pp_valid[k]] if k >= 0 else np.nan
+
+    konfigurasi = hash_konfigurasi()
+    id_stasiun = str(stasiun).encode('utf-8')
+    kolom_bytes = ','.join(kolom_data).encode('utf-8')
+
+    hari = epoch // NANODETIK_PER_HARI
+    batas = np.flatnonzero(np.diff(hari)) + 1
+    awal_hari = np.concatenate(([0], batas))
+    akhir_hari = np.concatenate((batas, [n]))
+
+    flags = {flag: new_flag_array(n) for _, flag in aktif}
+    if bitmask_aktif():
+        flags.update({f'{data}{BIT_SUFFIX}': new_bit_array(n) for data, _ in aktif})
+    kolom_flag = list(flags)
+    with ukur('tahap', 'cache', n) as catatan:
+        entri = cache.baca_stasiun(stasiun)
+        hilang = []   # (awal, akhir, id_hari, kunci) yang harus di-QC ulang
+        for a, b, h in zip(awal_hari, akhir_hari, hari[awal_hari].tolist()):
+            lo, hi = max(0, a - HALO_BARIS), min(n, b + HALO_BARIS)
+            hasher = hashlib.blake2b(digest_size=16)
+            hasher.update(konfigurasi)
+            hasher.update(id_stasiun)
+            hasher.update(kolom_bytes)
+            hasher.update(np.array([a - lo, b - a, pp_valid_sebelum(lo)]).tobytes())
+            for arr in bahan:
+                hasher.update(arr[lo:hi].tobytes())
+            kunci = hasher.hexdigest()
+
+            tersimpan = entri.get(h)
+            if tersimpan is not None and tersimpan[0] == kunci and set(tersimpan[1]) == set(flags):
+                for col, nilai in tersimpan[1].items():
+                    flags[col][a:b] = nilai
+            else:
+                hilang.append((a, b, h, kunci))
+
+        # Hari-hari hilang yang berurutan di-QC dalam satu potongan
+        blok = []
+        for item in hilang:
+            if blok and blok[-1][-1][1] == item[0]:
+                blok[-1].append(item)
+            else:
+                blok.append([item])
+        for items in blok:
+            a, b = items[0][0], items[-1][1]
+            lo, hi = max(0, a - HALO_BARIS), min(n, b + HALO_BARIS)
+            hasil = jalankan_modul(df.iloc[lo:hi][kolom_data].reset_index(drop=True), pp_valid_sebelum(lo))
+            for col in flags:
+                flags[col][a:b] = hasil[col].to_numpy()[a - lo:b - lo]
+            for a_hari, b_hari, h, kunci in items:
+                entri[h] = (kunci, {col: flags[col][a_hari:b_hari] for col in flags})
+
+        dihapus = 0
+        if hilang and cache.tulis_stasiun(stasiun, entri, kolom_flag) > 0:
+            dihapus = cache.rapikan(kecuali=stasiun)
+        catatan.update({'hari_dari_cache': len(awal_hari) - len(hilang), 'hari_diqc': len(hilang),
+                        'entri_dihapus': dihapus})
+
+    for col in flags:
+        df[col] = flags[col]
+    basi = [f'{data}{BIT_SUFFIX}' for data, _ in aktif if f'{data}{BIT_SUFFIX}' not in flags]
+    df = df.drop(columns=[c for c in basi if c in df.columns])
+    logger.info(f"♻️ Cache QC '{stasiun}': {len(awal_hari) - len(hilang)} hari dari cache, "
+                f"{len(hilang)} hari di-QC ulang.")
+    ringkasan_akhir(df)
+    return df
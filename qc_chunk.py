@@ -0,0 +1,64 @@
+import pandas as pd
+import numpy as np
+
+from qc_metrik import logger
+from qc_inkremental import StatusStasiun, qc_inkremental, FLAG_COLUMNS, BIT_COLUMNS, HALO_BARIS
+import qc_tekanan
+import qc_radiasi
+
+# =====================================================================
+#   --- 🧱 QC PER CHUNK (OUT-OF-CORE, ARSIP MULTI-TAHUN) ---
+# =====================================================================
+# Input dibaca sebagai potongan (chunk) berurutan waktu. Setiap chunk diproses
+# lewat mesin QC inkremental, yang membawa halo (ekor 2 x HALO_BARIS baris,
+# nilai kumulatif 'rr' sebelumnya, nilai 'pp_air' valid terakhir) antar chunk,
+# sehingga flag di tepi chunk identik dengan satu kali proses penuh.
+#
+# Baris baru ditulis ke output setelah flag-nya final, yaitu lebih tua dari
+# HALO_BARIS baris terakhir. Memori puncak ~ ukuran chunk, bukan panjang arsip.
+
+
+def run_qc_per_chunk(chunks, penulis):
+    """
+    Menjalankan QC atas iterable `chunks` (DataFrame yang sudah disiapkan,
+    berurutan waktu) dan menulis hasilnya lewat `penulis.tulis(df)`.
+    Mengembalikan jumlah baris yang ditulis.
+    """
+    status = StatusStasiun()
+    tertunda = None   # baris mentah (+ flag) yang flag-nya belum final
+    jumlah_ditulis = 0
+
+    for nomor, chunk in enumerate(chunks, start=1):
+        if chunk.empty:
+            continue
+        chunk = chunk.reset_index(drop=True)
+        # Sama seperti modul QC: kolom tekanan & radiasi dikonversi ke numerik
+        for col in (qc_tekanan.COLUMN_TO_CHECK, qc_radiasi.COLUMN_TO_CHECK):
+            if col in chunk.columns:
+                chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+
+        awal_global = status.jumlah_baris
+        flags = qc_inkremental(status, chunk)
+
+        chunk.index = pd.RangeIndex(awal_global, awal_global + len(chunk))
+        kolom_flag = [c for c in FLAG_COLUMNS + BIT_COLUMNS if c in flags.columns]
+        # Kolom bitmask dari input tanpa bitmask aktif sudah basi
+        chunk = chunk.drop(columns=[c for c in BIT_COLUMNS if c in chunk.columns and c not in kolom_flag])
+        for col in kolom_flag:
+            chunk[col] = np.zeros(len(chunk), dtype=flags[col].dtype)
+        tertunda = chunk if tertunda is None else pd.concat([tertunda, chunk])
+        tertunda.loc[flags.index, kolom_flag] = flags[kolom_flag]
+
+        # Baris yang lebih tua dari HALO_BARIS baris terakhir sudah final
+        batas_final = status.jumlah_baris - HALO_BARIS
+        final = tertunda.loc[:batas_final - 1]
+        if not final.empty:
+            penulis.tulis(final.reset_index(drop=True))
+            jumlah_ditulis += len(final)
+            tertunda = tertunda.loc[batas_final:]
+        logger.info(f"  - Chunk {nomor}: {len(chunk)} baris diproses, total ditulis {jumlah_ditulis}.")
+
+    if tertunda is not None and not tertunda.empty:
+        penulis.tulis(tertunda.reset_index(drop=True))
+        jumlah_ditulis += len(tertunda)
+    return jumlah_ditulis
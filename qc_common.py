@@ -0,0 +1,113 @@
+import pandas as pd
+import numpy as np
+
+# =====================================================================
+#   --- 🧩 KERNEL BERSAMA (HUJAN, TEKANAN, RADIASI) ---
+# =====================================================================
+# Fungsi-fungsi di sini dipakai bersama oleh ketiga modul QC.
+# Semuanya bekerja pada array NumPy secara tervektorisasi (tanpa loop
+# Python per baris), sehingga waktu eksekusi tumbuh linier terhadap n.
+
+# --- Kode flag ---
+# Flag disimpan sebagai uint8 (1 byte/baris), 0 = data baik/belum diuji.
+# Untuk output Excel/CSV, 0 ditulis sebagai sel kosong (lihat flag_for_output).
+FLAG_BAIK = 0
+FLAG_DTYPE = np.uint8
+FLAG_SUFFIX = '_flagging'
+
+# --- Bitmask check ---
+# Setiap check parameter menyalakan bit-nya sendiri (bit ke-i = check ke-i pada
+# daftar check) di kolom '<kolom>_qcbit' (uint16, maks. 14 check per parameter;
+# bit 14-15 dicadangkan untuk tahap konsistensi & buddy check), sehingga semua
+# kegagalan sebuah baris tetap terlihat; kode flag tunggal diturunkan dari bit
+# dengan prioritas terendah (lihat qc_registry.resolusi_flag).
+BIT_DTYPE = np.uint16
+BIT_SUFFIX = '_qcbit'
+
+# Kolom nama stasiun pada frame gabungan multi-stasiun
+KOLOM_STASIUN = 'stasiun'
+
+
+def new_flag_array(n):
+    """Kolom flag baru: n baris bernilai FLAG_BAIK (uint8)."""
+    return np.zeros(n, dtype=FLAG_DTYPE)
+
+
+def new_bit_array(n):
+    """Kolom bitmask check baru: n baris tanpa bit menyala (uint16)."""
+    return np.zeros(n, dtype=BIT_DTYPE)
+
+
+def flag_for_output(flags):
+    """Kode flag -> 'UInt8' nullable, dengan FLAG_BAIK menjadi <NA> (sel kosong)."""
+    flags = pd.Series(flags)
+    return flags.astype('UInt8').mask(flags == FLAG_BAIK)
+
+
+def windows_union_mask(end_mask, window):
+    """
+    Gabungan (union) semua jendela [i - window + 1, i] untuk setiap i
+    di mana `end_mask[i]` bernilai True.
+
+    Dihitung dengan difference array + cumsum: O(n), berapa pun
+    banyaknya jendela yang saling tumpang tindih.
+    """
+    end_mask = np.asarray(end_mask, dtype=bool)
+    n = len(end_mask)
+    ends = np.flatnonzero(end_mask)
+    if ends.size == 0:
+        return np.zeros(n, dtype=bool)
+    starts = np.maximum(ends - window + 1, 0)
+    delta = np.bincount(starts, minlength=n + 1) - np.bincount(ends + 1, minlength=n + 1)
+    return np.cumsum(delta[:-1]) > 0
+
+
+def flat_window_ends(values, window, tol=0.0):
+    """
+    True pada baris i jika `window` nilai terakhir (i - window + 1 .. i)
+    semuanya valid (bukan NaN) dan rentangnya (max - min) <= `tol`.
+
+    Dengan tol = 0 ini identik dengan run konstan sepanjang >= window.
+    """
+    s = pd.Series(np.asarray(values, dtype='float64'))
+    roll = s.rolling(window=window, min_periods=window)
+    spread = (roll.max() - roll.min()).to_numpy()
+    return spread <= tol
+
+
+def rolling_std(values, window, block=262144):
+    """
+    Simpangan baku (ddof=1) per jendela `window` baris yang berakhir di i.
+    NaN jika jendela belum penuh atau memuat NaN (sama seperti pandas rolling).
+
+    Dihitung dua-pass per jendela (bukan akumulasi berjalan), sehingga nilai
+    di baris i hanya bergantung pada jendelanya sendiri, tidak pada riwayat
+    sebelumnya. Ini penting agar hasil QC per potongan data (chunk/inkremental)
+    identik dengan satu kali proses penuh; jumlah kumulatif x dan x² tidak
+    memenuhi ini (galat pembulatan membawa riwayat).
+
+    Kedua pass menjumlahkan per posisi dalam jendela atas `block` baris
+    sekaligus, jadi memori sementara hanya beberapa array `block` float64,
+    berapa pun panjang jendelanya.
+    """
+    a = np.asarray(values, dtype='float64')
+    n = len(a)
+    out = np.full(n, np.nan)
+    if n < window:
+        return out
+    for start in range(window - 1, n, block):
+        stop = min(start + block, n)
+        seg = a[start - window + 1:stop]
+        m = stop - start
+        rata = np.zeros(m)
+        for k in range(window):
+            rata += seg[k:k + m]
+        rata /= window
+        kuadrat = np.zeros(m)
+        selisih = np.empty(m)
+        for k in range(window):
+            np.subtract(seg[k:k + m], rata, out=selisih)
+            kuadrat += selisih * selisih
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[start:stop] = np.sqrt(kuadrat / (window - 1))
+    return out
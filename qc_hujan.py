@@ -1,12 +1,16 @@
+import logging
 import pandas as pd
 import numpy as np
 
+from qc_common import FLAG_BAIK
+from qc_registry import register_parameter, run_qc_parameter
+from qc_metrik import logger
+from qc_waktu import pada_jam
+
 # =====================================================================
 #   --- ⚙️ KONFIGURASI QC (HUJAN) ---
 # =====================================================================
 CUMULATIVE_COLUMN = 'rr'
-ORIGINAL_CUMULATIVE_COLUMN = 'rr_original_internal'
-INTERVAL_COLUMN = 'rr_interval_internal' 
 FLAG_COLUMN = 'rr_flagging'
 
 # --- Parameter Range Check (Flag 1) ---
@@ -22,262 +26,263 @@ FLAT_LINE_MIN_VALUE = 0.1
 RAPID_CHANGE_THRESHOLD = 30.0
 # --- Parameter Unexpected Drop Test (Flag 5) ---
 UNEXPECTED_DROP_THRESHOLD = -1.0
+# Jam reset kumulatif yang dikecualikan dari Unexpected Drop Test
+HARDCODED_RESET_TIMES = ['00:00', '00:10', '00:20']
+
+# --- Jangkauan dependensi antar-baris (mode inkremental/chunk) ---
+# Flag baris i hanya bergantung pada baris [i - HALO_BARIS, i + HALO_BARIS]:
+# jendela flat line (window - 1) + invalidasi setelah drop & derivasi interval (4)
+# + spike antar interval (1).
+HALO_BARIS = FLAT_LINE_WINDOW + 6
+
+# =====================================================================
+#   --- 1️⃣ Persiapan Data Interval (Hujan) ---
+# =====================================================================
+# Interval hujan diturunkan dari 'rr' kumulatif dalam SATU lintasan berurutan
+# (kernel_interval_hujan) yang membawa state baris sebelumnya:
+#   - nilai kumulatif asli sebelumnya  -> deteksi unexpected drop
+#   - drop di baris sebelumnya         -> baris ini diinvalidasi (NaN)
+#   - nilai setelah invalidasi         -> selisih, reset, data sebelumnya hilang
+# State dikosongkan di awal tiap segmen (stasiun) pada frame multi-stasiun.
+# Threshold drop boleh per baris (tabel ambang per stasiun/bulan).
+# Jika numba terpasang, kernel dikompilasi (JIT); jika tidak, dipakai versi
+# NumPy tervektorisasi dengan hasil identik.
+
+# 'auto' = numba bila tersedia, selain itu numpy; 'numba' | 'numpy' = paksa
+KERNEL_INTERVAL = 'auto'
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def kernel_interval_hujan(kumulatif, jam_reset, awal_segmen, threshold, interval, raw_diff, reset, prev_missing):
+    """
+    Satu lintasan atas 'rr' kumulatif. Mengisi array keluaran (panjang n):
+    interval, raw_diff (selisih setelah invalidasi), reset (selisih < 0),
+    prev_missing (nilai sebelumnya kosong). Mengembalikan jumlah baris yang
+    diinvalidasi karena mengikuti unexpected drop.
+    """
+    n = kumulatif.shape[0]
+    sebelum_asli = np.nan     # nilai kumulatif asli baris sebelumnya
+    sebelum = np.nan          # nilai kumulatif baris sebelumnya setelah invalidasi
+    drop_sebelumnya = False
+    jumlah_invalid = 0
+    for i in range(n):
+        if awal_segmen[i]:
+            sebelum_asli = np.nan
+            sebelum = np.nan
+            drop_sebelumnya = False
+        asli = kumulatif[i]
+        nilai = asli
+        if drop_sebelumnya:
+            nilai = np.nan
+            jumlah_invalid += 1
+        # Unexpected drop dideteksi pada nilai ASLI (kecuali jam reset & data sebelumnya hilang)
+        drop_sebelumnya = (asli - sebelum_asli < threshold[i]) and not jam_reset[i] and not np.isnan(sebelum_asli)
+
+        selisih = nilai - sebelum
+        hilang = np.isnan(sebelum)
+        raw_diff[i] = selisih
+        prev_missing[i] = hilang
+        reset[i] = selisih < 0
+        if selisih < 0:
+            interval[i] = nilai
+        elif hilang:
+            interval[i] = np.nan
+        else:
+            interval[i] = selisih
+        sebelum_asli = asli
+        sebelum = nilai
+    return jumlah_invalid
+
+
+def _interval_hujan_numpy(kumulatif, jam_reset, awal_segmen, threshold):
+    """Versi NumPy tervektorisasi dari kernel_interval_hujan (tanpa numba)."""
+    sebelum_asli = np.concatenate(([np.nan], kumulatif[:-1]))
+    sebelum_asli[awal_segmen] = np.nan
+    drop = (kumulatif - sebelum_asli < threshold) & ~jam_reset & ~np.isnan(sebelum_asli)
+    invalid = np.concatenate(([False], drop[:-1])) & ~awal_segmen
+    nilai = np.where(invalid, np.nan, kumulatif)
+
+    sebelum = np.concatenate(([np.nan], nilai[:-1]))
+    sebelum[awal_segmen] = np.nan
+    raw_diff = nilai - sebelum
+    prev_missing = np.isnan(sebelum)
+    reset = raw_diff < 0
+    interval = np.where(reset, nilai, np.where(prev_missing, np.nan, raw_diff))
+    return interval, raw_diff, reset, prev_missing, int(invalid.sum())
+
+
+_kernel_jit = None
+
+
+def _interval_hujan_numba(kumulatif, jam_reset, awal_segmen, threshold):
+    global _kernel_jit
+    if _kernel_jit is None:
+        _kernel_jit = njit(cache=True, nogil=True)(kernel_interval_hujan)
+    n = len(kumulatif)
+    interval, raw_diff = np.empty(n), np.empty(n)
+    reset, prev_missing = np.empty(n, dtype=bool), np.empty(n, dtype=bool)
+    jumlah_invalid = _kernel_jit(kumulatif, jam_reset, awal_segmen, threshold, interval, raw_diff, reset, prev_missing)
+    return interval, raw_diff, reset, prev_missing, int(jumlah_invalid)
+
+
+def hitung_interval_hujan(kumulatif, jam_reset, threshold=None, kernel=None, awal_segmen=None):
+    """
+    (interval, raw_diff, reset, prev_missing, jumlah_invalid) dari array 'rr' kumulatif
+    (float64) dan mask jam reset (bool), memakai kernel sesuai KERNEL_INTERVAL.
+    `threshold`: skalar atau per baris; `awal_segmen`: baris awal tiap stasiun (default baris 0).
+    """
+    threshold = UNEXPECTED_DROP_THRESHOLD if threshold is None else threshold
+    kernel = kernel or KERNEL_INTERVAL
+    kumulatif = np.ascontiguousarray(kumulatif, dtype=np.float64)
+    jam_reset = np.ascontiguousarray(jam_reset, dtype=bool)
+    threshold = np.ascontiguousarray(np.broadcast_to(np.asarray(threshold, dtype=np.float64), kumulatif.shape))
+    if awal_segmen is None:
+        awal_segmen = np.zeros(len(kumulatif), dtype=bool)
+        awal_segmen[:1] = True
+    awal_segmen = np.ascontiguousarray(awal_segmen, dtype=bool)
+    if kernel == 'numba' and njit is None:
+        raise ImportError("KERNEL_INTERVAL='numba' membutuhkan paket 'numba' (pip install numba).")
+    if kernel in ('numba', 'auto') and njit is not None:
+        return _interval_hujan_numba(kumulatif, jam_reset, awal_segmen, threshold)
+    return _interval_hujan_numpy(kumulatif, jam_reset, awal_segmen, threshold)
+
+
+def ambang_drop(ambang):
+    """Threshold unexpected drop: per baris dari tabel ambang (NaN = konfigurasi) atau konstanta."""
+    per_baris = (ambang or {}).get(('drop', 'threshold'))
+    if per_baris is None:
+        return UNEXPECTED_DROP_THRESHOLD
+    return np.where(np.isnan(per_baris), UNEXPECTED_DROP_THRESHOLD, per_baris)
+
+
+def siapkan_interval_hujan(kumulatif, waktu, ambang=None, stasiun_segmen=None):
+    """
+    Menurunkan interval hujan 10 menit dari array nilai kumulatif 'rr' beserta
+    mask pengecualian; jam reset & awal segmen diambil dari fitur waktu bersama
+    `waktu` (lihat qc_waktu.fitur_waktu).
+    `ambang`: threshold per baris dari tabel ambang (kunci ('drop', 'threshold')).
+    Mengembalikan (series, masks) untuk registry QC.
+    """
+    logger.info("🔄 (Hujan) Mempersiapkan data interval...")
+
+    # Pengecualian HANYA untuk jam 00:00/00:10/00:20 (untuk Flag 5)
+    is_hardcoded_reset_time = pada_jam(waktu, HARDCODED_RESET_TIMES)
+
+    interval, raw_diff, is_reset_detected, is_prev_missing, count_invalidated = \
+        hitung_interval_hujan(kumulatif, is_hardcoded_reset_time,
+                              threshold=ambang_drop(ambang), awal_segmen=waktu['awal_segmen'])
+    if count_invalidated > 0:
+        logger.info(f"    -> {count_invalidated} data kumulatif setelah unexpected drop diinvalidasi (diubah jadi NaN).")
+    logger.info("✅ (Hujan) Perhitungan interval & helper selesai.")
+
+    change_unreliable = np.zeros(len(kumulatif), dtype=bool)
+    change_unreliable[1:] = is_prev_missing[:-1]
+    change_unreliable &= ~waktu['awal_segmen']
+
+    series = {'nilai': interval, 'raw_diff': raw_diff}
+    masks = {
+        'asli_hilang': np.isnan(kumulatif),
+        'hardcoded_reset_time': is_hardcoded_reset_time,
+        # Pengecualian untuk SEMUA reset (untuk Flag 3 & 4)
+        'reset_event': is_reset_detected | is_hardcoded_reset_time,
+        'change_unreliable': change_unreliable,
+    }
+    return series, masks
+
+
+def interval_hujan(df, waktu):
+    """
+    Interval hujan 10 menit per baris dari 'rr' kumulatif (seri 'nilai' QC hujan,
+    threshold drop konfigurasi), untuk tahap setelah modul (konsistensi, buddy check).
+    """
+    kumulatif = pd.to_numeric(df[CUMULATIVE_COLUMN], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    interval, *_ = hitung_interval_hujan(kumulatif, pada_jam(waktu, HARDCODED_RESET_TIMES),
+                                         awal_segmen=waktu['awal_segmen'])
+    return interval
+
 
 # =====================================================================
-#   --- 1️⃣ Fungsi-Fungsi QC (Internal untuk Hujan) ---
+#   --- 2️⃣ Daftar Check QC (urutan = prioritas flag) ---
 # =====================================================================
+# Implementasi check ada di qc_registry; seri 'nilai' = interval hujan.
+EXEMPT_PERUBAHAN = ['reset_event', 'change_unreliable']
+
+CHECKS_HUJAN = [
+    {'check': 'missing', 'flag': 9, 'nama': 'Cek Data Kumulatif Asli Hilang', 'mask': 'asli_hilang'},
+    {'check': 'range', 'flag': 1, 'nama': 'Range Check', 'min': RR_MIN_RANGE, 'max': RR_MAX_RANGE},
+    {'check': 'drop', 'flag': 5, 'nama': 'Unexpected Drop Test', 'seri': 'raw_diff',
+     'threshold': UNEXPECTED_DROP_THRESHOLD, 'exempt': ['hardcoded_reset_time']},
+    {'check': 'rapid_change', 'flag': 3, 'nama': 'Rapid Change Test', 'dasar': 'nilai',
+     'threshold': RAPID_CHANGE_THRESHOLD, 'exempt': EXEMPT_PERUBAHAN},
+    {'check': 'spike', 'flag': 4, 'nama': 'Spike Test', 'threshold': RAPID_CHANGE_THRESHOLD,
+     'exempt': EXEMPT_PERUBAHAN, 'hanya_belum_diflag': True, 'flag_tetangga_ditolak': 9},
+    {'check': 'flat_line', 'flag': 2, 'nama': 'Flat Line Test', 'window': FLAT_LINE_WINDOW,
+     'metode': 'spread', 'toleransi': 1e-9, 'min_nilai': FLAT_LINE_MIN_VALUE,
+     'hanya_belum_diflag': True},
+]
+
+# 'rr' di df tidak diubah (interval diturunkan dari salinan numeriknya)
+register_parameter('hujan', kolom=CUMULATIVE_COLUMN, flag_kolom=FLAG_COLUMN, label='Hujan',
+                   checks=CHECKS_HUJAN, siapkan=siapkan_interval_hujan, konversi_numerik=False)
 
-def handle_original_missing_data(df, original_col, flag_col):
-    """Flag 9: Data kumulatif ASLI kosong (NaN)."""
-    print(f"  - (Hujan) Mengecek data kumulatif asli hilang (Flag 9) di '{original_col}'...")
-    cond = df[original_col].isna()
-    count_before = df[flag_col].isna().sum()
-    df.loc[cond & df[flag_col].isna(), flag_col] = 9
-    count_after = df[flag_col].isna().sum()
-    flagged_count = count_before - count_after
-    print(f"    -> {flagged_count} data kumulatif asli hilang ditandai Flag 9.")
-    return df
-
-def range_check(df, col, flag_col, min_val, max_val):
-    """Flag 1: Nilai interval di luar rentang wajar."""
-    print(f"  - (Hujan) Menjalankan Range Check (Flag 1) di '{col}'...")
-    cond_range = (
-        ((df[col] < min_val) | (df[col] > max_val)) &
-        (df[flag_col].isna())
-    )
-    count_flagged = cond_range.sum()
-    if count_flagged > 0:
-        df.loc[cond_range, flag_col] = 1
-        count_max = ((df[col] > max_val) & (df[flag_col] == 1)).sum()
-        count_min = ((df[col] < min_val) & (df[flag_col] == 1)).sum()
-        print(f"    -> {count_max} data interval di atas batas maksimum ({max_val} mm) ditandai Flag 1.")
-        print(f"    -> {count_min} data interval negatif ditandai Flag 1.")
-    else:
-        print("    -> Tidak ada data interval di luar rentang.")
-    return df
-
-def unexpected_drop_test(df, raw_diff_col, flag_col, threshold):
-    """Flag 5: Penurunan nilai kumulatif (raw_diff negatif) yang tidak wajar."""
-    print(f"  - (Hujan) Menjalankan Unexpected Drop Test (Flag 5)...")
-    
-    cond_drop = (
-        (df[raw_diff_col] < threshold) &
-        (~df['is_hardcoded_reset_time_internal']) & 
-        (df[flag_col].isna())
-    )
-    count_flagged = cond_drop.sum()
-    if count_flagged > 0:
-        df.loc[cond_drop, flag_col] = 5
-        print(f"    -> {count_flagged} penurunan tidak wajar terdeteksi (< {threshold} mm) ditandai Flag 5.")
-    else:
-        print("    -> Tidak ada penurunan tidak wajar.")
-    return df
-
-
-def flat_line_test(df, col, flag_col, window, min_value):
-    """Flag 2: Data interval stagnan saat ada hujan (flat line)."""
-    print(f"  - (Hujan) Menjalankan Flat Line Test (Flag 2) di '{col}'...")
-    valid_data = df[col].where(df[flag_col].isna())
-    rolling_std = valid_data.rolling(window=window, min_periods=window).std()
-    cond_end_of_flat = (rolling_std.fillna(1) <= 1e-9) & (df[col] > min_value) & df[flag_col].isna()
-
-    flagged_count = 0
-    indices_to_flag = set()
-    for i in cond_end_of_flat[cond_end_of_flat].index:
-        start_index = max(0, i - window + 1)
-        potential_indices = df.loc[start_index:i].index[df.loc[start_index:i, flag_col].isna()]
-        if not potential_indices.empty:
-             window_data = df.loc[potential_indices, col]
-             if window_data.max() - window_data.min() <= 1e-9 :
-                 indices_to_flag.update(potential_indices.tolist())
-
-    if indices_to_flag:
-        df.loc[list(indices_to_flag), flag_col] = 2
-        flagged_count = len(indices_to_flag)
-        print(f"    -> {flagged_count} data interval stagnan (hujan > {min_value} mm) ditandai Flag 2.")
-    else:
-        print("    -> Tidak ada data interval stagnan saat hujan.")
-    return df
-
-def fixed_rapid_change_test(df, col, flag_col, threshold):
-    """Flag 3: Nilai Interval (Rapid Change) melebihi threshold."""
-    print(f"  - (Hujan) Menjalankan Rapid Change Test (Flag 3) di '{col}'...")
-    
-    is_exempt_for_change = df['is_reset_event_internal'] | df['is_change_unreliable']
-    cond = (
-        (df[col].abs() > threshold) &
-        (df[flag_col].isna()) &
-        (~is_exempt_for_change)
-    )
-    count_flagged = cond.sum()
-    if count_flagged > 0:
-        df.loc[cond, flag_col] = 3
-        print(f"    -> {count_flagged} nilai interval drastis terdeteksi (> {threshold} mm) ditandai Flag 3.")
-    else:
-        print("    -> Tidak ada nilai interval drastis terdeteksi.")
-    return df
-
-def fixed_spike_test(df, col, flag_col, threshold):
-    """Flag 4: Spike (perubahan antar interval) - Mengabaikan reset event dan data kedua setelah missing."""
-    print(f"  - (Hujan) Menjalankan Spike Test (Flag 4) di '{col}'...")
-    valid_data = df[col].where(df[col].notna() & df[flag_col].isna())
-    df['diff_prev_interval'] = valid_data.diff()
-    df['diff_next_interval'] = valid_data.diff(-1)
-    neighbor_prev_is_invalid = df[col].shift(1).isna() | (df[flag_col].shift(1) == 9)
-    neighbor_next_is_invalid = df[col].shift(-1).isna() | (df[flag_col].shift(-1) == 9)
-    is_exempt_for_change = df['is_reset_event_internal'] | df['is_change_unreliable']
-
-    cond = (
-        (df['diff_prev_interval'].abs() > threshold) &
-        (df['diff_next_interval'].abs() > threshold) &
-        (df['diff_prev_interval'] * df['diff_next_interval'] < 0) &
-        (df[flag_col].isna()) &
-        (~neighbor_prev_is_invalid) &
-        (~neighbor_next_is_invalid) &
-        (~is_exempt_for_change)
-    )
-    count_flagged = cond.sum()
-    if count_flagged > 0:
-        df.loc[cond, flag_col] = 4
-        print(f"    -> {count_flagged} spike (perubahan antar interval > {threshold} mm) ditandai Flag 4.")
-    else:
-         print("    -> Tidak ada spike (perubahan antar interval) terdeteksi.")
-    df.drop(columns=['diff_prev_interval', 'diff_next_interval'], inplace=True, errors='ignore')
-    return df
 
 def summary_qc(df, flag_column):
-    """Tampilkan rekap jumlah flag tiap kategori."""
-    print("\n" + "=" * 55)
-    print(f"📊 Ringkasan QC untuk '{flag_column}'")
-    print("=" * 55)
-    summary = df[flag_column].value_counts(dropna=False).sort_index()
+    """Tampilkan rekap jumlah flag tiap kategori (dilewati bila log di atas level INFO)."""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    logger.info("\n" + "=" * 55)
+    logger.info(f"📊 Ringkasan QC untuk '{flag_column}'")
+    logger.info("=" * 55)
+    summary = df[flag_column].value_counts().sort_index()
     total = len(df)
     flag_labels = {
         1: "Di luar rentang", 2: "Stagnan (Hujan)", 3: "Interval Drastis",
         4: "Spike (Perubahan)", 5: "Penurunan Tdk Wajar",
+        6: "Beda dgn Tetangga", 7: "Tidak Konsisten",
         9: "Data Asli Hilang"
     }
     all_possible_flags = sorted(flag_labels.keys())
     summary_dict = summary.to_dict()
 
-    print(f"  {'Flag':<7} {'Keterangan':<20}: {'Jumlah':>7} {'Persentase':>10}")
-    print("-" * 55)
-    good_count = summary_dict.get(np.nan, 0)
-    print(f"  {'':<7} {'Data Baik/Tidak Diuji':<20}: {good_count:>7d} ({good_count/total*100:>9.2f}%)")
+    logger.info(f"  {'Flag':<7} {'Keterangan':<20}: {'Jumlah':>7} {'Persentase':>10}")
+    logger.info("-" * 55)
+    good_count = summary_dict.get(FLAG_BAIK, 0)
+    logger.info(f"  {'':<7} {'Data Baik/Tidak Diuji':<20}: {good_count:>7d} ({good_count/total*100:>9.2f}%)")
     for flag_int in all_possible_flags:
-        count = summary_dict.get(float(flag_int), 0)
+        count = summary_dict.get(flag_int, 0)
         if count > 0:
             label = flag_labels.get(flag_int, "Tidak dikenal")
             fcode = str(flag_int)
-            print(f"  {fcode:<7} {label:<20}: {count:>7d} ({count/total*100:>9.2f}%)")
-    print("-" * 55)
-    print(f"  {'Total':<7} {'':<20}: {total:>7d} ({100.0:>9.2f}%)")
-    print("=" * 55)
+            logger.info(f"  {fcode:<7} {label:<20}: {count:>7d} ({count/total*100:>9.2f}%)")
+    logger.info("-" * 55)
+    logger.info(f"  {'Total':<7} {'':<20}: {total:>7d} ({100.0:>9.2f}%)")
+    logger.info("=" * 55)
 
 
 # =====================================================================
-#   🚀 2️⃣ FUNGSI EKSEKUSI UTAMA (HUJAN)
+#   🚀 3️⃣ FUNGSI EKSEKUSI UTAMA (HUJAN)
 # =====================================================================
 
-def run_qc_hujan(df):
+def run_qc_hujan(df, cache=None, ringkasan=True):
     """
     Menjalankan seluruh proses QC Hujan pada DataFrame yang diberikan.
     DataFrame diasumsikan sudah dibersihkan dan diurutkan berdasarkan 'Tanggal'.
+    Hanya kolom 'rr_flagging' yang ditambahkan ke df.
+    `ringkasan=False`: ringkasan dicetak pemanggil (setelah tahap konsistensi/buddy).
     """
+    if FLAG_COLUMN in df.columns:
+        logger.warning(f"⚠️ Kolom '{FLAG_COLUMN}' sudah ada, akan diinisialisasi ulang.")
 
-    if CUMULATIVE_COLUMN not in df.columns or 'Tanggal' not in df.columns:
-        print(f"❌ (Hujan) Gagal: Kolom '{CUMULATIVE_COLUMN}' atau 'Tanggal' tidak ditemukan.")
+    hasil = run_qc_parameter(df, 'hujan', cache=cache)
+    if hasil is None:
         return df
 
-    print("🔄 (Hujan) Mempersiapkan data interval...")
-    df_hujan = df.copy()
-    df_hujan[ORIGINAL_CUMULATIVE_COLUMN] = df_hujan[CUMULATIVE_COLUMN]
-    df_hujan[CUMULATIVE_COLUMN] = pd.to_numeric(df_hujan[CUMULATIVE_COLUMN], errors='coerce')
-
-    # =================================================================
-    #   --- Hitung curah hujan per 10 menit & Helper Columns ---
-    # =================================================================
-    df_hujan['raw_diff_internal'] = df_hujan[CUMULATIVE_COLUMN].diff()
-    is_prev_missing = df_hujan[CUMULATIVE_COLUMN].shift(1).isnull()
-    is_reset_detected = (df_hujan['raw_diff_internal'] < 0) 
-
-    waktu = df_hujan['Tanggal'].dt.time
-    reset_time_1 = pd.to_datetime('00:00:00').time()
-    reset_time_2 = pd.to_datetime('00:10:00').time()
-    reset_time_3 = pd.to_datetime('00:20:00').time()
-    
-    # --- LOGIKA HELPER ---
-    # Pengecualian HANYA untuk jam 00:00/00:10/00:20 (untuk Flag 5)
-    is_hardcoded_reset_time = (waktu == reset_time_1) | (waktu == reset_time_2) | (waktu == reset_time_3)
-    df_hujan['is_hardcoded_reset_time_internal'] = is_hardcoded_reset_time
-    # Pengecualian untuk SEMUA reset (untuk Flag 3 & 4)
-    df_hujan['is_reset_event_internal'] = is_reset_detected | is_hardcoded_reset_time
-
-    is_untestable_original = is_prev_missing
-    df_hujan['is_change_unreliable'] = is_untestable_original.shift(1).fillna(False)
-
-    # --- Preprocessing: Invalidasi Data Setelah Unexpected Drop ---
-    cond_pre_drop = (
-        (df_hujan['raw_diff_internal'] < UNEXPECTED_DROP_THRESHOLD) &
-        (~df_hujan['is_hardcoded_reset_time_internal']) & # <-- Cek HANYA hardcoded time
-        (~is_prev_missing)
-    )
-    # PERBAIKAN BUG: Gunakan shift(1) untuk invalidasi data SETELAH drop
-    indices_to_invalidate = df_hujan.index[cond_pre_drop.shift(1).fillna(False)]
-    
-    count_invalidated = 0
-    if not indices_to_invalidate.empty:
-        df_hujan.loc[indices_to_invalidate, CUMULATIVE_COLUMN] = np.nan
-        count_invalidated = len(indices_to_invalidate)
-        print(f"    -> {count_invalidated} data kumulatif setelah unexpected drop diinvalidasi (diubah jadi NaN).")
-        
-        is_prev_missing = df_hujan[CUMULATIVE_COLUMN].shift(1).isnull()
-        df_hujan['raw_diff_internal'] = df_hujan[CUMULATIVE_COLUMN].diff()
-        is_reset_detected = (df_hujan['raw_diff_internal'] < 0)
-        df_hujan['is_reset_event_internal'] = is_reset_detected | is_hardcoded_reset_time
-        is_untestable_original = is_prev_missing
-        df_hujan['is_change_unreliable'] = is_untestable_original.shift(1).fillna(False)
-
-      # --- Hitung INTERVAL_COLUMN FINAL ---
-    conditions = [
-        is_reset_detected,             
-        is_prev_missing,                
-    ]
-    choices = [
-        df_hujan[CUMULATIVE_COLUMN],    
-        np.nan,                         
-    ]
-    df_hujan[INTERVAL_COLUMN] = np.select(conditions, choices, default=df_hujan['raw_diff_internal'])
-
-    print("✅ (Hujan) Perhitungan interval & helper selesai.")
-    # =================================================================
-
-    # --- Siapkan kolom flag ---
-    if FLAG_COLUMN in df_hujan.columns:
-        print(f"⚠️ Kolom '{FLAG_COLUMN}' sudah ada, akan diinisialisasi ulang.")
-    df_hujan[FLAG_COLUMN] = np.nan
-    print("\n🔬 (Hujan) Menjalankan Quality Control...")
-
-    # --- Jalankan QC (prioritas flagging) ---
-    df_hujan = handle_original_missing_data(df_hujan, ORIGINAL_CUMULATIVE_COLUMN, FLAG_COLUMN) # Flag 9
-    df_hujan = range_check(df_hujan, INTERVAL_COLUMN, FLAG_COLUMN, RR_MIN_RANGE, RR_MAX_RANGE) # Flag 1
-    df_hujan = unexpected_drop_test(df_hujan, 'raw_diff_internal', FLAG_COLUMN, UNEXPECTED_DROP_THRESHOLD) # Flag 5
-    df_hujan = fixed_rapid_change_test(df_hujan, INTERVAL_COLUMN, FLAG_COLUMN, RAPID_CHANGE_THRESHOLD) # Flag 3
-    df_hujan = fixed_spike_test(df_hujan, INTERVAL_COLUMN, FLAG_COLUMN, RAPID_CHANGE_THRESHOLD) # Flag 4
-    df_hujan = flat_line_test(df_hujan, INTERVAL_COLUMN, FLAG_COLUMN, FLAT_LINE_WINDOW, FLAT_LINE_MIN_VALUE) # Flag 2
-
-    # --- Hapus kolom helper ---
-    kolom_dihapus = [
-        INTERVAL_COLUMN, ORIGINAL_CUMULATIVE_COLUMN, 'raw_diff_internal',
-        'is_reset_event_internal', 'is_hardcoded_reset_time_internal', 'is_change_unreliable'
-    ]
-    df_hujan.drop(columns=kolom_dihapus, inplace=True, errors='ignore')
-    print(f"\nKolom internal sementara telah dihapus.")
-
     # --- Ringkasan hasil ---
-    summary_qc(df_hujan, FLAG_COLUMN)
-
-    # Gabungkan kolom flag kembali ke DataFrame asli (df)
-    df[FLAG_COLUMN] = df_hujan[FLAG_COLUMN]
+    if ringkasan:
+        summary_qc(hasil, FLAG_COLUMN)
 
-    return df 
\ No newline at end of file
+    return hasil
@@ -0,0 +1,103 @@
+import pandas as pd
+import numpy as np
+
+import qc_hujan
+import qc_tekanan
+import qc_radiasi
+from qc_common import BIT_SUFFIX
+from qc_metrik import senyap
+from qc_konsistensi import cek_konsistensi
+
+# =====================================================================
+#   --- ⏱️ QC INKREMENTAL (NEAR-REAL-TIME, PER 10 MENIT) ---
+# =====================================================================
+# Alih-alih menjalankan ulang QC atas seluruh riwayat setiap ada data baru,
+# setiap stasiun menyimpan StatusStasiun: "ekor" berisi 2 x HALO_BARIS baris
+# terakhir + nilai 'pp_air' valid terakhir sebelum ekor (untuk Gap Check).
+#
+# Setiap pembaruan menjalankan modul QC hanya pada (ekor + batch baru),
+# sehingga biayanya O(batch), bukan O(riwayat). Flag yang dikembalikan
+# identik dengan menjalankan ulang QC atas seluruh data hingga saat itu.
+#
+# Catatan: beberapa test melihat baris SESUDAHNYA (spike, flat line yang
+# menandai ke belakang), jadi flag hingga HALO_BARIS baris terakhir masih bisa
+# berubah saat data baru datang. Baris tersebut ikut dikembalikan (revisi).
+
+DATA_COLUMNS = ['Tanggal', 'rr', 'pp_air', 'sr_avg']
+FLAG_COLUMNS = [qc_hujan.FLAG_COLUMN, qc_tekanan.FLAG_COLUMN, qc_radiasi.FLAG_COLUMN]
+# Kolom bitmask check (hanya ada bila qc_registry.bitmask_aktif())
+BIT_COLUMNS = [f'{kolom}{BIT_SUFFIX}' for kolom in DATA_COLUMNS[1:]]
+
+HALO_BARIS = max(qc_hujan.HALO_BARIS, qc_tekanan.HALO_BARIS, qc_radiasi.HALO_BARIS)
+PANJANG_EKOR = 2 * HALO_BARIS
+
+
+class StatusStasiun:
+    """State ringkas QC inkremental untuk satu stasiun."""
+
+    def __init__(self, stasiun=None):
+        self.stasiun = stasiun
+        self.ekor = None                      # DataFrame: PANJANG_EKOR baris mentah terakhir
+        self.pp_air_valid_sebelumnya = np.nan  # nilai 'pp_air' valid terakhir SEBELUM ekor
+        self.jumlah_baris = 0                 # total baris yang sudah diproses
+
+    @property
+    def tanggal_terakhir(self):
+        if self.ekor is None or self.ekor.empty:
+            return None
+        return self.ekor['Tanggal'].iloc[-1]
+
+
+def jalankan_modul(df, pp_air_valid_sebelumnya):
+    """Menjalankan ketiga modul QC + tahap konsistensi pada potongan data (log dimatikan)."""
+    cache = {}
+    with senyap():
+        df = qc_hujan.run_qc_hujan(df, cache=cache, ringkasan=False)
+        df = qc_tekanan.run_qc_tekanan(df, prev_valid=pp_air_valid_sebelumnya, cache=cache, ringkasan=False)
+        df = qc_radiasi.run_qc_radiasi(df, cache=cache, ringkasan=False)
+        df = cek_konsistensi(df, cache)
+    return df
+
+
+def qc_inkremental(status, df_baru):
+    """
+    Menjalankan QC untuk batch data baru dan memperbarui `status`.
+
+    `df_baru` harus sudah disiapkan (kolom bersih, 'Tanggal' datetime) dan
+    seluruhnya lebih baru dari data sebelumnya.
+
+    Mengembalikan DataFrame flag (index = nomor baris global, mulai 0) untuk
+    baris baru ditambah baris lama yang flag-nya mungkin berubah.
+    """
+    kolom = [c for c in DATA_COLUMNS if c in df_baru.columns]
+    df_baru = df_baru[kolom].sort_values('Tanggal').reset_index(drop=True)
+    if df_baru.empty:
+        return pd.DataFrame(columns=['Tanggal'] + FLAG_COLUMNS)
+
+    tanggal_terakhir = status.tanggal_terakhir
+    if tanggal_terakhir is not None and df_baru['Tanggal'].iloc[0] <= tanggal_terakhir:
+        raise ValueError(
+            f"Data baru harus lebih baru dari {tanggal_terakhir} "
+            f"(diterima {df_baru['Tanggal'].iloc[0]}). Gunakan mode patch untuk data terlambat."
+        )
+
+    panjang_ekor = 0 if status.ekor is None else len(status.ekor)
+    frame = df_baru if panjang_ekor == 0 else pd.concat([status.ekor, df_baru], ignore_index=True)
+    hasil = jalankan_modul(frame.copy(), status.pp_air_valid_sebelumnya)
+
+    # Baris yang dikembalikan: revisi (HALO_BARIS terakhir dari ekor lama) + baris baru
+    mulai = max(0, panjang_ekor - HALO_BARIS)
+    offset_global = status.jumlah_baris - panjang_ekor
+    keluaran = hasil.iloc[mulai:][['Tanggal'] + [c for c in FLAG_COLUMNS + BIT_COLUMNS if c in hasil.columns]]
+    keluaran.index = keluaran.index + offset_global
+
+    # --- Perbarui state ---
+    buang = len(frame) - PANJANG_EKOR
+    if buang > 0 and 'pp_air' in frame.columns:
+        pp_dibuang = pd.to_numeric(frame['pp_air'].iloc[:buang], errors='coerce').dropna()
+        if not pp_dibuang.empty:
+            status.pp_air_valid_sebelumnya = pp_dibuang.iloc[-1]
+    status.ekor = frame.iloc[max(buang, 0):].reset_index(drop=True)
+    status.jumlah_baris += len(df_baru)
+
+    return keluaran
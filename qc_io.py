@@ -0,0 +1,353 @@
+import os
+import json
+import pandas as pd
+import numpy as np
+
+from qc_common import FLAG_SUFFIX, BIT_SUFFIX, KOLOM_STASIUN, flag_for_output
+from qc_metrik import logger
+from qc_sqlite import pisah_path, baca_sqlite, tulis_sqlite, baca_sqlite_per_chunk, PenulisSQLite
+
+# =====================================================================
+#   --- 📂 BACKEND I/O (EXCEL, PARQUET, FEATHER, CSV, SQLITE) ---
+# =====================================================================
+# Format dipilih dari ekstensi file, atau dipaksa lewat argumen `fmt`.
+# Parquet & Feather memakai pyarrow (opsional, hanya diimpor saat dipakai).
+# Kolom flag (uint8, 0 = baik) disimpan apa adanya di Parquet/Feather/SQLite;
+# di Excel/CSV kode 0 ditulis sebagai sel kosong seperti sebelumnya.
+# SQLite (qc_sqlite): satu database banyak stasiun, path 'hasil.sqlite#STASIUN'.
+
+FORMAT_BY_EXTENSION = {
+    '.xlsx': 'excel',
+    '.xls': 'excel',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'feather',
+    '.csv': 'csv',
+    '.sqlite': 'sqlite',
+    '.sqlite3': 'sqlite',
+    '.db': 'sqlite',
+}
+SUPPORTED_EXTENSIONS = tuple(FORMAT_BY_EXTENSION)
+
+# Tipe data eksplisit untuk kolom flag CSV (output pipeline ini)
+CSV_DTYPES = {
+    'rr_flagging': 'UInt8',
+    'pp_air_flagging': 'UInt8',
+    'sr_avg_flagging': 'UInt8',
+}
+CSV_DATE_COLUMN = 'Tanggal'
+# Kolom ukur CSV: dibaca apa adanya lalu dikonversi ke float64; sel non-numerik
+# dari ekspor logger (mis. '-') menjadi NaN (Flag 9), bukan error saat baca
+CSV_NUMERIK = ['rr', 'pp_air', 'sr_avg']
+
+# --- Excel: proyeksi kolom & sidecar hasil parse ---
+# Excel hanya dibaca pada kolom yang dipakai QC (+ kolom flag/bitmask, 'stasiun', dan
+# KOLOM_INPUT_TAMBAHAN); tipe data dikonversi saat parse. Hasil parse disimpan
+# sebagai Feather di folder SIDECAR_FOLDER di samping workbook, dengan kunci
+# (mtime, ukuran file, kolom, versi). Run berikutnya atas workbook yang sama
+# membaca sidecar tanpa mem-parse Excel sama sekali.
+KOLOM_INPUT = ['Tanggal', 'rr', 'pp_air', 'sr_avg']
+KOLOM_INPUT_TAMBAHAN = []      # kolom lain yang ikut dibaca & ditulis ke output, mis. ['rh', 'ws']
+SIDECAR_EXCEL = True           # False = selalu parse Excel (tanpa sidecar)
+SIDECAR_FOLDER = '.qc_parsed'
+SIDECAR_VERSI = 2
+
+
+def deteksi_format(path, fmt=None):
+    """Mengembalikan nama format ('excel', 'parquet', 'feather', 'csv', 'sqlite')."""
+    if fmt:
+        if fmt not in FORMAT_BY_EXTENSION.values():
+            raise ValueError(f"Format '{fmt}' tidak dikenal. Pilihan: {sorted(set(FORMAT_BY_EXTENSION.values()))}.")
+        return fmt
+    ext = os.path.splitext(pisah_path(path)[0])[1].lower()
+    if ext not in FORMAT_BY_EXTENSION:
+        raise ValueError(f"Ekstensi '{ext}' tidak dikenal untuk file '{path}'.")
+    return FORMAT_BY_EXTENSION[ext]
+
+
+def _pastikan_pyarrow(fmt):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError(f"Format '{fmt}' membutuhkan paket 'pyarrow' (pip install pyarrow).") from e
+
+
+# --- Pembaca ---
+
+def _nama_kolom(kolom):
+    """Nama kolom seperti main.siapkan_data: tanpa spasi di tepi, spasi -> '_'."""
+    return str(kolom).strip().replace(' ', '_')
+
+def _kolom_excel_dipakai(kolom):
+    kolom = _nama_kolom(kolom)
+    return (kolom in KOLOM_INPUT or kolom in KOLOM_INPUT_TAMBAHAN or kolom == KOLOM_STASIUN
+            or kolom.endswith((FLAG_SUFFIX, BIT_SUFFIX)))
+
+def _parse_excel(path):
+    """Parse Excel pada kolom yang dipakai saja, dengan konversi tipe saat parse."""
+    df = pd.read_excel(path, engine="openpyxl", usecols=_kolom_excel_dipakai)
+    df.columns = [_nama_kolom(c) for c in df.columns]
+    for col in df.columns:
+        if col == CSV_DATE_COLUMN:
+            df[col] = pd.to_datetime(df[col], errors='coerce', utc=True)
+        elif col.endswith(FLAG_SUFFIX):
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('UInt8')
+        elif col.endswith(BIT_SUFFIX):
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('UInt16')
+        elif col in KOLOM_INPUT:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    return df
+
+def _kunci_sidecar(path):
+    st = os.stat(path)
+    return {'versi': SIDECAR_VERSI, 'mtime_ns': st.st_mtime_ns, 'ukuran': st.st_size,
+            'kolom': KOLOM_INPUT + list(KOLOM_INPUT_TAMBAHAN)}
+
+def _path_sidecar(path):
+    folder, nama = os.path.split(os.path.abspath(path))
+    return os.path.join(folder, SIDECAR_FOLDER, f"{nama}.feather")
+
+def _baca_sidecar(sidecar, kunci):
+    """DataFrame dari sidecar bila kuncinya cocok, selain itu None."""
+    try:
+        import pyarrow as pa
+        with pa.memory_map(sidecar) as sumber:
+            reader = pa.ipc.open_file(sumber)
+            meta = (reader.schema.metadata or {}).get(b'qc_sidecar')
+            if meta is None or json.loads(meta) != kunci:
+                return None
+            return reader.read_all().to_pandas()
+    except (ImportError, OSError, ValueError):
+        return None
+
+def _tulis_sidecar(df, sidecar, kunci):
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+    except ImportError:
+        return
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                               b'qc_sidecar': json.dumps(kunci).encode('utf-8')})
+        os.makedirs(os.path.dirname(sidecar), exist_ok=True)
+        sementara = f"{sidecar}.{os.getpid()}.tmp"
+        feather.write_feather(table, sementara, compression='uncompressed')
+        os.replace(sementara, sidecar)
+    except (OSError, pa.ArrowException) as e:
+        # Sidecar hanya percepatan: gagal menulis (mis. folder read-only) tidak menggagalkan run
+        logger.warning(f"⚠️ Sidecar Excel tidak bisa ditulis ({sidecar}): {e}")
+
+def _baca_excel(path):
+    if not SIDECAR_EXCEL:
+        return _parse_excel(path)
+    kunci = _kunci_sidecar(path)
+    sidecar = _path_sidecar(path)
+    df = _baca_sidecar(sidecar, kunci)
+    if df is not None:
+        logger.info(f"  - Memakai hasil parse tersimpan: {sidecar}")
+        return df
+    df = _parse_excel(path)
+    _tulis_sidecar(df, sidecar, kunci)
+    return df
+
+def _baca_parquet(path):
+    _pastikan_pyarrow('parquet')
+    return pd.read_parquet(path, engine="pyarrow")
+
+def _baca_feather(path):
+    _pastikan_pyarrow('feather')
+    return pd.read_feather(path)
+
+def _baca_csv(path):
+    header = pd.read_csv(path, nrows=0).columns
+    dtypes = {c: t for c, t in CSV_DTYPES.items() if c in header}
+    return _parse_csv(pd.read_csv(path, dtype=dtypes))
+
+def _parse_csv(df):
+    """Kolom ukur -> float64 (non-numerik -> NaN) dan 'Tanggal' ISO -> datetime UTC."""
+    for col in CSV_NUMERIK:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    if CSV_DATE_COLUMN in df.columns:
+        # Parse cepat untuk format ISO (output pipeline ini); format lain
+        # dibiarkan sebagai teks dan diparse oleh tahap persiapan data.
+        tanggal = pd.to_datetime(df[CSV_DATE_COLUMN], errors='coerce', utc=True, format='ISO8601')
+        if tanggal.isna().sum() == df[CSV_DATE_COLUMN].isna().sum():
+            df[CSV_DATE_COLUMN] = tanggal
+    return df
+
+
+# --- Penulis ---
+
+def _flag_kosong(df):
+    """Salinan dangkal df dengan kolom flag 0 -> kosong (untuk Excel/CSV)."""
+    kolom_flag = [c for c in df.columns if str(c).endswith(FLAG_SUFFIX)]
+    if not kolom_flag:
+        return df
+    return df.assign(**{c: flag_for_output(df[c]) for c in kolom_flag})
+
+def _tulis_excel(df, path):
+    # Excel tidak mendukung zona waktu -> lepas tz (nilai tetap UTC) pada salinan,
+    # df pemanggil (arsip, rekap, nilai kembali) tetap ber-tz
+    naif = {col: df[col].dt.tz_localize(None) for col in df.select_dtypes(include=["datetimetz"]).columns}
+    _flag_kosong(df).assign(**naif).to_excel(path, index=False, engine="openpyxl")
+
+def _tulis_parquet(df, path):
+    _pastikan_pyarrow('parquet')
+    df.to_parquet(path, index=False, engine="pyarrow")
+
+def _tulis_feather(df, path):
+    _pastikan_pyarrow('feather')
+    df.reset_index(drop=True).to_feather(path)
+
+def _siapkan_csv(df):
+    """
+    Kolom flag 0 -> kosong, dan kolom datetime ber-tz -> teks ISO-8601 UTC.
+    Format teks dilakukan sekaligus lewat NumPy; date_format milik to_csv
+    memformat per baris dan mendominasi waktu tulis CSV.
+    """
+    df = _flag_kosong(df)
+    kolom_tz = df.select_dtypes(include=["datetimetz"]).columns
+    if len(kolom_tz) == 0:
+        return df
+    teks = {}
+    for col in kolom_tz:
+        utc = df[col].dt.tz_convert('UTC').dt.tz_localize(None).to_numpy()
+        teks[col] = np.where(np.isnat(utc), '', np.char.add(np.datetime_as_string(utc, unit='s'), '+00:00'))
+    return df.assign(**teks)
+
+def _tulis_csv(df, path):
+    # Tanggal ditulis ISO-8601 lengkap dengan offset zona waktu
+    _siapkan_csv(df).to_csv(path, index=False)
+
+
+READERS = {'excel': _baca_excel, 'parquet': _baca_parquet, 'feather': _baca_feather, 'csv': _baca_csv,
+           'sqlite': baca_sqlite}
+WRITERS = {'excel': _tulis_excel, 'parquet': _tulis_parquet, 'feather': _tulis_feather, 'csv': _tulis_csv,
+           'sqlite': tulis_sqlite}
+
+
+def baca_data(path, fmt=None, tanpa_flag=False):
+    """
+    Membaca file input dengan backend sesuai ekstensi (atau `fmt`).
+    `tanpa_flag`: SQLite tidak memilih kolom flag (run QC ulang tidak membutuhkannya).
+    """
+    fmt = deteksi_format(path, fmt)
+    if fmt == 'sqlite':
+        return baca_sqlite(path, tanpa_flag=tanpa_flag)
+    return READERS[fmt](path)
+
+
+def tulis_data(df, path, fmt=None, stasiun=None):
+    """
+    Menulis DataFrame dengan backend sesuai ekstensi (atau `fmt`).
+    `stasiun`: nama stasiun untuk SQLite bila tidak ada di path ('#STASIUN').
+    """
+    fmt = deteksi_format(path, fmt)
+    if fmt == 'sqlite':
+        tulis_sqlite(df, path, stasiun)
+        return
+    WRITERS[fmt](df, path)
+
+
+# =====================================================================
+#   --- 🧱 BACA/TULIS BERTAHAP (PER CHUNK) ---
+# =====================================================================
+# Dipakai mode chunk (out-of-core): memori puncak dibatasi ukuran chunk.
+# Parquet/Feather/CSV dibaca & ditulis benar-benar bertahap. Excel tidak
+# bisa di-stream: dibaca utuh lalu dipotong, dan tidak didukung sebagai output.
+
+def _gabung_batch_arrow(batches, ukuran_chunk):
+    """Menggabungkan record batch pyarrow menjadi DataFrame berukuran ~ukuran_chunk baris."""
+    import pyarrow as pa
+    kumpulan, jumlah = [], 0
+    for batch in batches:
+        kumpulan.append(batch)
+        jumlah += batch.num_rows
+        if jumlah >= ukuran_chunk:
+            yield pa.Table.from_batches(kumpulan).to_pandas()
+            kumpulan, jumlah = [], 0
+    if kumpulan:
+        yield pa.Table.from_batches(kumpulan).to_pandas()
+
+
+def baca_data_per_chunk(path, ukuran_chunk, fmt=None, tanpa_flag=False):
+    """Generator DataFrame berurutan, masing-masing sekitar `ukuran_chunk` baris."""
+    fmt = deteksi_format(path, fmt)
+    if fmt == 'sqlite':
+        yield from baca_sqlite_per_chunk(path, ukuran_chunk, tanpa_flag=tanpa_flag)
+    elif fmt == 'csv':
+        header = pd.read_csv(path, nrows=0).columns
+        dtypes = {c: t for c, t in CSV_DTYPES.items() if c in header}
+        for chunk in pd.read_csv(path, dtype=dtypes, chunksize=ukuran_chunk):
+            yield _parse_csv(chunk)
+    elif fmt == 'parquet':
+        _pastikan_pyarrow(fmt)
+        import pyarrow.parquet as pq
+        yield from _gabung_batch_arrow(pq.ParquetFile(path).iter_batches(batch_size=ukuran_chunk), ukuran_chunk)
+    elif fmt == 'feather':
+        _pastikan_pyarrow(fmt)
+        import pyarrow as pa
+        with pa.memory_map(path) as sumber:
+            reader = pa.ipc.open_file(sumber)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+            yield from _gabung_batch_arrow(batches, ukuran_chunk)
+    else:
+        df = READERS[fmt](path)
+        for mulai in range(0, len(df), ukuran_chunk):
+            yield df.iloc[mulai:mulai + ukuran_chunk]
+
+
+class PenulisBertahap:
+    """Menulis DataFrame chunk demi chunk ke satu file output (Parquet/Feather/CSV/SQLite)."""
+
+    def __init__(self, path, fmt=None, stasiun=None):
+        self.path = path
+        self.fmt = deteksi_format(path, fmt)
+        if self.fmt == 'excel':
+            raise ValueError("Output Excel tidak mendukung penulisan bertahap. Gunakan Parquet, Feather, CSV, atau SQLite.")
+        if self.fmt in ('parquet', 'feather'):
+            _pastikan_pyarrow(self.fmt)
+        self._writer = PenulisSQLite(path, stasiun) if self.fmt == 'sqlite' else None
+        self._schema = None
+        self._header_ditulis = False
+
+    def tulis(self, df):
+        if self.fmt == 'sqlite':
+            self._writer.tulis(df)
+            return
+        if self.fmt == 'csv':
+            _siapkan_csv(df).to_csv(self.path, index=False, mode='a' if self._header_ditulis else 'w',
+                                    header=not self._header_ditulis)
+            self._header_ditulis = True
+            return
+
+        import pyarrow as pa
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self._schema = table.schema
+            if self.fmt == 'parquet':
+                import pyarrow.parquet as pq
+                self._writer = pq.ParquetWriter(self.path, self._schema)
+            else:
+                self._writer = pa.ipc.new_file(self.path, self._schema)
+        else:
+            # Samakan skema dengan chunk pertama (mis. kolom yang semuanya NaN)
+            table = table.cast(self._schema)
+        self._writer.write_table(table)
+
+    def tutup(self):
+        if self._writer is not None:
+            if self.fmt == 'sqlite':
+                self._writer.tutup()
+            else:
+                self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.tutup()
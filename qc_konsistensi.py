@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+
+from qc_common import FLAG_BAIK
+from qc_registry import PARAMETERS, register_tahap, tandai_bit_tahap
+from qc_waktu import fitur_waktu
+from qc_metrik import logger, ukur, hitung_flag
+import qc_hujan
+import qc_tekanan
+import qc_radiasi
+
+# =====================================================================
+#   --- 🔗 KONSISTENSI ANTAR PARAMETER (SETELAH MODUL QC) ---
+# =====================================================================
+# Modul hujan, tekanan, dan radiasi masing-masing hanya melihat kolomnya
+# sendiri, padahal kesalahannya sering berkorelasi. Tahap ini berjalan SEKALI
+# setelah ketiga modul pada frame yang sama, memakai kolom flag yang sudah ada
+# plus nilai mentah (tanpa menjalankan ulang modul), dalam satu pass NumPy:
+#
+#   - hujan saat cerah     : interval hujan >= KONSISTENSI_HUJAN_LEBAT
+#                            bersamaan dengan radiasi >= KONSISTENSI_RADIASI_CERAH,
+#                            keduanya belum ber-flag -> Flag 7 pada 'rr' & 'sr_avg';
+#   - data hilang serentak : semua parameter pada baris itu ber-flag "hilang"
+#                            (logger mati/reboot, bukan sensor). Flag hilang (9)
+#                            TIDAK diubah: jumlah baris & periode logger mati
+#                            hanya dicatat ke log dan metrik ('logger_mati').
+#
+# Flag 7 dipakai hanya untuk kombinasi yang tidak fisis. Setiap aturan hanya
+# melihat baris itu sendiri (interval hujan dari modul hujan), sehingga
+# hasilnya sama pada mode tunggal, chunk, cache, dan patch.
+# Flag 7 lama dikembalikan dulu (ke flag hilang bila nilainya kosong, selain
+# itu ke data baik) sebelum aturan diterapkan: tahap ini aman dijalankan ulang
+# atas data hasil QC (mis. setelah patch, juga hasil versi lama yang menandai
+# logger mati dengan Flag 7). Jika kolom bitmask '<kolom>_qcbit' ada, baris
+# Flag 7 juga menyalakan BIT_KONSISTENSI (bit cadangan 14).
+#
+# Tahap ini bisa dimatikan per run lewat atur_konsistensi(False) (main.py:
+# CEK_KONSISTENSI / --tanpa-konsistensi); flag modul lalu dikembalikan apa adanya.
+
+FLAG_KONSISTENSI = 7
+BIT_KONSISTENSI = register_tahap('konsistensi', 14, FLAG_KONSISTENSI)
+
+KONSISTENSI_MIN_PARAMETER = 2       # data hilang serentak: minimal parameter yang ada di frame
+KONSISTENSI_HUJAN_LEBAT = 5.0       # mm per 10 menit (30 mm/jam)
+KONSISTENSI_RADIASI_CERAH = 700.0   # W/m², matahari penuh
+
+# True = tahap konsistensi dijalankan setelah modul QC; diatur per run lewat atur_konsistensi
+CEK_KONSISTENSI = True
+_AKTIF = CEK_KONSISTENSI
+
+
+def atur_konsistensi(aktif=CEK_KONSISTENSI):
+    """Mengaktifkan/mematikan tahap konsistensi antar parameter (berlaku per proses)."""
+    global _AKTIF
+    _AKTIF = bool(aktif)
+
+
+def konsistensi_aktif():
+    return _AKTIF
+
+
+def konfigurasi_konsistensi():
+    """Threshold tahap konsistensi (untuk hash konfigurasi cache)."""
+    return {
+        'aktif': _AKTIF,
+        'flag': FLAG_KONSISTENSI,
+        'min_parameter': KONSISTENSI_MIN_PARAMETER,
+        'hujan_lebat': KONSISTENSI_HUJAN_LEBAT,
+        'radiasi_cerah': KONSISTENSI_RADIASI_CERAH,
+    }
+
+
+def _flag_hilang(nama):
+    """Kode flag check 'missing' parameter terdaftar (None jika tidak ada)."""
+    return next((cfg['flag'] for cfg in PARAMETERS[nama]['checks'] if cfg['check'] == 'missing'), None)
+
+
+def _nilai(df, kolom):
+    return pd.to_numeric(df[kolom], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
+
+def _periode(mask, tanggal):
+    """Rentang [awal, akhir] (ISO) setiap blok baris True pada `mask`."""
+    tepi = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    awal, akhir = np.flatnonzero(tepi == 1), np.flatnonzero(tepi == -1) - 1
+    return [[tanggal.iloc[a].isoformat(), tanggal.iloc[b].isoformat()] for a, b in zip(awal, akhir)]
+
+
+def _interval_hujan(df, cache):
+    """Interval hujan dari cache run modul hujan, atau dihitung dari 'rr' bila tidak ada."""
+    seri = cache.get(('seri', 'hujan'))
+    if seri is not None and len(seri['nilai']) == len(df):
+        return seri['nilai']
+    return qc_hujan.interval_hujan(df, fitur_waktu(df['Tanggal'], cache))
+
+
+def cek_konsistensi(df, cache=None):
+    """
+    Menandai FLAG_KONSISTENSI pada kolom flag df (hasil modul QC) untuk
+    kombinasi hujan/radiasi yang tidak fisis, dan mencatat periode data hilang
+    serentak (logger mati) tanpa mengubah flag hilangnya.
+    `cache`: cache bersama run modul (interval hujan & fitur waktu dipakai ulang).
+    Mengembalikan df (tidak diubah bila tahap ini dimatikan).
+    """
+    if not _AKTIF:
+        return df
+    cache = {} if cache is None else cache
+    aktif = [(nama, p['kolom'], p['flag_kolom']) for nama, p in PARAMETERS.items()
+             if p['kolom'] in df.columns and p['flag_kolom'] in df.columns]
+    if not aktif or 'Tanggal' not in df.columns:
+        return df
+    n = len(df)
+
+    with ukur('tahap', 'konsistensi', n) as catatan:
+        flags, kosong = {}, {}
+        for nama, kolom, flag_kolom in aktif:
+            f = df[flag_kolom].to_numpy().copy()
+            kosong[nama] = np.isnan(_nilai(df, kolom))
+            # Flag 7 run sebelumnya dikembalikan ke flag asal
+            lama = f == FLAG_KONSISTENSI
+            if lama.any():
+                f[lama] = np.where(kosong[nama][lama], _flag_hilang(nama) or FLAG_BAIK, FLAG_BAIK)
+            flags[nama] = f
+
+        # --- Data hilang serentak (logger): hanya dicatat, flag hilang tetap ---
+        serentak = np.zeros(n, dtype=bool)
+        dengan_hilang = [nama for nama, _, _ in aktif if _flag_hilang(nama) is not None]
+        if len(dengan_hilang) >= KONSISTENSI_MIN_PARAMETER:
+            serentak[:] = True
+            for nama in dengan_hilang:
+                serentak &= (flags[nama] == _flag_hilang(nama)) & kosong[nama]
+
+        # --- Hujan lebat saat radiasi penuh ---
+        cerah = np.zeros(n, dtype=bool)
+        if 'hujan' in flags and 'radiasi' in flags:
+            with np.errstate(invalid='ignore'):
+                cerah = ((_interval_hujan(df, cache) >= KONSISTENSI_HUJAN_LEBAT)
+                         & (_nilai(df, qc_radiasi.COLUMN_TO_CHECK) >= KONSISTENSI_RADIASI_CERAH)
+                         & (flags['hujan'] == FLAG_BAIK) & (flags['radiasi'] == FLAG_BAIK))
+            flags['hujan'][cerah] = FLAG_KONSISTENSI
+            flags['radiasi'][cerah] = FLAG_KONSISTENSI
+
+        for nama, _, flag_kolom in aktif:
+            df[flag_kolom] = flags[nama]
+            tandai_bit_tahap(df, PARAMETERS[nama]['bit_kolom'], BIT_KONSISTENSI,
+                             flags[nama] == FLAG_KONSISTENSI, ganti=True)
+        logger_mati = _periode(serentak, df['Tanggal'])
+        catatan.update({'hilang_serentak': int(np.count_nonzero(serentak)), 'logger_mati': logger_mati,
+                        'hujan_saat_cerah': int(np.count_nonzero(cerah))})
+
+    logger.info(f"\n🔗 Konsistensi antar parameter: {np.count_nonzero(serentak)} baris data hilang serentak "
+                f"({len(logger_mati)} periode logger mati, flag hilang dipertahankan), "
+                f"{np.count_nonzero(cerah)} baris hujan lebat saat radiasi penuh (Flag {FLAG_KONSISTENSI}).")
+    for awal, akhir in logger_mati:
+        logger.debug(f"    -> Logger mati: {awal} s.d. {akhir}")
+    return df
+
+
+# =====================================================================
+#   --- 📊 RINGKASAN AKHIR (SETELAH SEMUA TAHAP) ---
+# =====================================================================
+
+def ringkasan_akhir(df, catatan_modul=None):
+    """
+    Mencetak summary_qc tiap modul atas flag AKHIR df, yaitu setelah tahap
+    konsistensi (dan buddy check), sehingga Flag 6/7 ikut terhitung.
+    `catatan_modul`: {kolom flag: catatan metrik modul}; 'jumlah_flag'-nya
+    diisi dari flag akhir yang sama.
+    """
+    catatan_modul = catatan_modul or {}
+    for modul in (qc_hujan, qc_tekanan, qc_radiasi):
+        if modul.FLAG_COLUMN not in df.columns:
+            continue
+        modul.summary_qc(df, modul.FLAG_COLUMN)
+        if modul.FLAG_COLUMN in catatan_modul:
+            catatan_modul[modul.FLAG_COLUMN]['jumlah_flag'] = hitung_flag(df[modul.FLAG_COLUMN].to_numpy())
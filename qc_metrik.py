@@ -0,0 +1,196 @@
+import io
+import sys
+import json
+import time
+import logging
+import cProfile
+import pstats
+import contextlib
+import numpy as np
+
+from qc_common import FLAG_BAIK
+
+# =====================================================================
+#   --- 📈 LOG, METRIK & PROFILING QC ---
+# =====================================================================
+# Semua pesan konsol QC lewat logger 'qc' (bukan print), sehingga tingkat
+# kerincian bisa diatur per run, termasuk dimatikan total ('senyap') di
+# mode batch agar output konsol tidak memperlambat ratusan stasiun.
+#
+# Setiap check, modul, dan tahap dicatat (waktu, jumlah baris, jumlah flag)
+# ke MetrikRun yang aktif; hasilnya bisa disimpan sebagai laporan JSON.
+#
+#   with kumpulkan_metrik('stasiun_A') as metrik:
+#       df = jalankan_semua_qc(df)
+#   metrik.simpan_json('laporan_qc.json')
+#
+# Hook profiling: fungsi `hook(catatan)` yang didaftarkan lewat tambah_hook()
+# dipanggil setiap kali satu pengukuran selesai; profil_cprofile() membungkus
+# run dengan cProfile.
+
+LOGGER_NAME = 'qc'
+LEVEL_SENYAP = logging.CRITICAL + 10
+LEVEL_LOG = {
+    'debug': logging.DEBUG, 'info': logging.INFO, 'warning': logging.WARNING,
+    'error': logging.ERROR, 'senyap': LEVEL_SENYAP,
+}
+
+
+class _HandlerStdout(logging.StreamHandler):
+    """StreamHandler yang selalu menulis ke sys.stdout saat ini (ikut contextlib.redirect_stdout)."""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, _):
+        pass
+
+
+logger = logging.getLogger(LOGGER_NAME)
+if not logger.handlers:
+    _handler = _HandlerStdout()
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def atur_log(level):
+    """Mengatur tingkat log: 'debug', 'info', 'warning', 'error', 'senyap', atau angka logging."""
+    if isinstance(level, str):
+        level = LEVEL_LOG[level.lower()]
+    logger.setLevel(level)
+
+
+@contextlib.contextmanager
+def senyap():
+    """Mematikan log QC sementara (mis. di dalam mesin inkremental atau benchmark)."""
+    level_lama = logger.level
+    logger.setLevel(LEVEL_SENYAP)
+    try:
+        yield
+    finally:
+        logger.setLevel(level_lama)
+
+
+# =====================================================================
+#   --- ⏱️ Metrik Run ---
+# =====================================================================
+
+class MetrikRun:
+    """Kumpulan catatan pengukuran satu run (satu file / satu stasiun)."""
+
+    def __init__(self, nama=None):
+        self.nama = nama
+        self.catatan = []
+        self.waktu_mulai = time.time()
+        self._mulai = time.perf_counter()
+
+    def tambah(self, catatan):
+        self.catatan.append(catatan)
+
+    def ringkasan(self):
+        """Total detik per kategori ('tahap', 'modul', 'check', ...)."""
+        total = {}
+        for c in self.catatan:
+            total[c['kategori']] = round(total.get(c['kategori'], 0.0) + c['detik'], 6)
+        return total
+
+    def laporan(self):
+        return {
+            'nama': self.nama,
+            'mulai': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.waktu_mulai)),
+            'durasi_detik': round(time.perf_counter() - self._mulai, 6),
+            'ringkasan_detik': self.ringkasan(),
+            'catatan': self.catatan,
+        }
+
+    def simpan_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.laporan(), f, indent=2, ensure_ascii=False)
+        return path
+
+
+_AKTIF = []     # tumpukan MetrikRun aktif; catatan masuk ke yang teratas
+HOOKS = []      # fungsi hook(catatan) untuk profiling
+
+
+def metrik_aktif():
+    return _AKTIF[-1] if _AKTIF else None
+
+
+@contextlib.contextmanager
+def kumpulkan_metrik(nama=None):
+    """Mengaktifkan MetrikRun baru selama blok `with`."""
+    metrik = MetrikRun(nama)
+    _AKTIF.append(metrik)
+    try:
+        yield metrik
+    finally:
+        _AKTIF.remove(metrik)
+
+
+def tambah_hook(hook):
+    """Mendaftarkan hook profiling `hook(catatan)`; mengembalikan hook (bisa dipakai sebagai dekorator)."""
+    HOOKS.append(hook)
+    return hook
+
+
+def hapus_hook(hook):
+    if hook in HOOKS:
+        HOOKS.remove(hook)
+
+
+@contextlib.contextmanager
+def ukur(kategori, nama, jumlah_baris=None, **info):
+    """
+    Mengukur waktu blok `with`. Yield dict catatan; pemanggil boleh menambah
+    isian (mis. catatan['jumlah_ditandai']). Catatan disimpan ke MetrikRun
+    aktif dan diteruskan ke semua hook, juga bila blok gagal.
+    """
+    catatan = {'kategori': kategori, 'nama': nama, 'jumlah_baris': jumlah_baris, **info}
+    mulai = time.perf_counter()
+    try:
+        yield catatan
+    finally:
+        catatan['detik'] = round(time.perf_counter() - mulai, 6)
+        tambah_catatan(catatan)
+
+
+def tambah_catatan(catatan):
+    """Meneruskan catatan yang sudah jadi (mis. dari proses worker) ke MetrikRun aktif & hook."""
+    metrik = metrik_aktif()
+    if metrik is not None:
+        metrik.tambah(catatan)
+    for hook in HOOKS:
+        hook(catatan)
+
+
+def hitung_flag(flags):
+    """{kode_flag: jumlah} untuk flag selain FLAG_BAIK."""
+    jumlah = np.bincount(np.asarray(flags, dtype=np.int64))
+    return {int(kode): int(n) for kode, n in enumerate(jumlah) if kode != FLAG_BAIK and n}
+
+
+@contextlib.contextmanager
+def profil_cprofile(path=None, baris_cetak=25):
+    """
+    Membungkus blok `with` dengan cProfile. Jika `path` diisi, statistik
+    disimpan (bisa dibuka dengan snakeviz / pstats); ringkasan fungsi
+    terlama dicetak pada level DEBUG.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path:
+            profiler.dump_stats(path)
+            logger.info(f"🧭 Profil cProfile disimpan di: {path}")
+        if logger.isEnabledFor(logging.DEBUG):
+            buffer = io.StringIO()
+            pstats.Stats(profiler, stream=buffer).sort_stats('cumulative').print_stats(baris_cetak)
+            logger.debug(buffer.getvalue())
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+from qc_common import KOLOM_STASIUN
+from qc_waktu import fitur_waktu, snap_grid
+from qc_ambang import bulan_dari_fitur
+from qc_registry import PARAMETERS
+from qc_metrik import logger, ukur
+from qc_spasial import buddy_check
+from qc_konsistensi import cek_konsistensi, ringkasan_akhir
+import qc_hujan
+import qc_tekanan
+import qc_radiasi
+
+# =====================================================================
+#   --- 🏙️ QC FRAME MULTI-STASIUN (SATU PASS TERVEKTORISASI) ---
+# =====================================================================
+# Banyak stasiun (mis. satu query SQLite tanpa '#stasiun', atau CSV dengan
+# kolom 'stasiun') di-QC sebagai SATU frame yang diurutkan per (stasiun,
+# Tanggal), alih-alih satu run per stasiun:
+#
+#   - setiap stasiun = satu segmen (fitur 'awal_segmen'): shift, diff, gap,
+#     jendela flat line, dan interval hujan tidak melintasi batas stasiun;
+#   - threshold per baris dari tabel ambang (qc_ambang) disebar sekali per
+#     parameter, lalu range / rapid change / spike / drop tetap satu operasi
+#     NumPy atas seluruh frame.
+#
+# Flag tiap stasiun identik dengan QC stasiun itu sendirian dengan ambang
+# yang sama. Lokasi radiasi per segmen diambil dari qc_radiasi.LOKASI_STASIUN.
+# Setelah modul QC, tahap konsistensi antar parameter (qc_konsistensi)
+# dijalankan sekali atas seluruh frame. Jika metadata stasiun (koordinat)
+# diberikan, buddy check spasial antar stasiun tetangga (qc_spasial) menyusul.
+# Ringkasan & jumlah flag tiap modul dihitung setelah kedua tahap itu.
+
+# Urutan modul (sama seperti main.MODUL_QC)
+MODUL_MULTI = [
+    ('hujan', qc_hujan.run_qc_hujan),
+    ('tekanan', qc_tekanan.run_qc_tekanan),
+    ('radiasi', qc_radiasi.run_qc_radiasi),
+]
+
+
+def segmen_stasiun(df):
+    """
+    (kode stasiun per baris, daftar stasiun, mask awal segmen) dari kolom 'stasiun'.
+    df harus berurutan per stasiun (setiap stasiun satu blok baris).
+    """
+    kode, daftar = pd.factorize(df[KOLOM_STASIUN].astype(str), sort=False)
+    awal = np.ones(len(df), dtype=bool)
+    awal[1:] = kode[1:] != kode[:-1]
+    if np.count_nonzero(awal) != len(daftar):
+        raise ValueError("Frame multi-stasiun harus berurutan per stasiun lalu 'Tanggal'.")
+    return kode, list(daftar), awal
+
+
+def snap_grid_multi(df, isi_gap=True):
+    """snap_grid() per stasiun pada frame yang sudah berurutan (stasiun, Tanggal); info dijumlahkan."""
+    total = {'duplikat_dibuang': 0, 'baris_disisipkan': 0, 'jumlah_gap': 0, 'gap_terpanjang_menit': 0}
+    bagian = []
+    for stasiun, grup in df.groupby(KOLOM_STASIUN, sort=False):
+        hasil, info = snap_grid(grup, isi_gap=isi_gap)
+        hasil[KOLOM_STASIUN] = stasiun     # baris sisipan ikut diberi nama stasiun
+        bagian.append(hasil)
+        for k, v in info.items():
+            total[k] = max(total[k], v) if k == 'gap_terpanjang_menit' else total[k] + v
+    if not bagian:
+        return df, total
+    return pd.concat(bagian, ignore_index=True), total
+
+
+def run_qc_multi_stasiun(df, tabel=None, meta=None):
+    """
+    Menjalankan ketiga modul QC pada frame multi-stasiun (sudah disiapkan,
+    berurutan per stasiun lalu 'Tanggal'). `tabel`: TabelAmbang (opsional).
+    `meta`: metadata stasiun (qc_spasial.baca_metadata_stasiun) untuk buddy check.
+    Modul yang gagal dicatat dan dilewati, seperti main.jalankan_semua_qc.
+    """
+    kode, daftar, awal = segmen_stasiun(df)
+    logger.info(f"\n🏙️ QC multi-stasiun: {len(daftar)} stasiun, {len(df)} baris.")
+    cache = {}
+    with ukur('siapkan', 'multi_stasiun', len(df), jumlah_stasiun=len(daftar)):
+        fitur = fitur_waktu(df['Tanggal'], cache, awal_segmen=awal)
+        bulan = bulan_dari_fitur(fitur) if tabel is not None else None
+        for nama in PARAMETERS:
+            # Selalu diisi (juga {}), agar ambang stasiun aktif run tunggal tidak terpakai
+            cache[('ambang', nama)] = tabel.per_baris(nama, kode, daftar, bulan) if tabel is not None else {}
+
+    catatan_modul = {}
+    for nama, fn in MODUL_MULTI:
+        with ukur('modul', fn.__name__, len(df)) as catatan:
+            try:
+                df = fn(df, cache=cache, ringkasan=False)
+                catatan_modul[PARAMETERS[nama]['flag_kolom']] = catatan
+            except Exception as e:
+                catatan['error'] = f"{type(e).__name__}: {e}"
+                logger.error(f"❌ ERROR saat menjalankan {fn.__name__}: {e}")
+    df = cek_konsistensi(df, cache)
+    if meta is not None:
+        df = buddy_check(df, meta)
+    ringkasan_akhir(df, catatan_modul)
+    return df
@@ -0,0 +1,141 @@
+import time
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from qc_metrik import logger, senyap, ukur, kumpulkan_metrik, tambah_catatan
+from qc_waktu import fitur_waktu
+from qc_registry import PARAMETERS, atur_bitmask, bitmask_aktif
+from qc_ambang import atur_ambang, ambang_aktif
+from qc_konsistensi import cek_konsistensi, ringkasan_akhir
+import qc_hujan
+import qc_tekanan
+import qc_radiasi
+
+# =====================================================================
+#   --- 🧵 MODUL QC PARALEL (HUJAN, TEKANAN, RADIASI SEKALIGUS) ---
+# =====================================================================
+# Ketiga modul membaca kolom yang berbeda ('rr', 'pp_air', 'sr_avg') dan
+# masing-masing hanya menulis kolom flag-nya sendiri, jadi bisa berjalan
+# bersamaan. Setiap modul menerima salinan sempit ['Tanggal', <kolom>] plus
+# fitur waktu yang sudah dihitung; hasilnya (kolom data yang dikonversi ke
+# numerik + kolom flag, + kolom bitmask bila aktif) digabung kembali ke df dengan urutan tetap, sehingga
+# output identik dengan menjalankan modul secara berurutan.
+#
+# mode 'thread' : tanpa salin antar proses; kernel NumPy/pandas melepas GIL
+# mode 'process': isolasi penuh, biaya pickle kolom (cocok untuk data besar).
+#                 Pengaturan per run (lokasi radiasi, tabel ambang, bitmask) dikirim
+#                 ke setiap worker lewat initializer, jadi hasilnya sama untuk
+#                 start method fork, spawn, maupun forkserver.
+
+MODE_PARALEL = ('thread', 'process')
+
+# Urutan tetap penggabungan: (parameter terdaftar, modul, fungsi QC)
+MODUL_PARALEL = [
+    ('hujan', qc_hujan, qc_hujan.run_qc_hujan),
+    ('tekanan', qc_tekanan, qc_tekanan.run_qc_tekanan),
+    ('radiasi', qc_radiasi, qc_radiasi.run_qc_radiasi),
+]
+
+
+def _kolom(indeks):
+    """(kolom data, kolom flag) untuk modul ke-`indeks`."""
+    param = PARAMETERS[MODUL_PARALEL[indeks][0]]
+    return param['kolom'], param['flag_kolom']
+
+
+def _kolom_bit(indeks):
+    return PARAMETERS[MODUL_PARALEL[indeks][0]]['bit_kolom']
+
+
+def _atur_worker(lokasi, ambang, bitmask):
+    """Initializer proses worker: menerapkan pengaturan run dari proses utama."""
+    qc_radiasi.atur_lokasi(*lokasi)
+    atur_ambang(*ambang)
+    atur_bitmask(bitmask)
+
+
+def _jalankan_satu_modul(indeks, df_sempit, fitur, di_proses):
+    """
+    Worker: menjalankan satu modul pada df sempit. Mengembalikan
+    (df_hasil, catatan_metrik_proses, error, catatan_modul). Di proses worker,
+    log dimatikan dan metrik dikumpulkan lokal untuk dikirim balik ke proses
+    utama (catatan_modul tetap objek yang sama dengan entrinya di daftar itu).
+    """
+    fn = MODUL_PARALEL[indeks][2]
+    kolom, flag_kolom = _kolom(indeks)
+    cache = {('Tanggal', 'fitur'): fitur}
+
+    def jalankan():
+        with ukur('modul', fn.__name__, len(df_sempit)) as catatan:
+            try:
+                hasil = fn(df_sempit, cache=cache, ringkasan=False)
+                kolom_hasil = [c for c in (kolom, flag_kolom, _kolom_bit(indeks)) if c in hasil.columns]
+                return hasil[kolom_hasil], None, catatan
+            except Exception as e:
+                catatan['error'] = f"{type(e).__name__}: {e}"
+                return None, e, catatan
+
+    if not di_proses:
+        hasil, error, catatan = jalankan()
+        return hasil, [], error, catatan
+    with senyap(), kumpulkan_metrik() as metrik:
+        hasil, error, catatan = jalankan()
+    return hasil, metrik.catatan, error, catatan
+
+
+def jalankan_modul_paralel(df, mode='thread', mp_context=None):
+    """
+    Menjalankan ketiga modul QC bersamaan pada df (sudah disiapkan).
+    Kolom yang tidak ada dilewati; modul yang gagal dicatat dan dilewati.
+    Tahap konsistensi antar parameter dijalankan pada df gabungan, lalu
+    ringkasan & jumlah flag tiap modul dihitung dari flag akhir (urutan tetap).
+    `mp_context`: konteks multiprocessing untuk mode 'process' (None = bawaan platform).
+    """
+    if mode not in MODE_PARALEL:
+        raise ValueError(f"Mode paralel '{mode}' tidak dikenal (pilih: {', '.join(MODE_PARALEL)}).")
+    fitur = fitur_waktu(df['Tanggal'])
+    tugas = []
+    for indeks, (nama, _, _) in enumerate(MODUL_PARALEL):
+        kolom, _ = _kolom(indeks)
+        if kolom not in df.columns:
+            logger.error(f"❌ ({PARAMETERS[nama]['label']}) Gagal: Kolom '{kolom}' atau 'Tanggal' tidak ditemukan.")
+            continue
+        tugas.append((indeks, df[['Tanggal', kolom]].copy()))
+
+    di_proses = mode == 'process'
+    opsi = {'max_workers': max(len(tugas), 1)}
+    if di_proses:
+        opsi.update(mp_context=mp_context, initializer=_atur_worker,
+                    initargs=(qc_radiasi.lokasi_aktif(), ambang_aktif(), bitmask_aktif()))
+    Executor = ProcessPoolExecutor if di_proses else ThreadPoolExecutor
+    logger.info(f"\n🧵 Menjalankan {len(tugas)} modul QC secara paralel ({mode})...")
+    mulai = time.perf_counter()
+    # Mode thread: log dimatikan sekali untuk semua thread (level logger bersifat global)
+    with (contextlib.nullcontext() if di_proses else senyap()):
+        with Executor(**opsi) as executor:
+            futures = [executor.submit(_jalankan_satu_modul, indeks, df_sempit, fitur, di_proses)
+                       for indeks, df_sempit in tugas]
+            hasil_semua = [(indeks, future.result()) for (indeks, _), future in zip(tugas, futures)]
+
+    # --- Gabungkan dengan urutan tetap ---
+    catatan_modul = {}
+    for indeks, (hasil, catatan_proses, error, catatan) in hasil_semua:
+        _, modul, fn = MODUL_PARALEL[indeks]
+        kolom, flag_kolom = _kolom(indeks)
+        for catatan in catatan_proses:
+            tambah_catatan(catatan)
+        if error is not None:
+            logger.error(f"❌ ERROR saat menjalankan {fn.__name__}: {error}")
+            continue
+        df[kolom] = hasil[kolom].to_numpy()
+        df[flag_kolom] = hasil[flag_kolom].to_numpy()
+        if _kolom_bit(indeks) in hasil.columns:
+            df[_kolom_bit(indeks)] = hasil[_kolom_bit(indeks)].to_numpy()
+        elif _kolom_bit(indeks) in df.columns:
+            del df[_kolom_bit(indeks)]
+        catatan_modul[flag_kolom] = catatan
+    logger.info(f"\n✅ Modul QC paralel selesai dalam {time.perf_counter() - mulai:.2f} s.")
+    df = cek_konsistensi(df, {('Tanggal', 'fitur'): fitur})
+    ringkasan_akhir(df, catatan_modul)
+    return df
+
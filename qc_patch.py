@@ -0,0 +1,189 @@
+import pandas as pd
+import numpy as np
+
+from qc_common import FLAG_BAIK, FLAG_DTYPE, FLAG_SUFFIX, BIT_DTYPE, BIT_SUFFIX, new_flag_array, new_bit_array
+from qc_registry import PARAMETERS, run_qc_parameter, bitmask_aktif
+from qc_konsistensi import cek_konsistensi
+from qc_metrik import logger, ukur, senyap
+import qc_hujan
+import qc_tekanan
+import qc_radiasi
+
+# =====================================================================
+#   --- 🩹 PATCH DATA TERLAMBAT (DIRTY-RANGE) ---
+# =====================================================================
+# Logger AWS sering mengunggah data susulan (gap yang terisi) atau koreksi
+# berjam-jam/berhari-hari kemudian. Alih-alih menjalankan ulang seluruh modul,
+# patch_qc() menggabungkan baris baru/koreksi ke data yang sudah di-QC lalu
+# hanya mengevaluasi ulang rentang yang terdampak, per parameter:
+#
+#   - baris kotor   : baris sisipan (semua parameter) atau baris yang nilai
+#                     kolom parameter itu berubah
+#   - rentang kotor : baris kotor +/- HALO_BARIS modul (jangkauan window,
+#                     diff & shift), digabung bila bersinggungan
+#   - Gap Check     : membandingkan dengan nilai valid sebelumnya (melompati
+#                     NaN), jadi rentang diperpanjang hingga nilai valid
+#                     pertama setelah baris kotor
+#
+# Setiap rentang dievaluasi pada potongan [awal - HALO, akhir + HALO] dengan
+# nilai valid terakhir sebelum potongan, sehingga hasilnya identik dengan
+# menjalankan ulang QC atas seluruh data. Kolom bitmask check (bila aktif)
+# diperbarui pada rentang yang sama; hasil QC lama tanpa kolom bitmask
+# dievaluasi ulang seluruhnya.
+
+# nama parameter -> (modul, kolom data, kolom flag)
+MODUL_PATCH = {
+    'hujan': (qc_hujan, qc_hujan.CUMULATIVE_COLUMN, qc_hujan.FLAG_COLUMN),
+    'tekanan': (qc_tekanan, qc_tekanan.COLUMN_TO_CHECK, qc_tekanan.FLAG_COLUMN),
+    'radiasi': (qc_radiasi, qc_radiasi.COLUMN_TO_CHECK, qc_radiasi.FLAG_COLUMN),
+}
+
+
+def _sama(a, b):
+    """Perbandingan per elemen dengan NaN == NaN."""
+    return (a == b) | (pd.isna(a) & pd.isna(b))
+
+
+def _flag_uint8(kolom, dtype=FLAG_DTYPE):
+    """Kolom flag dari file (Excel/CSV: kosong = data baik) -> kode uint8 (atau `dtype`)."""
+    return pd.to_numeric(kolom, errors='coerce').fillna(FLAG_BAIK).to_numpy().astype(dtype)
+
+
+def gabung_patch(df_qc, df_patch):
+    """
+    Menggabungkan baris patch ke data hasil QC (keduanya sudah disiapkan).
+    Baris patch dengan 'Tanggal' yang sudah ada menimpa nilai kolom yang
+    terisi di patch (sel kosong = tidak dikoreksi); sisanya disisipkan.
+
+    Mengembalikan (df_gabung, posisi_lama, sisipan, berubah):
+    - posisi_lama : posisi baris lama di df_gabung
+    - sisipan     : mask bool baris sisipan pada df_gabung
+    - berubah     : {kolom: mask bool baris lama yang nilainya berubah} (pada df_gabung)
+    """
+    kolom_patch = [c for c in df_patch.columns
+                   if c != 'Tanggal' and c in df_qc.columns and not str(c).endswith((FLAG_SUFFIX, BIT_SUFFIX))]
+    patch = df_patch.drop_duplicates('Tanggal', keep='last').set_index('Tanggal')
+
+    lama = df_qc.reset_index(drop=True)
+    ada = lama['Tanggal'].isin(patch.index).to_numpy()
+    baru = patch.loc[~patch.index.isin(lama['Tanggal'])].reset_index()
+    for col in lama.columns:
+        if col not in baru.columns:
+            baru[col] = np.nan
+    baru = baru[lama.columns]
+
+    # Koreksi nilai baris lama
+    nilai_lama = {col: pd.to_numeric(lama[col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+                  for col in kolom_patch}
+    if ada.any():
+        posisi_ada = np.flatnonzero(ada)
+        koreksi = patch.loc[lama['Tanggal'].iloc[posisi_ada], kolom_patch]
+        for col in kolom_patch:
+            nilai = pd.to_numeric(koreksi[col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+            terisi = ~np.isnan(nilai)
+            lama.loc[posisi_ada[terisi], col] = nilai[terisi]
+    berubah_lama = {
+        col: ~_sama(nilai_lama[col], pd.to_numeric(lama[col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan))
+        for col in kolom_patch
+    }
+
+    # Sisipkan baris baru dengan urutan waktu stabil (lama dulu jika tanggal sama)
+    gabung = pd.concat([lama, baru], ignore_index=True)
+    urutan = np.argsort(gabung['Tanggal'].to_numpy(), kind='stable')
+    posisi = np.empty(len(gabung), dtype=np.int64)
+    posisi[urutan] = np.arange(len(gabung))
+    posisi_lama = posisi[:len(lama)]
+    gabung = gabung.iloc[urutan].reset_index(drop=True)
+
+    sisipan = np.ones(len(gabung), dtype=bool)
+    sisipan[posisi_lama] = False
+    berubah = {}
+    for col, mask in berubah_lama.items():
+        berubah[col] = np.zeros(len(gabung), dtype=bool)
+        berubah[col][posisi_lama] = mask
+    return gabung, posisi_lama, sisipan, berubah
+
+
+def rentang_kotor(kotor, halo, n, nilai=None):
+    """
+    Rentang [awal, akhir] (inklusif) yang flag-nya mungkin berubah karena baris `kotor`.
+    Jika `nilai` diisi (parameter dengan Gap Check), setiap rentang diperpanjang
+    hingga nilai valid pertama setelah baris kotor terakhirnya.
+    """
+    idx = np.flatnonzero(kotor)
+    if idx.size == 0:
+        return []
+    awal = np.maximum(idx - halo, 0)
+    akhir = np.minimum(idx + halo, n - 1)
+    if nilai is not None:
+        idx_valid = np.flatnonzero(~np.isnan(nilai))
+        k = np.searchsorted(idx_valid, idx, side='right')
+        valid_berikut = np.where(k < idx_valid.size, idx_valid[np.minimum(k, idx_valid.size - 1)], -1)
+        akhir = np.maximum(akhir, valid_berikut)
+
+    rentang = []
+    for a, b in zip(awal.tolist(), akhir.tolist()):
+        if rentang and a <= rentang[-1][1] + 1:
+            rentang[-1][1] = max(rentang[-1][1], b)
+        else:
+            rentang.append([a, b])
+    return [tuple(r) for r in rentang]
+
+
+def patch_qc(df_qc, df_patch):
+    """
+    Menerapkan baris baru/koreksi `df_patch` ke data hasil QC `df_qc` dan
+    mengevaluasi ulang hanya rentang yang terdampak.
+
+    Mengembalikan (df_hasil, rentang) dengan `rentang` = {parameter: [(awal, akhir), ...]}
+    (posisi baris pada df_hasil). Flag df_hasil identik dengan QC penuh.
+    """
+    gabung, posisi_lama, sisipan, berubah = gabung_patch(df_qc, df_patch)
+    n = len(gabung)
+    rentang_semua = {}
+
+    for nama, (modul, kolom, flag_kolom) in MODUL_PATCH.items():
+        if kolom not in gabung.columns:
+            continue
+        flags = new_flag_array(n)
+        if flag_kolom in df_qc.columns:
+            flags[posisi_lama] = _flag_uint8(df_qc[flag_kolom])
+        bit_kolom = PARAMETERS[nama]['bit_kolom']
+        bits = new_bit_array(n) if bitmask_aktif() else None
+        if bits is not None and bit_kolom in df_qc.columns:
+            bits[posisi_lama] = _flag_uint8(df_qc[bit_kolom], BIT_DTYPE)
+
+        kotor = sisipan | berubah.get(kolom, np.zeros(n, dtype=bool))
+        nilai = pd.to_numeric(gabung[kolom], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        punya_gap = any(cfg['check'] == 'gap' for cfg in PARAMETERS[nama]['checks'])
+        rentang = rentang_kotor(kotor, modul.HALO_BARIS, n, nilai if punya_gap else None)
+        if (flag_kolom not in df_qc.columns or (bits is not None and bit_kolom not in df_qc.columns)) and n:
+            rentang = [(0, n - 1)]   # belum pernah di-QC (atau tanpa bitmask) -> seluruh data
+        idx_valid = np.flatnonzero(~np.isnan(nilai))
+
+        with ukur('patch', nama, n, jumlah_rentang=len(rentang)) as catatan:
+            for a, b in rentang:
+                lo, hi = max(0, a - modul.HALO_BARIS), min(n, b + modul.HALO_BARIS + 1)
+                k = np.searchsorted(idx_valid, lo) - 1
+                prev_valid = nilai[idx_valid[k]] if k >= 0 else np.nan
+                potongan = gabung.loc[lo:hi - 1, ['Tanggal', kolom]].reset_index(drop=True)
+                with senyap():
+                    hasil = run_qc_parameter(potongan, nama, prev_valid=prev_valid)
+                flags[a:b + 1] = hasil[flag_kolom].to_numpy()[a - lo:b - lo + 1]
+                if bits is not None:
+                    bits[a:b + 1] = hasil[bit_kolom].to_numpy()[a - lo:b - lo + 1]
+            catatan['baris_dievaluasi'] = int(sum(b - a + 1 for a, b in rentang))
+
+        if nama in ('tekanan', 'radiasi'):
+            gabung[kolom] = nilai   # modul QC mengonversi kolom ini ke numerik
+        gabung[flag_kolom] = flags
+        if bits is not None:
+            gabung[bit_kolom] = bits
+        elif bit_kolom in gabung.columns:
+            del gabung[bit_kolom]
+        rentang_semua[nama] = rentang
+        logger.info(f"🩹 ({PARAMETERS[nama]['label']}) {len(rentang)} rentang dievaluasi ulang "
+                    f"({catatan['baris_dievaluasi']} dari {n} baris).")
+
+    # Aturan konsistensi per baris: murah, dijalankan ulang atas seluruh frame
+    return cek_konsistensi(gabung), rentang_semua
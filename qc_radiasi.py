@@ -1,160 +1,160 @@
-import pandas as pd
+import logging
 import numpy as np
 
+from qc_common import FLAG_BAIK
+from qc_registry import register_parameter, run_qc_parameter
+from qc_metrik import logger
+from qc_surya import geometri_matahari, batas_langit_cerah
+
 # =====================================================================
 #   --- ⚙️ KONFIGURASI QC (RADIASI MATAHARI) ---
 # =====================================================================
 COLUMN_TO_CHECK = 'sr_avg'
 FLAG_COLUMN = f'{COLUMN_TO_CHECK}_flagging'
 
+# --- Lokasi stasiun (geometri matahari) ---
+# 'Tanggal' dianggap UTC (main.siapkan_data mengonversi ke UTC).
+LINTANG_STASIUN = -6.29    # derajat, + = utara (default: AWS Tangerang Selatan)
+BUJUR_STASIUN = 106.71     # derajat, + = timur
+# Lokasi per stasiun (nama stasiun / nama file tanpa ekstensi) -> (lintang, bujur)
+LOKASI_STASIUN = {}
+
+# --- Malam hari ---
+# Elevasi matahari di bawah ini = malam: spike, rapid change & flat line tidak dites
+# (radiasi seharusnya ~0), nilai hanya dibatasi oleh batas langit cerah malam.
+ELEVASI_MALAM = 0.0        # derajat
+
 # --- Parameter Range Check (Flag 1) ---
+# Batas atas = batas langit cerah dari zenit matahari (qc_surya.batas_langit_cerah)
 SR_MIN_RANGE = 0      
-SR_MAX_RANGE = 1500    
 
 # --- Parameter Flat Line Test (Flag 2) ---
 FLAT_LINE_HOURS = 3.0
 FLAT_LINE_WINDOW = int(FLAT_LINE_HOURS * 6) 
 FLAT_LINE_STD_THRESH = 0.1      
-FLAT_LINE_MIN_VALUE = 20        
+
+# --- Jangkauan dependensi antar-baris (mode inkremental/chunk) ---
+# Flag baris i hanya bergantung pada baris [i - HALO_BARIS, i + HALO_BARIS]:
+# jendela flat line (window - 1) + is_untestable/is_change_unreliable (2) + spike (1).
+HALO_BARIS = FLAT_LINE_WINDOW + 3
 
 # --- Parameter Rapid Change & Spike Test (Flag 3 & 4) ---
 RAPID_CHANGE_THRESHOLD = 900.0  
 
 # =====================================================================
-#   --- 1️⃣ Fungsi-Fungsi QC (Internal untuk Radiasi) ---
+#   --- 1️⃣ Daftar Check QC (urutan = prioritas flag) ---
 # =====================================================================
+# Implementasi check ada di qc_registry (dipakai bersama semua parameter).
+# Mask pengecualian (dihitung sekali per run oleh registry):
+#   - first_of_day      : baris pertama tiap hari
+#   - untestable        : baris sebelumnya kosong (kecuali first_of_day)
+#   - change_unreliable : baris setelah baris untestable
+# Mask dari siapkan_radiasi():
+#   - malam             : elevasi matahari < ELEVASI_MALAM
+EXEMPT_PERUBAHAN = ['first_of_day', 'untestable', 'change_unreliable', 'malam']
+
+CHECKS_RADIASI = [
+    {'check': 'missing', 'flag': 9, 'nama': 'Cek Data Hilang'},
+    {'check': 'range', 'flag': 1, 'nama': 'Range Check (Langit Cerah)',
+     'min': SR_MIN_RANGE, 'max_seri': 'batas_cerah', 'exempt': ['untestable']},
+    {'check': 'spike', 'flag': 4, 'nama': 'Spike Test',
+     'threshold': RAPID_CHANGE_THRESHOLD, 'exempt': EXEMPT_PERUBAHAN, 'flag_tetangga_ditolak': 9},
+    {'check': 'rapid_change', 'flag': 3, 'nama': 'Rapid Change Test',
+     'threshold': RAPID_CHANGE_THRESHOLD, 'exempt': EXEMPT_PERUBAHAN, 'flag_tetangga_ditolak': 9},
+    {'check': 'flat_line', 'flag': 2, 'nama': 'Flat Line Test',
+     'window': FLAT_LINE_WINDOW, 'metode': 'std', 'std_thresh': FLAT_LINE_STD_THRESH,
+     'exempt': ['untestable', 'malam']},
+]
+
+# Lokasi yang dipakai run berjalan (diatur per stasiun lewat atur_lokasi)
+_LOKASI = (LINTANG_STASIUN, BUJUR_STASIUN)
+
+
+def atur_lokasi(lintang=LINTANG_STASIUN, bujur=BUJUR_STASIUN):
+    """Mengatur lokasi stasiun untuk QC radiasi berikutnya (berlaku per proses)."""
+    global _LOKASI
+    _LOKASI = (float(lintang), float(bujur))
+
+
+def lokasi_aktif():
+    """(lintang, bujur) yang sedang dipakai QC radiasi."""
+    return _LOKASI
+
+
+def lokasi_stasiun(stasiun):
+    """(lintang, bujur) stasiun dari LOKASI_STASIUN, atau lokasi default."""
+    return LOKASI_STASIUN.get(stasiun, (LINTANG_STASIUN, BUJUR_STASIUN))
+
+
+def _geometri(waktu, stasiun_segmen=None):
+    """
+    Geometri matahari per baris. Frame multi-stasiun (`stasiun_segmen` = nama
+    stasiun tiap segmen): lokasi tiap segmen dari LOKASI_STASIUN; selain itu lokasi aktif.
+    """
+    if not stasiun_segmen:
+        return geometri_matahari(waktu, *_LOKASI)
+    batas = np.append(np.flatnonzero(waktu['awal_segmen']), len(waktu['id_hari']))
+    bagian = [geometri_matahari({k: v[a:b] for k, v in waktu.items()}, *lokasi_stasiun(stasiun))
+              for stasiun, a, b in zip(stasiun_segmen, batas[:-1], batas[1:])]
+    return {k: np.concatenate([g[k] for g in bagian]) for k in ('cos_zenit', 'e0')}
+
+
+def siapkan_radiasi(nilai, waktu, ambang=None, stasiun_segmen=None):
+    """
+    Seri 'nilai' (sr_avg) dan 'batas_cerah' (batas atas dari zenit matahari),
+    serta mask 'malam', dari fitur waktu bersama dan lokasi stasiun.
+    """
+    geometri = _geometri(waktu, stasiun_segmen)
+    series = {
+        'nilai': nilai,
+        'batas_cerah': batas_langit_cerah(geometri),
+    }
+    masks = {'malam': geometri['cos_zenit'] < np.sin(np.deg2rad(ELEVASI_MALAM))}
+    return series, masks
+
+
+register_parameter('radiasi', kolom=COLUMN_TO_CHECK, flag_kolom=FLAG_COLUMN,
+                   label='Radiasi', checks=CHECKS_RADIASI, siapkan=siapkan_radiasi)
 
-def handle_missing_data(df, col, flag_col):
-    """Flag 9: Data kosong (NaN)."""
-    print(f"  - (Radiasi) Mengecek data hilang (Flag 9) di '{col}'...")
-    cond = df[col].isna()
-    df.loc[cond & df[flag_col].isna(), flag_col] = 9
-    print(f"    -> Ditemukan {cond.sum()} data hilang.")
-    return df
-
-def range_check(df, col, flag_col, min_val, max_val):
-    """Flag 1: Nilai di luar rentang wajar, KECUALI untestable."""
-    print(f"  - (Radiasi) Menjalankan Range Check (Flag 1) di '{col}'...")
-    is_exempt = df['is_untestable']
-    cond_range = (((df[col] < min_val) | (df[col] > max_val)) & (df[flag_col].isna()) & (~is_exempt))
-    df.loc[cond_range, flag_col] = 1
-    print(f"    -> {cond_range.sum()} data (bisa dites) di luar rentang ({min_val} s/d {max_val} W/m²).")
-    return df
-
-def flat_line_test(df, col, flag_col, window, min_value, std_thresh):
-    """Flag 2: Data stagnan saat siang, KECUALI untestable."""
-    print(f"  - (Radiasi) Menjalankan Flat Line Test (Flag 2) di '{col}'...")
-    rolling_std = df[col].rolling(window=window).std()
-    cond = ((rolling_std <= std_thresh) & (df[col] > min_value) & (df['is_untestable'] == False))
-    flagged_count = 0
-    for i in cond[cond].index:
-        start_index = i - window + 1
-        target_indices = df.loc[start_index:i].index[
-            (df.loc[start_index:i, flag_col].isna()) & 
-            (df.loc[start_index:i, 'is_untestable'] == False)
-        ]
-        if not target_indices.empty:
-            df.loc[target_indices, flag_col] = 2
-            flagged_count += len(target_indices)
-    print(f"    -> {flagged_count} data stagnan (std <= {std_thresh} & val > {min_value}).")
-    return df
-
-def fixed_spike_test(df, col, flag_col, threshold):
-    """Flag 4: Spike - Mengabaikan data 'untestable', 'change_unreliable', first_of_day, dan tetangga=9."""
-    print(f"  - (Radiasi) Menjalankan Spike Test (Flag 4) di '{col}'...")
-    df['diff_prev'] = df[col].diff()
-    df['diff_next'] = df[col].diff(-1)
-    df['flag_prev'] = df[flag_col].shift(1)
-    df['flag_next'] = df[flag_col].shift(-1)
-    is_exempt_for_change = df['is_first_of_day'] | df['is_untestable'] | df['is_change_unreliable']
-    cond = (
-        (df['diff_prev'].abs() > threshold) & (df['diff_next'].abs() > threshold) &
-        (df['diff_prev'] * df['diff_next'] < 0) & (df[flag_col].isna()) & 
-        (df['flag_prev'] != 9) & (df['flag_next'] != 9) & (~is_exempt_for_change)
-    )
-    df.loc[cond, flag_col] = 4
-    print(f"    -> {cond.sum()} spike terdeteksi (> {threshold} W/m²).")
-    df.drop(columns=['diff_prev', 'diff_next', 'flag_prev', 'flag_next'], inplace=True, errors='ignore')
-    return df
-
-def fixed_rapid_change_test(df, col, flag_col, threshold):
-    """Flag 3: Rapid Change - Mengabaikan data 'untestable', 'change_unreliable', first_of_day, dan tetangga=9."""
-    print(f"  - (Radiasi) Menjalankan Rapid Change Test (Flag 3) di '{col}'...")
-    df['diff_prev'] = df[col].diff().abs()
-    df['flag_prev'] = df[flag_col].shift(1)
-    is_exempt_for_change = df['is_first_of_day'] | df['is_untestable'] | df['is_change_unreliable']
-    cond = (
-        (df['diff_prev'] > threshold) & (df[flag_col].isna()) & 
-        (df['flag_prev'] != 9) & (~is_exempt_for_change)
-    )
-    df.loc[cond, flag_col] = 3
-    print(f"    -> {cond.sum()} perubahan drastis terdeteksi (> {threshold} W/m²).")
-    df.drop(columns=['diff_prev', 'flag_prev'], inplace=True, errors='ignore')
-    return df
 
 def summary_qc(df, flag_column):
-    """Tampilkan rekap jumlah flag tiap kategori."""
-    print("\n" + "=" * 55)
-    print(f"📊 Ringkasan QC untuk '{flag_column}'")
-    print("=" * 55)
-    summary = df[flag_column].value_counts(dropna=False).sort_index()
+    """Tampilkan rekap jumlah flag tiap kategori (dilewati bila log di atas level INFO)."""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    logger.info("\n" + "=" * 55)
+    logger.info(f"📊 Ringkasan QC untuk '{flag_column}'")
+    logger.info("=" * 55)
+    summary = df[flag_column].value_counts().sort_index()
     total = len(df)
     for flag, count in summary.items():
-        if pd.isna(flag): label = "Data Baik"; fcode = "(kosong)"
+        if flag == FLAG_BAIK: label = "Data Baik"; fcode = "(kosong)"
         else:
             label = {
                 1: "Di luar rentang", 2: "Stagnan (Siang)", 3: "Perubahan Drastis",
-                4: "Spike (Lonjakan)", 9: "Data Hilang"
+                4: "Spike (Lonjakan)", 6: "Beda dgn Tetangga",
+                7: "Tidak Konsisten", 9: "Data Hilang"
             }.get(int(flag), "Tidak dikenal"); fcode = str(int(flag))
-        print(f"  Flag {fcode:<7} {label:<20}: {count:6d} data ({count/total*100:.2f}%)")
-    print(f"  Total Data: {total} (100%)")
-    print("=" * 55)
+        logger.info(f"  Flag {fcode:<7} {label:<20}: {count:6d} data ({count/total*100:.2f}%)")
+    logger.info(f"  Total Data: {total} (100%)")
+    logger.info("=" * 55)
 
 # =====================================================================
 #   🚀 2️⃣ FUNGSI EKSEKUSI UTAMA (RADIASI)
 # =====================================================================
 
-def run_qc_radiasi(df):
+def run_qc_radiasi(df, cache=None, ringkasan=True):
     """
     Menjalankan seluruh proses QC Radiasi Matahari pada DataFrame yang diberikan.
     DataFrame diasumsikan sudah dibersihkan dan diurutkan berdasarkan 'Tanggal'.
+    `ringkasan=False`: ringkasan dicetak pemanggil (setelah tahap konsistensi/buddy).
     """
-    
-    # Periksa apakah kolom yang diperlukan ada
-    if COLUMN_TO_CHECK not in df.columns or 'Tanggal' not in df.columns:
-        print(f"❌ (Radiasi) Gagal: Kolom '{COLUMN_TO_CHECK}' atau 'Tanggal' tidak ditemukan.")
-        return df 
-
-    # Pastikan 'sr_avg' adalah numerik
-    df[COLUMN_TO_CHECK] = pd.to_numeric(df[COLUMN_TO_CHECK], errors='coerce')
-    
-    # --- Siapkan kolom flag ---
-    df[FLAG_COLUMN] = np.nan
-    
-    # --- Tambahkan helper columns (khusus radiasi) ---
-    print("🔄 (Radiasi) Mempersiapkan data...")
-    df['is_first_of_day'] = ~df['Tanggal'].dt.floor('D').duplicated(keep='first')
-    df['is_untestable'] = df[COLUMN_TO_CHECK].shift(1).isnull() & (~df['is_first_of_day'])
-    df['is_change_unreliable'] = df['is_untestable'].shift(1).fillna(False)
-
-    print("\n🔬 (Radiasi) Menjalankan Quality Control...")
-
-    # --- Jalankan QC (dengan prioritas) ---
-    df = handle_missing_data(df, COLUMN_TO_CHECK, FLAG_COLUMN) # flag 9
-    df = range_check(df, COLUMN_TO_CHECK, FLAG_COLUMN, SR_MIN_RANGE, SR_MAX_RANGE) # flag 1
-    df = fixed_spike_test(df, COLUMN_TO_CHECK, FLAG_COLUMN, RAPID_CHANGE_THRESHOLD) # flag 4
-    df = fixed_rapid_change_test(df, COLUMN_TO_CHECK, FLAG_COLUMN, RAPID_CHANGE_THRESHOLD) # flag 3
-    df = flat_line_test(df, COLUMN_TO_CHECK, FLAG_COLUMN, 
-                         FLAT_LINE_WINDOW, FLAT_LINE_MIN_VALUE, FLAT_LINE_STD_THRESH) # flag 2
-
-    # Hapus kolom helper
-    kolom_dihapus = ['is_untestable', 'is_change_unreliable', 'is_first_of_day']
-    df.drop(columns=kolom_dihapus, inplace=True, errors='ignore')
-    print(f"\nKolom internal telah dihapus.")
-    
+    hasil = run_qc_parameter(df, 'radiasi', cache=cache)
+    if hasil is None:
+        return df
+
     # --- Ringkasan hasil ---
-    summary_qc(df, FLAG_COLUMN)
+    if ringkasan:
+        summary_qc(hasil, FLAG_COLUMN)
 
     # Kembalikan DataFrame yang sudah dimodifikasi
-    return df
-
+    return hasil
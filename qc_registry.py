@@ -0,0 +1,548 @@
+import pandas as pd
+import numpy as np
+
+from qc_common import (FLAG_BAIK, FLAG_DTYPE, BIT_DTYPE, BIT_SUFFIX, KOLOM_STASIUN, new_flag_array,
+                       new_bit_array, flat_window_ends, rolling_std, windows_union_mask)
+from qc_metrik import logger, ukur, hitung_flag
+from qc_waktu import fitur_waktu
+from qc_ambang import ambang_stasiun_aktif
+
+# =====================================================================
+#   --- 🗂️ REGISTRY CHECK QC (DEKLARATIF) + CACHE INTERMEDIATE ---
+# =====================================================================
+# Setiap parameter (hujan, tekanan, radiasi, ...) dideklarasikan sebagai
+# daftar check berurutan (prioritas) beserta threshold dan kode flag-nya:
+#
+#   register_parameter('tekanan', kolom='pp_air', label='Tekanan', checks=[
+#       {'check': 'missing', 'flag': 9},
+#       {'check': 'range', 'flag': 1, 'min': 900, 'max': 1100},
+#       ...
+#   ])
+#
+# Setiap check menghasilkan mask kegagalannya sendiri dan menyalakan bit-nya
+# (bit ke-i = check ke-i) pada bitmask uint16. Kode flag tunggal (kolom
+# '*_flagging') lalu diturunkan sekali dari bitmask: bit dengan indeks terendah
+# menang, jadi urutan daftar = prioritas flag dan hasilnya sama dengan menandai
+# berurutan.
+#
+# Check tetap DIEVALUASI berurutan menurut daftar. Check dengan opsi
+# `hanya_belum_diflag` (nilai yang sudah ber-flag tidak ikut jendela/tetangga)
+# atau `flag_tetangga_ditolak` (tetangga ber-flag tertentu -> tidak dites)
+# membaca bit check di atasnya, sehingga urutan daftar juga menentukan MASK
+# check itu sendiri, bukan hanya prioritas saat resolusi. Check tanpa opsi
+# tersebut tidak membaca hasil check lain. Menambah parameter baru (kelembapan, angin)
+# cukup dengan satu entri konfigurasi memakai check yang sudah ada.
+#
+# Intermediate (diff, shift, rolling std/spread, batas hari) dihitung sekali
+# per kolom lalu disimpan di KonteksQC selama satu run.
+#
+# Frame multi-stasiun: baris dibagi menjadi segmen (fitur 'awal_segmen');
+# shift, diff, dan jendela tidak pernah melintasi batas segmen, dan threshold
+# bisa berbeda per baris (tabel ambang, lihat qc_ambang).
+#
+# Inti QC bekerja murni pada array NumPy (qc_array): nilai float64, fitur
+# waktu, mask, dan buffer flag uint8 keluaran. run_qc_parameter (dan
+# run_qc_hujan/tekanan/radiasi di atasnya) hanya adapter DataFrame -> array
+# -> kolom flag, sehingga layanan lain bisa memanggil QC langsung atas buffer
+# tanpa membuat DataFrame.
+
+CHECKS = {}
+PARAMETERS = {}
+
+# Bit teratas kolom bitmask dicadangkan untuk tahap setelah modul (konsistensi,
+# buddy check) yang menulis kode flag-nya sendiri; sisanya satu bit per check.
+BIT_TAHAP_PERTAMA = 14
+MAKS_CHECK = BIT_TAHAP_PERTAMA
+
+# nama tahap -> (bit, kode flag); bit lebih tinggi = tahap yang berjalan lebih akhir
+TAHAP = {}
+
+# True = adapter DataFrame juga menulis kolom bitmask '<kolom>_qcbit' (semua
+# check yang gagal per baris, untuk diagnosis); diatur per run lewat atur_bitmask.
+SIMPAN_BITMASK = False
+_BITMASK = SIMPAN_BITMASK
+
+
+def atur_bitmask(aktif=SIMPAN_BITMASK):
+    """Mengaktifkan/mematikan kolom bitmask check pada output adapter DataFrame."""
+    global _BITMASK
+    _BITMASK = bool(aktif)
+
+
+def bitmask_aktif():
+    return _BITMASK
+
+
+def register_check(nama):
+    """Dekorator: mendaftarkan fungsi check `fn(ctx, cfg) -> mask bool`."""
+    def daftarkan(fn):
+        CHECKS[nama] = fn
+        return fn
+    return daftarkan
+
+
+def register_tahap(nama, indeks_bit, flag):
+    """
+    Mencadangkan bit `indeks_bit` kolom bitmask untuk tahap setelah modul `nama`
+    yang menandai kode `flag`. Mengembalikan nilai bit (uint16).
+    """
+    if not BIT_TAHAP_PERTAMA <= indeks_bit < np.iinfo(BIT_DTYPE).bits:
+        raise ValueError(f"Tahap '{nama}': bit {indeks_bit} di luar bit cadangan "
+                         f"{BIT_TAHAP_PERTAMA}..{np.iinfo(BIT_DTYPE).bits - 1}.")
+    TAHAP[nama] = (BIT_DTYPE(1 << indeks_bit), flag)
+    return TAHAP[nama][0]
+
+
+def tandai_bit_tahap(df, bit_kolom, bit, tandai, ganti=False):
+    """
+    Menyalakan `bit` tahap pada baris `tandai` di kolom bitmask `bit_kolom`
+    (dilewati jika kolom tidak ada). `ganti`: bit lama tahap ini dimatikan dulu.
+    """
+    if bit_kolom not in df.columns:
+        return
+    bits = pd.to_numeric(df[bit_kolom]).fillna(0).to_numpy().astype(BIT_DTYPE)
+    if ganti:
+        bits &= ~bit
+    bits[tandai] |= bit
+    df[bit_kolom] = bits
+
+
+def register_parameter(nama, kolom, checks, label=None, flag_kolom=None, siapkan=None,
+                       konversi_numerik=True):
+    """
+    Mendaftarkan satu parameter QC.
+
+    - `checks`   : daftar dict {'check': <nama>, 'flag': <kode>, ...parameter check}
+    - `siapkan`  : opsional, fungsi `siapkan(nilai, waktu, ambang, stasiun_segmen)
+                   -> (series, masks)` untuk parameter yang butuh data turunan (mis.
+                   interval hujan dari nilai kumulatif); `nilai` = array float64 kolom
+                   `kolom`, `waktu` = fitur_waktu('Tanggal') yang dibagi antar parameter,
+                   `ambang` = threshold per baris (lihat KonteksQC.ambang),
+                   `stasiun_segmen` = nama stasiun tiap segmen (None = stasiun aktif).
+                   Tanpa ini, seri 'nilai' = `nilai`.
+    - `konversi_numerik`: adapter DataFrame mengubah kolom `kolom` di df ke numerik.
+    """
+    if len(checks) > MAKS_CHECK:
+        raise ValueError(f"Parameter '{nama}': maksimal {MAKS_CHECK} check (satu bit per check).")
+    PARAMETERS[nama] = {
+        'kolom': kolom,
+        'flag_kolom': flag_kolom or f'{kolom}_flagging',
+        'bit_kolom': f'{kolom}{BIT_SUFFIX}',
+        'label': label or nama,
+        'checks': checks,
+        'siapkan': siapkan,
+        'konversi_numerik': konversi_numerik,
+    }
+    return PARAMETERS[nama]
+
+
+# =====================================================================
+#   --- 🧠 Konteks & Cache ---
+# =====================================================================
+
+class KonteksQC:
+    """
+    Data satu parameter selama satu run: fitur waktu (qc_waktu.fitur_waktu),
+    seri nilai (array float64), mask tambahan, bitmask check (uint16), array
+    flag (uint8), dan cache intermediate.
+
+    `cache` boleh dibagi antar parameter dalam satu run (mis. fitur waktu dari
+    'Tanggal' cukup dihitung sekali untuk semua parameter).
+    `ambang`: {(check, kunci): array per baris} yang menimpa threshold cfg (NaN = cfg).
+    `flags` / `bits`: buffer keluaran uint8 / uint16 (dikosongkan ulang); None = array baru.
+    """
+
+    def __init__(self, kolom, waktu, series, masks=None, prev_valid=np.nan, cache=None, ambang=None,
+                 flags=None, bits=None):
+        self.kolom = kolom
+        self.waktu = waktu
+        self.series = {k: np.asarray(v, dtype='float64') for k, v in series.items()}
+        self.masks = {k: np.asarray(v, dtype=bool) for k, v in (masks or {}).items()}
+        self.prev_valid = prev_valid
+        self.n = len(waktu['id_hari'])
+        self.flags = self._buffer(flags, FLAG_DTYPE, new_flag_array)
+        self.bits = self._buffer(bits, BIT_DTYPE, new_bit_array)
+        # Diisi runner: tabel kode flag per bitmask & bit check sebelum check berjalan
+        self.tabel = None
+        self.sebelum = 0
+        self.cache = {} if cache is None else cache
+        self.ambang_baris = ambang or {}
+
+    def _buffer(self, buffer, dtype, baru):
+        if buffer is None:
+            return baru(self.n)
+        if buffer.dtype != dtype or len(buffer) != self.n:
+            raise ValueError(f"Buffer harus {np.dtype(dtype).name} sepanjang {self.n}.")
+        buffer[:] = 0
+        return buffer
+
+    def _memo(self, key, hitung):
+        if key not in self.cache:
+            self.cache[key] = hitung()
+        return self.cache[key]
+
+    def ambang(self, cfg, kunci, bawaan=None):
+        """Threshold cfg[kunci] (atau `bawaan`), ditimpa per baris oleh tabel ambang."""
+        dasar = cfg[kunci] if bawaan is None else bawaan
+        per_baris = self.ambang_baris.get((cfg['check'], kunci))
+        if per_baris is None:
+            return dasar
+        return np.where(np.isnan(per_baris), dasar, per_baris)
+
+    # --- Segmen (stasiun) ---
+    def segmen(self):
+        """
+        (posisi baris dalam segmennya, sisa baris sampai akhir segmen), atau None
+        jika hanya satu segmen (run satu stasiun).
+        """
+        def hitung():
+            awal = self.waktu['awal_segmen']
+            if np.count_nonzero(awal[1:]) == 0:
+                return None
+            idx = np.arange(self.n)
+            mulai = np.maximum.accumulate(np.where(awal, idx, 0))
+            akhir = np.append(awal[1:], True)
+            selesai = np.minimum.accumulate(np.where(akhir, idx, self.n - 1)[::-1])[::-1]
+            return idx - mulai, selesai - idx
+        return self._memo(('Tanggal', 'segmen'), hitung)
+
+    def geser(self, x, periode, isi=np.nan):
+        """x bergeser `periode` baris (seperti pandas shift); baris lintas segmen diisi `isi`."""
+        out = np.full(self.n, isi, dtype=np.result_type(x, np.asarray(isi)))
+        if periode > 0:
+            out[periode:] = x[:-periode]
+        else:
+            out[:periode] = x[-periode:]
+        segmen = self.segmen()
+        if segmen is not None:
+            posisi, sisa = segmen
+            out[(posisi < periode) if periode > 0 else (sisa < -periode)] = isi
+        return out
+
+    def jendela_utuh(self, window):
+        """True jika jendela `window` baris yang berakhir di i ada di dalam satu segmen."""
+        segmen = self.segmen()
+        if segmen is None:
+            return np.ones(self.n, dtype=bool)
+        return segmen[0] >= window - 1
+
+    # --- Seri & turunan per kolom ---
+    def nilai(self, seri='nilai'):
+        return self.series[seri]
+
+    def isna(self, seri='nilai'):
+        return self._memo((self.kolom, seri, 'isna'), lambda: np.isnan(self.nilai(seri)))
+
+    def shift(self, seri='nilai', periode=1):
+        """Seperti pandas shift: baris kosong (dan lintas segmen) diisi NaN."""
+        return self._memo((self.kolom, seri, 'shift', periode), lambda: self.geser(self.nilai(seri), periode))
+
+    def diff_prev(self, seri='nilai'):
+        """x[i] - x[i-1] (pandas diff())."""
+        return self._memo((self.kolom, seri, 'diff_prev'), lambda: self.nilai(seri) - self.shift(seri, 1))
+
+    def diff_next(self, seri='nilai'):
+        """x[i] - x[i+1] (pandas diff(-1))."""
+        return self._memo((self.kolom, seri, 'diff_next'), lambda: self.nilai(seri) - self.shift(seri, -1))
+
+    def diff_skip_nan(self, seri='nilai'):
+        """
+        |selisih| terhadap nilai valid sebelumnya, melompati NaN (termasuk prev_valid).
+        Nilai valid pertama tiap segmen berikutnya tidak punya pembanding (NaN).
+        """
+        def hitung():
+            x = self.nilai(seri)
+            idx = np.flatnonzero(~self.isna(seri))
+            out = np.full(self.n, np.nan)
+            if idx.size:
+                v = x[idx]
+                d = np.empty(idx.size)
+                d[0] = abs(v[0] - self.prev_valid) if pd.notna(self.prev_valid) else np.nan
+                d[1:] = np.abs(np.diff(v))
+                if self.segmen() is not None:
+                    id_segmen = np.cumsum(self.waktu['awal_segmen'])[idx]
+                    d[1:][id_segmen[1:] != id_segmen[:-1]] = np.nan
+                out[idx] = d
+            return out
+        return self._memo((self.kolom, seri, 'diff_skip_nan'), hitung)
+
+    def rolling_std(self, window, seri='nilai'):
+        """Simpangan baku jendela; NaN bila jendela melintasi batas segmen."""
+        return self._memo((self.kolom, seri, 'rolling_std', window),
+                          lambda: np.where(self.jendela_utuh(window), rolling_std(self.nilai(seri), window), np.nan))
+
+    def flat_window_ends(self, window, tol, seri='nilai'):
+        return self._memo((self.kolom, seri, 'flat_ends', window, tol),
+                          lambda: flat_window_ends(self.nilai(seri), window, tol) & self.jendela_utuh(window))
+
+    # --- Mask (batas hari, untestable, dll.) ---
+    def mask(self, nama):
+        """Mask dari `siapkan` parameter, atau mask bawaan yang dihitung dari data."""
+        if nama in self.masks:
+            return self.masks[nama]
+        if nama == 'first_of_day':
+            return self.waktu['first_of_day']
+        if nama == 'untestable':
+            # Baris sebelumnya kosong (kecuali baris pertama hari itu)
+            return self._memo((self.kolom, 'untestable'),
+                              lambda: np.isnan(self.shift('nilai', 1)) & ~self.mask('first_of_day'))
+        if nama == 'change_unreliable':
+            return self._memo((self.kolom, 'change_unreliable'),
+                              lambda: self.geser(self.mask('untestable'), 1, False))
+        raise KeyError(f"Mask '{nama}' tidak dikenal.")
+
+    def exempt(self, nama_mask):
+        """OR dari beberapa mask pengecualian (kosong = tidak ada pengecualian)."""
+        out = np.zeros(self.n, dtype=bool)
+        for nama in nama_mask or ():
+            out |= self.mask(nama)
+        return out
+
+    # --- Flag check sebelumnya (bit di atas check berjalan, TIDAK di-cache) ---
+    def belum_diflag(self):
+        """True jika tidak ada check di atas check berjalan yang gagal pada baris itu."""
+        return (self.bits & self.sebelum) == 0
+
+    def flag_tetangga(self, periode):
+        """Kode flag baris tetangga menurut check di atas check berjalan."""
+        return self.geser(self.tabel[self.bits & self.sebelum], periode, self.tabel.dtype.type(FLAG_BAIK))
+
+
+# =====================================================================
+#   --- ✅ Check Generik ---
+# =====================================================================
+# Setiap check mengembalikan mask kegagalan; runner menyalakan bit check itu
+# pada baris yang gagal (prioritas diterapkan saat resolusi). Opsi
+# `hanya_belum_diflag` / `flag_tetangga_ditolak` membaca bit check di atasnya
+# lewat KonteksQC.belum_diflag / flag_tetangga (lihat komentar modul).
+
+@register_check('missing')
+def check_missing(ctx, cfg):
+    """Data kosong. `mask`: pakai mask dari siapkan() alih-alih NaN pada seri."""
+    if 'mask' in cfg:
+        return ctx.mask(cfg['mask'])
+    return ctx.isna(cfg.get('seri', 'nilai'))
+
+
+@register_check('range')
+def check_range(ctx, cfg):
+    """
+    Nilai di luar [min, max], kecuali baris pada mask `exempt`.
+    `max_seri`: batas atas per baris diambil dari seri ini (mis. batas langit cerah).
+    """
+    x = ctx.nilai(cfg.get('seri', 'nilai'))
+    maks = ctx.ambang(cfg, 'max', ctx.nilai(cfg['max_seri']) if 'max_seri' in cfg else None)
+    return ((x < ctx.ambang(cfg, 'min')) | (x > maks)) & ~ctx.exempt(cfg.get('exempt'))
+
+
+@register_check('gap')
+def check_gap(ctx, cfg):
+    """Perubahan terhadap nilai valid sebelumnya (melompati NaN) > threshold."""
+    return ctx.diff_skip_nan(cfg.get('seri', 'nilai')) > ctx.ambang(cfg, 'threshold')
+
+
+@register_check('rapid_change')
+def check_rapid_change(ctx, cfg):
+    """
+    |perubahan| > threshold. `dasar`: 'diff' (selisih dengan baris sebelumnya)
+    atau 'nilai' (nilai seri itu sendiri, mis. interval hujan).
+    `flag_tetangga_ditolak`: baris sebelumnya ber-flag ini -> tidak dites.
+    """
+    seri = cfg.get('seri', 'nilai')
+    if cfg.get('dasar', 'diff') == 'diff':
+        besar = np.abs(ctx.diff_prev(seri))
+    else:
+        besar = np.abs(ctx.nilai(seri))
+    cond = (besar > ctx.ambang(cfg, 'threshold')) & ~ctx.exempt(cfg.get('exempt'))
+    if 'flag_tetangga_ditolak' in cfg:
+        cond &= ctx.flag_tetangga(1) != cfg['flag_tetangga_ditolak']
+    return cond
+
+
+@register_check('spike')
+def check_spike(ctx, cfg):
+    """
+    Lonjakan: naik lalu turun (atau sebaliknya), keduanya > threshold.
+    `hanya_belum_diflag`: tetangga yang sudah ber-flag dianggap tidak valid.
+    `flag_tetangga_ditolak`: tetangga ber-flag ini -> tidak dites.
+    """
+    seri = cfg.get('seri', 'nilai')
+    t = ctx.ambang(cfg, 'threshold')
+    if cfg.get('hanya_belum_diflag'):
+        v = np.where(ctx.belum_diflag(), ctx.nilai(seri), np.nan)
+        d_prev = v - ctx.geser(v, 1)
+        d_next = v - ctx.geser(v, -1)
+    else:
+        d_prev, d_next = ctx.diff_prev(seri), ctx.diff_next(seri)
+    cond = (np.abs(d_prev) > t) & (np.abs(d_next) > t) & (d_prev * d_next < 0) & ~ctx.exempt(cfg.get('exempt'))
+    if 'flag_tetangga_ditolak' in cfg:
+        ditolak = cfg['flag_tetangga_ditolak']
+        cond &= (ctx.flag_tetangga(1) != ditolak) & (ctx.flag_tetangga(-1) != ditolak)
+    return cond
+
+
+@register_check('drop')
+def check_drop(ctx, cfg):
+    """Nilai seri (mis. selisih kumulatif) di bawah threshold negatif."""
+    return (ctx.nilai(cfg['seri']) < ctx.ambang(cfg, 'threshold')) & ~ctx.exempt(cfg.get('exempt'))
+
+
+@register_check('flat_line')
+def check_flat_line(ctx, cfg):
+    """
+    Data stagnan: semua baris dalam jendela `window` yang berakhir di baris
+    'stagnan' ditandai.
+    - `metode` 'spread': max - min jendela <= `toleransi` (0 = konstan persis)
+    - `metode` 'std'   : simpangan baku jendela <= `std_thresh`
+    - `min_nilai`      : baris akhir jendela harus > nilai ini
+    - `exempt`         : baris pengecualian (tidak jadi akhir jendela, tidak ditandai)
+    - `hanya_belum_diflag`: hanya data yang belum ber-flag yang dihitung dalam jendela
+    """
+    seri = cfg.get('seri', 'nilai')
+    window = cfg['window']
+    x = ctx.nilai(seri)
+    if cfg.get('metode', 'spread') == 'std':
+        ends = ctx.rolling_std(window, seri) <= cfg['std_thresh']
+    elif cfg.get('hanya_belum_diflag'):
+        ends = (flat_window_ends(np.where(ctx.belum_diflag(), x, np.nan), window, cfg.get('toleransi', 0.0))
+                & ctx.jendela_utuh(window))
+    else:
+        ends = ctx.flat_window_ends(window, cfg.get('toleransi', 0.0), seri)
+    if 'min_nilai' in cfg:
+        ends = ends & (x > cfg['min_nilai'])
+    exempt = ctx.exempt(cfg.get('exempt'))
+    return windows_union_mask(ends & ~exempt, window) & ~exempt
+
+
+# =====================================================================
+#   --- 🚀 Runner ---
+# =====================================================================
+
+def tabel_prioritas(checks):
+    """
+    Tabel kode flag untuk setiap bitmask 0 .. 2**len(checks) - 1: kode check
+    dengan bit terendah yang menyala (FLAG_BAIK untuk bitmask 0).
+    """
+    bitmask = np.arange(1 << len(checks))
+    tabel = new_flag_array(len(bitmask))
+    for i in reversed(range(len(checks))):
+        tabel[(bitmask >> i) & 1 == 1] = checks[i]['flag']
+    return tabel
+
+
+def resolusi_flag(bits, checks, out=None):
+    """
+    Bitmask (uint16) -> kode flag tunggal (uint8): bit check menurut prioritas
+    `checks`, lalu bit tahap terdaftar menimpanya sesuai urutan tahap.
+    """
+    bits = np.asarray(bits, dtype=BIT_DTYPE)
+    out = np.take(tabel_prioritas(checks), bits & BIT_DTYPE((1 << len(checks)) - 1), out=out)
+    for bit, flag in sorted(TAHAP.values()):
+        out[(bits & bit) != 0] = flag
+    return out
+
+
+def jalankan_checks(ctx, checks, label):
+    """
+    Mengevaluasi setiap check ke bitnya sendiri di ctx.bits, lalu menurunkan
+    ctx.flags dari bitmask (urutan daftar = prioritas). Mengembalikan flags.
+    Check dievaluasi berurutan: check dengan `hanya_belum_diflag` /
+    `flag_tetangga_ditolak` bergantung pada bit check sebelumnya.
+    Waktu, jumlah kegagalan, dan jumlah data yang ditandai (setelah prioritas)
+    setiap check dicatat ke metrik (kategori 'check').
+    """
+    ctx.tabel = tabel_prioritas(checks)
+    for i, cfg in enumerate(checks):
+        nama = cfg.get('nama', cfg['check'])
+        bit = BIT_DTYPE(1 << i)
+        ctx.sebelum = bit - BIT_DTYPE(1)
+        logger.info("  - (%s) Menjalankan %s (Flag %s) di '%s'...", label, nama, cfg['flag'], ctx.kolom)
+        with ukur('check', f"{label}.{cfg['check']}", ctx.n, flag=cfg['flag'], bit=i) as catatan:
+            cond = CHECKS[cfg['check']](ctx, cfg)
+            np.bitwise_or(ctx.bits, bit, out=ctx.bits, where=cond)
+            catatan['jumlah_gagal'] = int(np.count_nonzero(cond))
+            catatan['jumlah_ditandai'] = int(np.count_nonzero(cond & ctx.belum_diflag()))
+        logger.info("    -> %d data ditandai Flag %s.", catatan['jumlah_ditandai'], cfg['flag'])
+    np.take(ctx.tabel, ctx.bits, out=ctx.flags)
+    return ctx.flags
+
+
+def qc_array(nama, nilai, waktu, prev_valid=np.nan, cache=None, ambang=None, stasiun_segmen=None,
+             masks=None, out=None, bits=None):
+    """
+    Inti QC satu parameter terdaftar atas array NumPy, tanpa DataFrame.
+
+    - `nilai`  : array nilai kolom parameter (float64; NaN = kosong)
+    - `waktu`  : fitur_waktu(...) (dict), atau array datetime64 jam dinding
+    - `ambang` : threshold per baris {(check, kunci): array}; default dari cache
+                 (kunci ('ambang', nama), diisi qc_multi) atau tabel ambang stasiun aktif
+    - `stasiun_segmen`: nama stasiun tiap segmen (frame multi-stasiun), None = stasiun aktif
+    - `masks`  : mask tambahan/pengganti hasil siapkan (mis. {'asli_hilang': ...})
+    - `out`    : buffer flag uint8 sepanjang `nilai` yang diisi (dipakai ulang antar panggilan)
+    - `bits`   : buffer uint16 opsional yang diisi bitmask semua check yang gagal
+    Mengembalikan array flag (uint8; `out` bila diberikan).
+    """
+    param = PARAMETERS[nama]
+    label = param['label']
+    cache = {} if cache is None else cache
+    nilai = np.asarray(nilai, dtype='float64')
+    with ukur('siapkan', label, len(nilai)):
+        if not isinstance(waktu, dict):
+            waktu = fitur_waktu(waktu, cache)
+        if ambang is None:
+            ambang = cache.get(('ambang', nama))
+        if ambang is None:
+            ambang = ambang_stasiun_aktif(nama, waktu)
+        if param['siapkan'] is not None:
+            series, masks_siapkan = param['siapkan'](nilai, waktu, ambang, stasiun_segmen)
+        else:
+            series, masks_siapkan = {'nilai': nilai}, {}
+        if masks:
+            masks_siapkan = {**masks_siapkan, **masks}
+        # Seri turunan dibagi ke tahap setelah modul (mis. interval hujan untuk qc_konsistensi)
+        cache[('seri', nama)] = series
+
+    ctx = KonteksQC(param['kolom'], waktu, series, masks_siapkan, prev_valid=prev_valid, cache=cache,
+                    ambang=ambang, flags=out, bits=bits)
+    logger.info(f"\n🔬 ({label}) Menjalankan Quality Control...")
+    with ukur('parameter', label, ctx.n, kolom=param['flag_kolom']) as catatan:
+        flags = jalankan_checks(ctx, param['checks'], label)
+        catatan['jumlah_flag'] = hitung_flag(flags)
+    return flags
+
+
+def stasiun_segmen(df, waktu):
+    """Nama stasiun tiap segmen frame multi-stasiun (None untuk frame satu stasiun)."""
+    awal = np.flatnonzero(waktu['awal_segmen'])
+    if awal.size <= 1 or KOLOM_STASIUN not in df.columns:
+        return None
+    return [str(s) for s in df[KOLOM_STASIUN].to_numpy()[awal]]
+
+
+def run_qc_parameter(df, nama, prev_valid=np.nan, cache=None, ambang=None):
+    """
+    Adapter DataFrame untuk qc_array: menjalankan QC satu parameter terdaftar
+    pada df dan menambahkan kolom flag-nya (serta kolom bitmask bila
+    bitmask_aktif(); kolom bitmask lama dibuang bila tidak). Mengembalikan df
+    (None jika kolom yang dibutuhkan tidak ada).
+    """
+    param = PARAMETERS[nama]
+    kolom, label = param['kolom'], param['label']
+    if kolom not in df.columns or 'Tanggal' not in df.columns:
+        logger.error(f"❌ ({label}) Gagal: Kolom '{kolom}' atau 'Tanggal' tidak ditemukan.")
+        return None
+
+    cache = {} if cache is None else cache
+    waktu = fitur_waktu(df['Tanggal'], cache)
+    nilai = pd.to_numeric(df[kolom], errors='coerce')
+    if param['konversi_numerik']:
+        df[kolom] = nilai
+    bits = new_bit_array(len(df)) if _BITMASK else None
+    df[param['flag_kolom']] = qc_array(nama, nilai.to_numpy(dtype='float64', na_value=np.nan), waktu,
+                                       prev_valid=prev_valid, cache=cache, ambang=ambang,
+                                       stasiun_segmen=stasiun_segmen(df, waktu), bits=bits)
+    if bits is not None:
+        df[param['bit_kolom']] = bits
+    elif param['bit_kolom'] in df.columns:
+        del df[param['bit_kolom']]
+    return df
@@ -0,0 +1,260 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+
+from qc_common import FLAG_BAIK, KOLOM_STASIUN
+from qc_registry import PARAMETERS
+from qc_waktu import fitur_waktu
+from qc_metrik import logger, ukur
+from qc_inkremental import HALO_BARIS
+import qc_hujan
+
+# =====================================================================
+#   --- 📅 REKAP HARIAN PER STASIUN (KELENGKAPAN & FLAG) ---
+# =====================================================================
+# summary_qc() tiap modul hanya mencetak value_counts satu file. Rekap ini
+# dihitung saat run QC dan disimpan sebagai tabel kolumnar kecil, satu baris
+# per (stasiun, tanggal, parameter):
+#
+#   n_baris        jumlah baris (slot 10 menit) hari itu
+#   n_ada          baris dengan nilai (tidak kosong)
+#   lengkap_pct    n_ada / SLOT_PER_HARI * 100
+#   flag_0..flag_9 jumlah baris per kode flag
+#   hujan_mm       (hanya 'hujan') total interval hujan ber-flag baik
+#
+# Tanggal = hari jam dinding 'Tanggal' (sama dengan reset hujan harian).
+# Semua hitungan dibuat dengan bincount atas kunci (stasiun, hari), tanpa
+# groupby per baris.
+#
+# Penyimpanan: <folder>/<stasiun>.parquet. Hari yang ada di run baru
+# menggantikan baris lamanya (upsert), hari lain tidak disentuh, jadi job
+# harian cukup menambahkan hari terbaru. Laporan bulanan/tahunan adalah
+# agregasi ribuan baris rekap (agregasi_rekap), bukan jutaan baris data.
+
+SLOT_PER_HARI = 24 * 6
+KODE_FLAG = tuple(range(10))
+KOLOM_HITUNG = ['n_baris', 'n_ada'] + [f'flag_{k}' for k in KODE_FLAG]
+KUNCI_REKAP = ['stasiun', 'tanggal', 'parameter']
+REKAP_BATCH_HARI = 366     # mode chunk: hari lengkap per penulisan Parquet
+
+
+def _lengkapi(rekap):
+    """Menghitung ulang lengkap_pct & mengurutkan kolom/baris rekap."""
+    rekap['lengkap_pct'] = rekap['n_ada'] / SLOT_PER_HARI * 100
+    kolom = KUNCI_REKAP + ['n_baris', 'n_ada', 'lengkap_pct'] + [f'flag_{k}' for k in KODE_FLAG] + ['hujan_mm']
+    return rekap[kolom].sort_values(KUNCI_REKAP, ignore_index=True)
+
+
+def rekap_harian(df, stasiun=None, sebelum=None):
+    """
+    Rekap per (stasiun, tanggal, parameter) dari df hasil QC (berisi kolom flag).
+    Frame multi-stasiun memakai kolom 'stasiun'; selain itu `stasiun`.
+    `sebelum`: baris mentah tepat sebelum df (mode chunk), hanya untuk
+    menurunkan interval hujan di awal df. Mengembalikan DataFrame.
+    """
+    aktif = [(nama, p['kolom'], p['flag_kolom']) for nama, p in PARAMETERS.items()
+             if p['kolom'] in df.columns and p['flag_kolom'] in df.columns]
+    if df.empty or not aktif:
+        return _lengkapi(pd.DataFrame({c: [] for c in KUNCI_REKAP + KOLOM_HITUNG + ['hujan_mm']}))
+
+    if KOLOM_STASIUN in df.columns:
+        kode, daftar = pd.factorize(df[KOLOM_STASIUN].astype(str), sort=False)
+    else:
+        kode, daftar = np.zeros(len(df), dtype=np.intp), pd.Index([str(stasiun)])
+    awal = np.ones(len(df), dtype=bool)
+    awal[1:] = kode[1:] != kode[:-1]
+    hari = fitur_waktu(df['Tanggal'], awal_segmen=awal)['id_hari']
+    hari_min = hari.min()
+    rentang = hari.max() - hari_min + 1
+    kunci, grup = np.unique(kode * rentang + (hari - hari_min), return_inverse=True)
+    g = len(kunci)
+    kode_grup, hari_grup = np.divmod(kunci, rentang)
+    n_baris = np.bincount(grup, minlength=g)
+
+    bagian = []
+    for nama, kolom, flag_kolom in aktif:
+        nilai = pd.to_numeric(df[kolom], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        flags = pd.to_numeric(df[flag_kolom], errors='coerce').fillna(FLAG_BAIK).to_numpy().astype(np.intp)
+        per_kode = np.bincount(grup * 256 + np.clip(flags, 0, 255), minlength=g * 256).reshape(g, 256)
+        hasil = {
+            'stasiun': np.asarray(daftar)[kode_grup],
+            'tanggal': (hari_grup + hari_min).astype('datetime64[D]').astype('datetime64[ns]'),
+            'parameter': nama,
+            'n_baris': n_baris,
+            'n_ada': np.bincount(grup, weights=~np.isnan(nilai), minlength=g).astype(np.int64),
+        }
+        for k in KODE_FLAG:
+            hasil[f'flag_{k}'] = per_kode[:, k]
+        hasil['hujan_mm'] = np.nan
+        if nama == 'hujan':
+            hasil['hujan_mm'] = _hujan_harian(df, sebelum, awal, flags, grup, g)
+        bagian.append(pd.DataFrame(hasil))
+    return _lengkapi(pd.concat(bagian, ignore_index=True))
+
+
+def _hujan_harian(df, sebelum, awal, flags, grup, g):
+    """Total interval hujan ber-flag baik per grup (NaN jika tidak ada interval baik)."""
+    if sebelum is not None and not sebelum.empty:
+        kolom = ['Tanggal', qc_hujan.CUMULATIVE_COLUMN]
+        frame = pd.concat([sebelum[kolom], df[kolom]], ignore_index=True)
+        # Baris pertama df melanjutkan `sebelum` (stasiun yang sama), bukan awal segmen
+        awal = np.concatenate((np.zeros(len(sebelum), dtype=bool), awal))
+        awal[0] = True
+        awal[len(sebelum)] = False
+    else:
+        frame = df
+    interval = qc_hujan.interval_hujan(frame, fitur_waktu(frame['Tanggal'], awal_segmen=awal))
+    interval = interval[len(frame) - len(df):]
+    baik = (flags == FLAG_BAIK) & ~np.isnan(interval)
+    total = np.bincount(grup, weights=np.where(baik, interval, 0.0), minlength=g)
+    return np.where(np.bincount(grup, weights=baik, minlength=g) > 0, total, np.nan)
+
+
+def gabung_parsial(rekap):
+    """Menjumlahkan baris rekap dengan kunci sama (mis. satu hari yang terbagi beberapa chunk)."""
+    if not rekap.duplicated(KUNCI_REKAP).any():
+        return rekap
+    grup = rekap.groupby(KUNCI_REKAP, sort=False)
+    hasil = grup[KOLOM_HITUNG].sum()
+    hasil['hujan_mm'] = grup['hujan_mm'].sum(min_count=1)
+    return _lengkapi(hasil.reset_index())
+
+
+def agregasi_rekap(rekap, frekuensi='M'):
+    """
+    Agregasi rekap harian per (stasiun, parameter, periode) dengan periode
+    pandas `frekuensi` ('M' bulanan, 'Y' tahunan). lengkap_pct = n_ada terhadap
+    SLOT_PER_HARI x jumlah hari kalender periode itu.
+    """
+    rekap = rekap.assign(periode=rekap['tanggal'].dt.to_period(frekuensi))
+    grup = rekap.groupby(['stasiun', 'parameter', 'periode'], sort=True)
+    hasil = grup[KOLOM_HITUNG].sum()
+    hasil['hari_ada'] = grup.size()
+    hasil['hujan_mm'] = grup['hujan_mm'].sum(min_count=1)
+    periode = hasil.index.get_level_values('periode')
+    hari_kalender = ((periode.end_time.normalize() - periode.start_time).days + 1).to_numpy()
+    hasil['lengkap_pct'] = hasil['n_ada'] / (SLOT_PER_HARI * hari_kalender) * 100
+    return hasil.reset_index()
+
+
+# =====================================================================
+#   --- 💾 Penyimpanan (Parquet per stasiun) ---
+# =====================================================================
+
+class RekapQC:
+    """
+    Rekap harian di folder `folder`, satu file Parquet per stasiun:
+    - perbarui(rekap)                  : upsert baris rekap (per stasiun)
+    - baca(stasiun, mulai, akhir, ...) : rekap gabungan untuk laporan
+    """
+
+    def __init__(self, folder):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("Rekap harian membutuhkan paket 'pyarrow' (pip install pyarrow).") from e
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, stasiun):
+        return os.path.join(self.folder, re.sub(r'[^\w.-]', '_', str(stasiun)) + '.parquet')
+
+    def perbarui(self, rekap):
+        """Baris rekap baru menggantikan baris lama dengan kunci sama. Mengembalikan {stasiun: baris}."""
+        jumlah = {}
+        for stasiun, baru in rekap.groupby('stasiun', sort=False):
+            path = self._path(stasiun)
+            with ukur('rekap', str(stasiun), len(baru)):
+                if os.path.exists(path):
+                    lama = pd.read_parquet(path, engine='pyarrow')
+                    ganti = pd.MultiIndex.from_frame(lama[KUNCI_REKAP]).isin(
+                        pd.MultiIndex.from_frame(baru[KUNCI_REKAP]))
+                    baru = pd.concat([lama[~ganti], baru], ignore_index=True)
+                baru = _lengkapi(baru)
+                sementara = f"{path}.{os.getpid()}.tmp"
+                baru.to_parquet(sementara, index=False, engine='pyarrow')
+                os.replace(sementara, path)
+            jumlah[stasiun] = len(baru)
+        return jumlah
+
+    def baca(self, stasiun=None, mulai=None, akhir=None, parameter=None):
+        """Rekap stasiun (satu nama, list, atau None = semua) dalam rentang tanggal [mulai, akhir]."""
+        if stasiun is None:
+            paths = [os.path.join(self.folder, f) for f in sorted(os.listdir(self.folder)) if f.endswith('.parquet')]
+        else:
+            paths = [self._path(s) for s in ([stasiun] if isinstance(stasiun, str) else stasiun)]
+            paths = [p for p in paths if os.path.exists(p)]
+        if not paths:
+            return _lengkapi(pd.DataFrame({c: [] for c in KUNCI_REKAP + KOLOM_HITUNG + ['hujan_mm']}))
+        rekap = pd.concat([pd.read_parquet(p, engine='pyarrow') for p in paths], ignore_index=True)
+        pilih = np.ones(len(rekap), dtype=bool)
+        if mulai is not None:
+            pilih &= (rekap['tanggal'] >= pd.Timestamp(mulai).normalize()).to_numpy()
+        if akhir is not None:
+            pilih &= (rekap['tanggal'] <= pd.Timestamp(akhir).normalize()).to_numpy()
+        if parameter is not None:
+            pilih &= (rekap['parameter'] == parameter).to_numpy()
+        return rekap[pilih].reset_index(drop=True)
+
+
+class PenulisRekap:
+    """
+    Penulis bertahap (mode chunk) yang menyusun rekap dari setiap chunk hasil
+    QC, lalu meneruskannya ke penulis lain (`teruskan`). Hanya hari terakhir
+    (yang mungkin berlanjut di chunk berikutnya) disimpan di memori; hari yang
+    sudah selesai ditampung dan disimpan sekaligus per REKAP_BATCH_HARI hari,
+    sisanya saat tutup().
+    """
+
+    def __init__(self, rekap, stasiun, teruskan=None):
+        self.rekap = rekap
+        self.stasiun = stasiun
+        self.teruskan = teruskan
+        self._terbuka = None  # rekap hari terakhir (bisa terbagi dua chunk)
+        self._selesai = []    # rekap hari yang sudah lengkap, belum disimpan
+        self._n_selesai = 0   # jumlah hari di _selesai
+        self._ekor = None     # baris terakhir chunk sebelumnya (interval hujan)
+
+    def tulis(self, df):
+        if self.teruskan is not None:
+            self.teruskan.tulis(df)
+        parsial = rekap_harian(df, self.stasiun, sebelum=self._ekor)
+        if len(df) < HALO_BARIS and self._ekor is not None:
+            df = pd.concat([self._ekor, df], ignore_index=True)
+        self._ekor = df.iloc[-HALO_BARIS:].reset_index(drop=True)
+        if parsial.empty:
+            return
+        if self._terbuka is not None:
+            parsial = gabung_parsial(pd.concat([self._terbuka, parsial], ignore_index=True))
+        terbuka = (parsial['tanggal'] == parsial['tanggal'].max()).to_numpy()
+        self._terbuka = parsial[terbuka]
+        if not terbuka.all():
+            selesai = parsial[~terbuka]
+            self._selesai.append(selesai)
+            self._n_selesai += selesai['tanggal'].nunique()
+            if self._n_selesai >= REKAP_BATCH_HARI:
+                self._simpan()
+
+    def _simpan(self):
+        if self._selesai:
+            self.rekap.perbarui(pd.concat(self._selesai, ignore_index=True))
+        self._selesai, self._n_selesai = [], 0
+
+    def tutup(self):
+        """Menyimpan semua hari yang masih tertampung, termasuk hari terakhir."""
+        if self._terbuka is not None:
+            self._selesai.append(self._terbuka)
+            self._terbuka = None
+        self._simpan()
+
+
+def rekapkan(df, stasiun, rekap_dir):
+    """Memperbarui rekap harian `rekap_dir` dari df hasil QC (per stasiun pada frame multi-stasiun)."""
+    with ukur('tahap', 'rekap', len(df)):
+        rekap = rekap_harian(df, stasiun)
+        jumlah = RekapQC(rekap_dir).perbarui(rekap)
+    hari = rekap.drop_duplicates(['stasiun', 'tanggal'])
+    logger.info(f"  - Rekap harian: {len(hari)} stasiun-hari diperbarui di '{rekap_dir}' "
+                f"({len(jumlah)} stasiun).")
+    return rekap
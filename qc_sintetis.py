@@ -0,0 +1,118 @@
+import pandas as pd
+import numpy as np
+
+from qc_waktu import fitur_waktu
+from qc_surya import geometri_matahari
+from qc_radiasi import LINTANG_STASIUN, BUJUR_STASIUN
+
+# =====================================================================
+#   --- 🧪 GENERATOR DATA AWS SINTETIS (10 MENIT) ---
+# =====================================================================
+# Menghasilkan data AWS realistis + gangguan yang sengaja disisipkan,
+# untuk benchmark dan uji skala QC. Seluruhnya tervektorisasi (tanpa loop
+# per baris), sehingga puluhan juta baris bisa dibuat dalam hitungan detik.
+# Hasil deterministik untuk `seed` yang sama.
+
+BARIS_PER_HARI = 144
+
+# --- Radiasi (sr_avg) ---
+SR_PUNCAK = 950.0              # W/m², radiasi cerah saat matahari di zenit
+SR_NOISE = 15.0
+
+# --- Hujan (rr kumulatif, reset tengah malam) ---
+RR_PELUANG_HUJAN = 0.08        # peluang satu interval 10 menit ada hujan
+RR_RATA_INTERVAL = 1.5         # mm, rata-rata hujan per interval basah
+
+# --- Tekanan (pp_air) ---
+PP_RATA = 1010.0
+PP_AMPLITUDO_HARIAN = 1.5      # pasang surut atmosfer (semi-diurnal)
+PP_NOISE = 0.2
+
+# --- Gangguan yang disisipkan (proporsi baris) ---
+PELUANG_GAP = 0.002            # awal blok data hilang (semua parameter)
+PANJANG_GAP_MAKS = 36
+PELUANG_SPIKE = 0.0005
+PELUANG_FLAT = 0.0005          # awal blok sensor macet (pp_air & sr_avg)
+PANJANG_FLAT_MAKS = 60
+PELUANG_DROP = 0.0003          # penurunan kumulatif hujan tidak wajar
+
+
+def _blok_acak(rng, n, peluang, panjang_maks):
+    """Blok acak: awal ~ Bernoulli(peluang), panjang 1..panjang_maks. Mengembalikan (mask, awal, panjang)."""
+    awal = np.flatnonzero(rng.random(n) < peluang)
+    panjang = rng.integers(1, panjang_maks + 1, size=awal.size)
+    akhir = np.minimum(awal + panjang, n)
+    delta = np.bincount(awal, minlength=n + 1) - np.bincount(akhir, minlength=n + 1)
+    return np.cumsum(delta[:n]) > 0, awal, panjang
+
+
+def _isi_flat(nilai, awal, panjang):
+    """Nilai dalam tiap blok dibuat konstan sama dengan nilai di awal blok (in-place)."""
+    n = len(nilai)
+    idx = np.arange(n)
+    penanda = np.full(n, -1)
+    penanda[awal] = awal
+    awal_terakhir = np.maximum.accumulate(penanda)
+    akhir = np.zeros(n, dtype=np.int64)
+    akhir[awal] = awal + panjang
+    dalam = (awal_terakhir >= 0) & (idx < akhir[np.maximum(awal_terakhir, 0)])
+    nilai[dalam] = nilai[awal_terakhir[dalam]]
+    return nilai
+
+
+def buat_data_aws(n_baris, seed=0, mulai='2020-01-01'):
+    """
+    DataFrame AWS sintetis n_baris x ['Tanggal', 'rr', 'pp_air', 'sr_avg'] (10 menit, UTC).
+
+    - sr_avg : pola harian (cos zenit matahari di lokasi default qc_radiasi) + awan + noise,
+               0 di malam hari
+    - rr     : kumulatif harian (reset 00:00) dengan penurunan tidak wajar disisipkan
+    - pp_air : rata-rata + pasang surut 12 jam + noise
+    Semua parameter mendapat gap (NaN); pp_air & sr_avg mendapat flat line & spike.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(n_baris)
+    tanggal = pd.date_range(mulai, periods=n, freq='10min', tz='UTC')
+    menit = (np.arange(n) % BARIS_PER_HARI) * 10.0
+    jam = menit / 60.0
+    hari = np.arange(n) // BARIS_PER_HARI
+
+    # --- Radiasi ---
+    cos_zenit = geometri_matahari(fitur_waktu(pd.Series(tanggal)), LINTANG_STASIUN, BUJUR_STASIUN)['cos_zenit']
+    siang = cos_zenit > 0
+    awan = np.repeat(rng.uniform(0.4, 1.0, size=hari[-1] + 1 if n else 0), BARIS_PER_HARI)[:n]
+    sr = np.where(siang, SR_PUNCAK * cos_zenit * awan, 0.0)
+    sr = np.clip(sr + rng.normal(0, SR_NOISE, n) * siang, 0, None).round(1)
+
+    # --- Hujan (kumulatif dengan reset tengah malam) ---
+    interval = np.where(rng.random(n) < RR_PELUANG_HUJAN, rng.exponential(RR_RATA_INTERVAL, n), 0.0).round(1)
+    total = np.cumsum(interval)
+    awal_hari = np.flatnonzero(menit == 0)
+    dasar = np.zeros(n)
+    if awal_hari.size:
+        dasar_hari = total[awal_hari] - interval[awal_hari]
+        pos = np.searchsorted(awal_hari, np.arange(n), side='right') - 1
+        dasar = np.where(pos >= 0, dasar_hari[np.maximum(pos, 0)], 0.0)
+    rr = (total - dasar).round(1)
+    idx_drop = np.flatnonzero((rng.random(n) < PELUANG_DROP) & (menit > 30))
+    rr[idx_drop] = np.maximum(rr[idx_drop] - rng.uniform(2, 10, idx_drop.size), 0).round(1)
+
+    # --- Tekanan ---
+    pp = (PP_RATA + PP_AMPLITUDO_HARIAN * np.sin(2 * np.pi * jam / 12.0)
+          + np.cumsum(rng.normal(0, 0.02, n)) * 0.1 + rng.normal(0, PP_NOISE, n)).round(1)
+
+    # --- Gangguan: flat line, spike ---
+    for arr in (pp, sr):
+        _, awal, panjang = _blok_acak(rng, n, PELUANG_FLAT, PANJANG_FLAT_MAKS)
+        _isi_flat(arr, awal, panjang)
+    idx_spike = np.flatnonzero(rng.random(n) < PELUANG_SPIKE)
+    pp[idx_spike] += rng.choice([-1, 1], idx_spike.size) * rng.uniform(6, 30, idx_spike.size)
+    idx_spike = np.flatnonzero(rng.random(n) < PELUANG_SPIKE)
+    sr[idx_spike] = np.clip(sr[idx_spike] + rng.uniform(900, 1400, idx_spike.size), 0, None)
+
+    # --- Gangguan: gap (NaN) ---
+    for arr in (rr, pp, sr):
+        gap, _, _ = _blok_acak(rng, n, PELUANG_GAP, PANJANG_GAP_MAKS)
+        arr[gap] = np.nan
+
+    return pd.DataFrame({'Tanggal': tanggal, 'rr': rr, 'pp_air': pp, 'sr_avg': sr})
@@ -0,0 +1,271 @@
+import os
+import numpy as np
+import pandas as pd
+
+from qc_common import FLAG_BAIK, BIT_SUFFIX, KOLOM_STASIUN
+from qc_registry import register_tahap, tandai_bit_tahap
+from qc_waktu import fitur_waktu
+from qc_metrik import logger, ukur
+import qc_hujan
+import qc_tekanan
+
+# =====================================================================
+#   --- 🛰️ BUDDY CHECK SPASIAL (ANTAR STASIUN TETANGGA) ---
+# =====================================================================
+# Setiap modul QC hanya melihat deret satu stasiun, sehingga nilai yang
+# wajar secara lokal tetapi salah secara regional lolos semua check. Tahap
+# ini membandingkan tiap nilai 10 menit dengan k stasiun terdekat pada
+# timestamp yang sama:
+#
+#   - indeks spasial: cKDTree (scipy) atas koordinat stasiun di bola satuan
+#     (jarak tali busur ~ jarak lingkaran besar), dibangun sekali per run;
+#   - data disusun sebagai matriks [waktu x stasiun]; nilai tetangga diambil
+#     dengan satu indeks gather [waktu, tetangga] per blok waktu, tanpa
+#     lookup per baris;
+#   - tekanan direduksi ke ELEVASI_ACUAN (atmosfer standar) sebelum
+#     dibandingkan dengan median tetangga;
+#   - hujan (interval 10 menit dari 'rr' kumulatif): hujan lebat di satu
+#     stasiun sementara semua tetangga valid kering.
+#
+# Hanya nilai yang belum ber-flag yang diuji dan dipakai sebagai tetangga.
+# Hasilnya ditandai FLAG_BUDDY pada kolom flag parameter itu (dan BIT_BUDDY,
+# bit cadangan 15, pada kolom bitmask '<kolom>_qcbit' bila ada).
+
+FLAG_BUDDY = 6
+BIT_BUDDY = register_tahap('buddy', 15, FLAG_BUDDY)
+
+# --- Tetangga ---
+BUDDY_K = 5                    # jumlah tetangga terdekat
+BUDDY_JARAK_MAKS_KM = 75.0     # tetangga lebih jauh dari ini diabaikan
+BUDDY_MIN_TETANGGA = 2         # minimal tetangga valid pada timestamp itu
+
+# --- Tekanan (hPa, setelah reduksi ke ELEVASI_ACUAN) ---
+ELEVASI_ACUAN = 0.0            # m (permukaan laut)
+TINGGI_SKALA = 8434.5          # m, R * T0 / g untuk T0 = 288.15 K
+BUDDY_TEKANAN_THRESHOLD = 5.0  # |p - median tetangga| di atas ini = tidak konsisten
+
+# --- Hujan (mm per 10 menit) ---
+BUDDY_HUJAN_MIN = 5.0          # interval hujan minimum yang diuji
+BUDDY_HUJAN_KERING = 0.0       # semua tetangga <= nilai ini = kering
+
+# Batas elemen blok [waktu x stasiun x k] per langkah (memori ~8 byte/elemen)
+BUDDY_BLOK_ELEMEN = 8_000_000
+
+RADIUS_BUMI_KM = 6371.0
+KOLOM_METADATA = ['stasiun', 'lintang', 'bujur', 'elevasi']
+
+
+def _pastikan_scipy():
+    try:
+        from scipy.spatial import cKDTree
+    except ImportError as e:
+        raise ImportError("Buddy check spasial membutuhkan paket 'scipy' (pip install scipy).") from e
+    return cKDTree
+
+
+# =====================================================================
+#   --- 🗺️ Metadata Stasiun ---
+# =====================================================================
+
+def baca_metadata_stasiun(path):
+    """
+    Metadata stasiun (CSV/Excel: stasiun, lintang, bujur, elevasi [m]) ->
+    DataFrame berindeks nama stasiun.
+    """
+    if path.lower().endswith(('.xlsx', '.xls')):
+        meta = pd.read_excel(path, dtype={'stasiun': str})
+    else:
+        meta = pd.read_csv(path, dtype={'stasiun': str})
+    hilang = [c for c in KOLOM_METADATA if c not in meta.columns]
+    if hilang:
+        raise ValueError(f"Metadata stasiun '{path}' tidak memiliki kolom: {', '.join(hilang)}.")
+    meta = meta[KOLOM_METADATA].copy()
+    meta['stasiun'] = meta['stasiun'].str.strip()
+    for col in ('lintang', 'bujur', 'elevasi'):
+        meta[col] = pd.to_numeric(meta[col], errors='coerce')
+    if meta[['lintang', 'bujur']].isna().any().any():
+        raise ValueError(f"Lintang/bujur stasiun di '{path}' harus numerik dan tidak boleh kosong.")
+    if meta['stasiun'].duplicated().any():
+        raise ValueError(f"Stasiun ganda di metadata '{path}': "
+                         f"{', '.join(meta.loc[meta['stasiun'].duplicated(), 'stasiun'])}.")
+    logger.info(f"🗺️ Metadata {len(meta)} stasiun dibaca dari '{os.path.basename(path)}'.")
+    return meta.set_index('stasiun')
+
+
+def lokasi_dari_metadata(meta):
+    """{stasiun: (lintang, bujur)} untuk qc_radiasi.LOKASI_STASIUN."""
+    return {s: (float(r.lintang), float(r.bujur)) for s, r in meta.iterrows()}
+
+
+# Metadata yang dipakai run berjalan (diatur lewat atur_metadata_stasiun)
+_METADATA = None
+
+
+def atur_metadata_stasiun(meta=None):
+    """Mengatur metadata stasiun untuk buddy check berikutnya (None = tanpa buddy check)."""
+    global _METADATA
+    _METADATA = meta
+
+
+def metadata_aktif():
+    return _METADATA
+
+
+class IndeksTetangga:
+    """
+    k tetangga terdekat tiap stasiun dari cKDTree (dibangun sekali).
+    `tetangga[s]` = indeks kolom tetangga stasiun s, atau len(stasiun) bila
+    tidak ada (kolom NaN tambahan pada matriks).
+    """
+
+    def __init__(self, lintang, bujur, k=BUDDY_K, jarak_maks_km=BUDDY_JARAK_MAKS_KM):
+        cKDTree = _pastikan_scipy()
+        phi, lam = np.deg2rad(np.asarray(lintang, dtype=float)), np.deg2rad(np.asarray(bujur, dtype=float))
+        xyz = np.column_stack((np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)))
+        n = len(xyz)
+        self.k = min(k, max(n - 1, 0))
+        self.tetangga = np.full((n, self.k), n, dtype=np.intp)
+        self.jarak_km = np.full((n, self.k), np.inf)
+        if self.k == 0:
+            return
+        # Jarak tali busur (bola satuan) untuk jarak lingkaran besar maksimum
+        tali_maks = 2 * np.sin(min(jarak_maks_km / RADIUS_BUMI_KM, np.pi) / 2)
+        jarak, indeks = cKDTree(xyz).query(xyz, k=self.k + 1, distance_upper_bound=tali_maks)
+        jarak, indeks = jarak[:, 1:], indeks[:, 1:]    # kolom 0 = stasiun itu sendiri
+        ada = np.isfinite(jarak)
+        self.tetangga[ada] = indeks[ada]
+        self.jarak_km[ada] = 2 * RADIUS_BUMI_KM * np.arcsin(np.clip(jarak[ada] / 2, 0, 1))
+
+
+def reduksi_tekanan(tekanan, elevasi, acuan=ELEVASI_ACUAN):
+    """Tekanan (hPa) di elevasi stasiun -> elevasi acuan, atmosfer standar (isotermal T0)."""
+    return tekanan * np.exp((np.asarray(elevasi, dtype=float) - acuan) / TINGGI_SKALA)
+
+
+# =====================================================================
+#   --- 🧮 Matriks [waktu x stasiun] & Perbandingan Tetangga ---
+# =====================================================================
+
+def _blok_waktu(jumlah_waktu, jumlah_stasiun, k):
+    ukuran = max(BUDDY_BLOK_ELEMEN // max(jumlah_stasiun * max(k, 1), 1), 1)
+    for mulai in range(0, jumlah_waktu, ukuran):
+        yield slice(mulai, min(mulai + ukuran, jumlah_waktu))
+
+
+def _tetangga_per_blok(matriks, indeks):
+    """Generator (slice waktu, nilai [waktu, stasiun], nilai tetangga [waktu, stasiun, k])."""
+    # Kolom NaN tambahan untuk tetangga yang tidak ada
+    for blok in _blok_waktu(matriks.shape[0], matriks.shape[1] - 1, indeks.k):
+        sub = matriks[blok]
+        yield blok, sub[:, :-1], sub[:, indeks.tetangga]
+
+
+def _median_tetangga(tetangga, valid):
+    """
+    Median nilai valid sepanjang sumbu tetangga (k kecil): sort (NaN di akhir)
+    lalu ambil elemen tengah, jauh lebih cepat dari np.nanmedian per baris.
+    """
+    urut = np.sort(tetangga, axis=2)
+    k = urut.shape[2]
+    bawah = np.clip((valid - 1) // 2, 0, k - 1)[..., None]
+    atas = np.clip(valid // 2, 0, k - 1)[..., None]
+    median = (np.take_along_axis(urut, bawah, axis=2)[..., 0] + np.take_along_axis(urut, atas, axis=2)[..., 0]) / 2
+    return np.where(valid > 0, median, np.nan)
+
+
+def uji_tekanan(matriks, indeks, threshold=BUDDY_TEKANAN_THRESHOLD, min_tetangga=BUDDY_MIN_TETANGGA):
+    """Mask [waktu, stasiun]: |p - median tetangga| > threshold dengan >= min_tetangga valid."""
+    hasil = np.zeros((matriks.shape[0], matriks.shape[1] - 1), dtype=bool)
+    for blok, nilai, tetangga in _tetangga_per_blok(matriks, indeks):
+        valid = np.count_nonzero(~np.isnan(tetangga), axis=2)
+        cukup = valid >= min_tetangga
+        hasil[blok] = cukup & (np.abs(nilai - _median_tetangga(tetangga, valid)) > threshold)
+    return hasil
+
+
+def uji_hujan(matriks, indeks, minimum=BUDDY_HUJAN_MIN, kering=BUDDY_HUJAN_KERING,
+              min_tetangga=BUDDY_MIN_TETANGGA):
+    """Mask [waktu, stasiun]: interval >= minimum sementara semua (>= min_tetangga) tetangga kering."""
+    hasil = np.zeros((matriks.shape[0], matriks.shape[1] - 1), dtype=bool)
+    for blok, nilai, tetangga in _tetangga_per_blok(matriks, indeks):
+        valid = ~np.isnan(tetangga)
+        semua_kering = np.all(~valid | (tetangga <= kering), axis=2)
+        hasil[blok] = (nilai >= minimum) & semua_kering & (np.count_nonzero(valid, axis=2) >= min_tetangga)
+    return hasil
+
+
+def _detik_utc(tanggal):
+    """'Tanggal' -> int64 detik epoch UTC (array numerik, bukan objek Timestamp)."""
+    if getattr(tanggal.dt, 'tz', None) is not None:
+        tanggal = tanggal.dt.tz_convert('UTC').dt.tz_localize(None)
+    return tanggal.to_numpy().astype('datetime64[s]').view('int64')
+
+
+# Parameter yang diuji: (label, kolom flag, kolom bitmask, nilai per baris, fungsi uji)
+def _parameter_buddy(df, awal_segmen, elevasi_baris):
+    daftar = []
+    if qc_tekanan.COLUMN_TO_CHECK in df.columns and qc_tekanan.FLAG_COLUMN in df.columns:
+        tekanan = pd.to_numeric(df[qc_tekanan.COLUMN_TO_CHECK], errors='coerce').to_numpy(dtype='float64',
+                                                                                         na_value=np.nan)
+        daftar.append(('Tekanan', qc_tekanan.FLAG_COLUMN, f'{qc_tekanan.COLUMN_TO_CHECK}{BIT_SUFFIX}',
+                       reduksi_tekanan(tekanan, elevasi_baris), uji_tekanan))
+    if qc_hujan.CUMULATIVE_COLUMN in df.columns and qc_hujan.FLAG_COLUMN in df.columns:
+        interval = qc_hujan.interval_hujan(df, fitur_waktu(df['Tanggal'], awal_segmen=awal_segmen))
+        daftar.append(('Hujan', qc_hujan.FLAG_COLUMN, f'{qc_hujan.CUMULATIVE_COLUMN}{BIT_SUFFIX}',
+                       interval, uji_hujan))
+    return daftar
+
+
+def buddy_check(df, meta, kolom_stasiun=KOLOM_STASIUN):
+    """
+    Buddy check spasial pada frame multi-stasiun hasil QC modul (berurutan per
+    stasiun lalu 'Tanggal', berisi kolom flag). Baris yang belum ber-flag dan
+    tidak konsisten dengan tetangganya ditandai FLAG_BUDDY. Mengembalikan df.
+    """
+    stasiun_baris = df[kolom_stasiun].astype(str).to_numpy()
+    kode, daftar = pd.factorize(stasiun_baris, sort=False)
+    daftar = list(daftar)
+    dikenal = np.array([s in meta.index for s in daftar], dtype=bool)
+    if not dikenal.all():
+        logger.warning(f"⚠️ Buddy check: {np.count_nonzero(~dikenal)} stasiun tanpa koordinat dilewati "
+                       f"({', '.join(s for s, d in zip(daftar, dikenal) if not d)}).")
+    if np.count_nonzero(dikenal) < 2:
+        logger.warning("⚠️ Buddy check dilewati: butuh minimal 2 stasiun dengan koordinat.")
+        return df
+
+    # Kolom matriks = stasiun yang punya koordinat; baris = timestamp unik
+    kolom_stasiun_ke = np.cumsum(dikenal) - 1
+    info = meta.loc[[s for s, d in zip(daftar, dikenal) if d]]
+    jumlah_kolom = len(info)
+    baris_dipakai = dikenal[kode]
+    kolom = kolom_stasiun_ke[kode]
+    waktu = _detik_utc(df['Tanggal'])
+    waktu_unik = np.unique(waktu[baris_dipakai])
+    baris_matriks = np.searchsorted(waktu_unik, waktu)
+
+    awal = np.ones(len(df), dtype=bool)
+    awal[1:] = kode[1:] != kode[:-1]
+    elevasi = info['elevasi'].fillna(ELEVASI_ACUAN).to_numpy()
+    elevasi_baris = np.where(baris_dipakai, elevasi[np.where(baris_dipakai, kolom, 0)], ELEVASI_ACUAN)
+
+    with ukur('tahap', 'buddy_spasial', len(df), jumlah_stasiun=jumlah_kolom) as catatan:
+        indeks = IndeksTetangga(info['lintang'].to_numpy(), info['bujur'].to_numpy())
+        tanpa_tetangga = int(np.count_nonzero(np.all(indeks.tetangga == jumlah_kolom, axis=1)))
+        logger.info(f"\n🛰️ Buddy check spasial: {jumlah_kolom} stasiun, {len(waktu_unik)} timestamp, "
+                    f"k={indeks.k}, jarak maks {BUDDY_JARAK_MAKS_KM:g} km "
+                    f"({tanpa_tetangga} stasiun tanpa tetangga).")
+        for label, flag_kolom, bit_kolom, nilai, uji in _parameter_buddy(df, awal, elevasi_baris):
+            flags = df[flag_kolom].to_numpy().copy()
+            belum = baris_dipakai & (flags == FLAG_BAIK)
+            matriks = np.full((len(waktu_unik), jumlah_kolom + 1), np.nan)
+            matriks[baris_matriks[belum], kolom[belum]] = nilai[belum]
+            tidak_konsisten = uji(matriks, indeks)
+            tandai = np.zeros(len(df), dtype=bool)
+            tandai[belum] = tidak_konsisten[baris_matriks[belum], kolom[belum]]
+            flags[tandai] = FLAG_BUDDY
+            df[flag_kolom] = flags
+            tandai_bit_tahap(df, bit_kolom, BIT_BUDDY, tandai)
+            catatan[f'ditandai_{label.lower()}'] = int(np.count_nonzero(tandai))
+            logger.info(f"  - ({label}) {np.count_nonzero(tandai)} data ditandai Flag {FLAG_BUDDY} "
+                        f"(tidak konsisten dengan tetangga).")
+    return df
@@ -0,0 +1,254 @@
+import os
+import sqlite3
+from itertools import repeat
+import pandas as pd
+import numpy as np
+
+from qc_common import FLAG_SUFFIX, BIT_SUFFIX, KOLOM_STASIUN
+
+# =====================================================================
+#   --- 🗃️ BACKEND SQLITE (BULK UPSERT, INDEKS STASIUN-WAKTU) ---
+# =====================================================================
+# Hasil QC semua stasiun disimpan dalam satu tabel SQLite lokal:
+#
+#   observasi(stasiun TEXT, Tanggal INTEGER, <kolom data REAL>, <kolom flag INTEGER>, ...)
+#   PRIMARY KEY (stasiun, Tanggal)  -- tabel WITHOUT ROWID = indeks komposit
+#
+# 'Tanggal' disimpan sebagai detik epoch UTC. Kolom baru ditambahkan otomatis
+# (ALTER TABLE). Penulisan = upsert per baris (stasiun, Tanggal) lewat
+# executemany per batch, satu transaksi per DataFrame/chunk, mode WAL
+# (pembaca tidak memblokir penulis; beberapa worker batch bisa menulis ke
+# satu file secara bergantian).
+#
+# Stasiun dipilih lewat path 'hasil.sqlite#NAMA_STASIUN' (diutamakan),
+# argumen `stasiun`, atau kolom 'stasiun' di DataFrame (frame multi-stasiun).
+
+SQLITE_TABEL = 'observasi'
+SQLITE_BATCH = 50_000          # baris per executemany
+SQLITE_TIMEOUT = 60.0          # detik menunggu kunci tulis worker lain
+KOLOM_TANGGAL = 'Tanggal'
+SQLITE_EKSTENSI = ('.sqlite', '.sqlite3', '.db')
+
+
+def pisah_path(path):
+    """
+    'hasil.sqlite#Tangsel' -> ('hasil.sqlite', 'Tangsel'); selain itu -> (path, None).
+
+    Hanya dipisah bila bagian sebelum '#' berekstensi SQLite, jadi '#' yang sah
+    di nama file/folder lain (mis. 'data#2/Tangsel.csv') tidak ikut terpotong.
+    """
+    for i, huruf in enumerate(path):
+        if huruf == '#' and path[:i].lower().endswith(SQLITE_EKSTENSI):
+            return path[:i], path[i + 1:] or None
+    return path, None
+
+
+def buka(file):
+    """Koneksi SQLite dengan WAL & synchronous=NORMAL (aman untuk WAL, jauh lebih cepat)."""
+    con = sqlite3.connect(file, timeout=SQLITE_TIMEOUT, isolation_level=None)
+    con.execute('PRAGMA journal_mode=WAL')
+    con.execute('PRAGMA synchronous=NORMAL')
+    return con
+
+
+def _kolom_tabel(con):
+    """{nama kolom: tipe} tabel observasi (urut sesuai tabel)."""
+    return {baris[1]: baris[2] for baris in con.execute(f'PRAGMA table_info({SQLITE_TABEL})')}
+
+
+def _tipe_sql(seri):
+    if str(seri.name).endswith(FLAG_SUFFIX) or pd.api.types.is_integer_dtype(seri) or pd.api.types.is_bool_dtype(seri):
+        return 'INTEGER'
+    if pd.api.types.is_numeric_dtype(seri):
+        return 'REAL'
+    return 'TEXT'
+
+
+def _siapkan_tabel(con, df):
+    """Membuat tabel & menambah kolom yang belum ada."""
+    con.execute(f'CREATE TABLE IF NOT EXISTS {SQLITE_TABEL} ('
+                f'"{KOLOM_STASIUN}" TEXT NOT NULL, "{KOLOM_TANGGAL}" INTEGER NOT NULL, '
+                f'PRIMARY KEY ("{KOLOM_STASIUN}", "{KOLOM_TANGGAL}")) WITHOUT ROWID')
+    ada = set(_kolom_tabel(con))
+    for col in df.columns:
+        if col not in ada:
+            con.execute(f'ALTER TABLE {SQLITE_TABEL} ADD COLUMN "{col}" {_tipe_sql(df[col])}')
+
+
+def _epoch_detik(tanggal):
+    tanggal = pd.Series(tanggal)
+    if getattr(tanggal.dt, 'tz', None) is not None:
+        tanggal = tanggal.dt.tz_convert('UTC').dt.tz_localize(None)
+    return tanggal.to_numpy().astype('datetime64[s]').astype(np.int64)
+
+
+def _nilai_python(seri):
+    """Kolom -> list nilai Python (NaN/NA -> None)."""
+    if pd.api.types.is_numeric_dtype(seri) or pd.api.types.is_bool_dtype(seri):
+        arr = seri.to_numpy(dtype='float64', na_value=np.nan)
+        if str(seri.name).endswith(FLAG_SUFFIX) or pd.api.types.is_integer_dtype(seri):
+            kosong = np.isnan(arr)
+            nilai = arr.astype(np.int64).tolist() if not kosong.any() else [
+                None if k else int(v) for v, k in zip(arr.tolist(), kosong.tolist())]
+            return nilai
+        return arr.tolist()   # NaN disimpan SQLite sebagai NULL
+    return [None if pd.isna(v) else str(v) for v in seri.tolist()]
+
+
+def tulis_sqlite(df, path, stasiun=None, con=None):
+    """
+    Upsert DataFrame hasil QC ke tabel observasi dalam satu transaksi.
+    Kolom yang tidak ada di df tidak diubah pada baris yang sudah ada.
+    Mengembalikan jumlah baris yang ditulis.
+    """
+    file, stasiun_path = pisah_path(path)
+    stasiun = stasiun_path or stasiun
+    kolom = [c for c in df.columns if c not in (KOLOM_STASIUN, KOLOM_TANGGAL)]
+    if stasiun is not None:
+        daftar_stasiun = repeat(str(stasiun), len(df))
+    elif KOLOM_STASIUN in df.columns:
+        daftar_stasiun = df[KOLOM_STASIUN].astype(str).tolist()
+    else:
+        raise ValueError(f"Stasiun untuk SQLite belum ditentukan (gunakan '{file}#NAMA_STASIUN').")
+
+    tutup = con is None
+    con = con or buka(file)
+    try:
+        _siapkan_tabel(con, df[kolom])
+        semua = [KOLOM_STASIUN, KOLOM_TANGGAL] + kolom
+        daftar = ', '.join(f'"{c}"' for c in semua)
+        tanda = ', '.join('?' * len(semua))
+        ubah = ', '.join(f'"{c}" = excluded."{c}"' for c in kolom)
+        sql = (f'INSERT INTO {SQLITE_TABEL} ({daftar}) VALUES ({tanda}) '
+               f'ON CONFLICT ("{KOLOM_STASIUN}", "{KOLOM_TANGGAL}") '
+               + (f'DO UPDATE SET {ubah}' if kolom else 'DO NOTHING'))
+        baris = zip(daftar_stasiun, _epoch_detik(df[KOLOM_TANGGAL]).tolist(),
+                    *(_nilai_python(df[c]) for c in kolom))
+        con.execute('BEGIN')
+        try:
+            while True:
+                batch = [b for _, b in zip(range(SQLITE_BATCH), baris)]
+                if not batch:
+                    break
+                con.executemany(sql, batch)
+            con.execute('COMMIT')
+        except BaseException:
+            con.execute('ROLLBACK')
+            raise
+    finally:
+        if tutup:
+            con.close()
+    return len(df)
+
+
+def _query(path, stasiun=None, mulai=None, akhir=None, kolom=None, tanpa_flag=False):
+    """(file, sql, parameter, {kolom hasil: tipe}) untuk membaca rentang stasiun-waktu."""
+    file, stasiun_path = pisah_path(path)
+    stasiun = stasiun_path or stasiun
+    if not os.path.exists(file):
+        raise FileNotFoundError(2, 'File tidak ditemukan', file)
+    con = sqlite3.connect(file, timeout=SQLITE_TIMEOUT)
+    try:
+        ada = _kolom_tabel(con)
+        if not ada:
+            raise ValueError(f"Tabel '{SQLITE_TABEL}' tidak ada di '{file}'.")
+        if stasiun is not None and con.execute(
+                f'SELECT 1 FROM {SQLITE_TABEL} WHERE "{KOLOM_STASIUN}" = ? LIMIT 1', (str(stasiun),)).fetchone() is None:
+            raise ValueError(f"Stasiun '{stasiun}' tidak ada di '{file}'.")
+    finally:
+        con.close()
+    if kolom is None:
+        kolom = [c for c in ada if c not in (KOLOM_STASIUN, KOLOM_TANGGAL)
+                 and not (tanpa_flag and c.endswith((FLAG_SUFFIX, BIT_SUFFIX)))]
+    else:
+        kolom = [c for c in kolom if c in ada and c not in (KOLOM_STASIUN, KOLOM_TANGGAL)]
+    pilih = ([] if stasiun is not None else [KOLOM_STASIUN]) + [KOLOM_TANGGAL] + kolom
+
+    syarat, parameter = [], []
+    if stasiun is not None:
+        syarat.append(f'"{KOLOM_STASIUN}" = ?')
+        parameter.append(str(stasiun))
+    if mulai is not None:
+        syarat.append(f'"{KOLOM_TANGGAL}" >= ?')
+        parameter.append(int(_epoch_detik([pd.Timestamp(mulai)])[0]))
+    if akhir is not None:
+        syarat.append(f'"{KOLOM_TANGGAL}" <= ?')
+        parameter.append(int(_epoch_detik([pd.Timestamp(akhir)])[0]))
+    kolom_sql = ', '.join(f'"{c}"' for c in pilih)
+    sql = (f'SELECT {kolom_sql} FROM {SQLITE_TABEL}'
+           + (f' WHERE {" AND ".join(syarat)}' if syarat else '')
+           + f' ORDER BY "{KOLOM_STASIUN}", "{KOLOM_TANGGAL}"')
+    return file, sql, parameter, {c: ada[c] for c in pilih}
+
+
+def _ke_dataframe(baris, pilih):
+    df = pd.DataFrame.from_records(baris, columns=list(pilih), coerce_float=True)
+    df[KOLOM_TANGGAL] = pd.to_datetime(df[KOLOM_TANGGAL].astype('int64'), unit='s', utc=True)
+    for col, tipe in pilih.items():
+        if col.endswith(FLAG_SUFFIX):
+            df[col] = df[col].astype('UInt8')
+        elif col.endswith(BIT_SUFFIX):
+            df[col] = df[col].astype('UInt16')
+        elif tipe == 'REAL':
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    return df
+
+
+def baca_sqlite(path, stasiun=None, mulai=None, akhir=None, kolom=None, tanpa_flag=False):
+    """
+    Membaca baris satu stasiun (atau semua stasiun, dengan kolom 'stasiun')
+    dalam rentang [mulai, akhir] (UTC, inklusif) lewat indeks (stasiun, Tanggal).
+    `kolom`: hanya kolom ini (selain 'Tanggal'); `tanpa_flag`: lewati kolom flag.
+    """
+    file, sql, parameter, pilih = _query(path, stasiun, mulai, akhir, kolom, tanpa_flag)
+    con = sqlite3.connect(file, timeout=SQLITE_TIMEOUT)
+    try:
+        return _ke_dataframe(con.execute(sql, parameter).fetchall(), pilih)
+    finally:
+        con.close()
+
+
+def baca_sqlite_per_chunk(path, ukuran_chunk, stasiun=None, mulai=None, akhir=None, kolom=None,
+                          tanpa_flag=False):
+    """Seperti baca_sqlite(), sebagai generator DataFrame berurutan ~`ukuran_chunk` baris."""
+    file, sql, parameter, pilih = _query(path, stasiun, mulai, akhir, kolom, tanpa_flag)
+    con = sqlite3.connect(file, timeout=SQLITE_TIMEOUT)
+    try:
+        kursor = con.execute(sql, parameter)
+        while True:
+            baris = kursor.fetchmany(ukuran_chunk)
+            if not baris:
+                break
+            yield _ke_dataframe(baris, pilih)
+    finally:
+        con.close()
+
+
+def daftar_stasiun_sqlite(path):
+    """Nama-nama stasiun yang ada di database (urut)."""
+    file, _ = pisah_path(path)
+    con = sqlite3.connect(file, timeout=SQLITE_TIMEOUT)
+    try:
+        if not _kolom_tabel(con):
+            return []
+        return [b[0] for b in con.execute(f'SELECT DISTINCT "{KOLOM_STASIUN}" FROM {SQLITE_TABEL} '
+                                          f'ORDER BY "{KOLOM_STASIUN}"')]
+    finally:
+        con.close()
+
+
+class PenulisSQLite:
+    """Upsert chunk demi chunk (satu transaksi per chunk) lewat satu koneksi."""
+
+    def __init__(self, path, stasiun=None):
+        self.path = path
+        self.stasiun = stasiun
+        self._con = buka(pisah_path(path)[0])
+
+    def tulis(self, df):
+        tulis_sqlite(df, self.path, self.stasiun, con=self._con)
+
+    def tutup(self):
+        if self._con is not None:
+            self._con.close()
+            self._con = None
@@ -0,0 +1,106 @@
+import functools
+import numpy as np
+
+from qc_waktu import INTERVAL_MENIT, DETIK_PER_HARI
+
+# =====================================================================
+#   --- 🌞 GEOMETRI MATAHARI (ZENIT, MALAM, BATAS LANGIT CERAH) ---
+# =====================================================================
+# Posisi matahari dihitung tervektorisasi dari fitur waktu (qc_waktu) dan
+# lintang/bujur stasiun, memakai deret Fourier Spencer (1971) untuk
+# deklinasi, equation of time, dan koreksi jarak bumi-matahari.
+#
+# Suku harian (deklinasi, EoT, jarak) hanya bergantung pada hari, jadi
+# dihitung sekali per hari. Untuk data di grid 10 menit, cos(zenit) disusun
+# sebagai tabel [hari x slot 10 menit] per stasiun (di-cache antar run)
+# lalu diambil per baris dengan indeks, tanpa trigonometri per baris.
+#
+# Batas atas radiasi global mengikuti bentuk "extremely rare limit" BSRN:
+#   batas = FAKTOR * S0 * E0 * mu0 ** PANGKAT + OFFSET     (mu0 = cos zenit >= 0)
+
+KONSTANTA_SURYA = 1361.0       # W/m², S0
+CERAH_FAKTOR = 1.2
+CERAH_PANGKAT = 1.2
+CERAH_OFFSET = 50.0            # W/m², juga batas atas saat malam
+
+# Jumlah tabel stasiun yang disimpan di memori (LRU)
+TABEL_MAKS = 32
+
+SLOT_PER_HARI = DETIK_PER_HARI // (INTERVAL_MENIT * 60)
+
+
+def suku_harian(id_hari):
+    """(deklinasi [rad], equation of time [menit], faktor jarak E0) untuk array id hari sejak epoch."""
+    hari = np.asarray(id_hari, dtype=np.int64).astype('datetime64[D]')
+    hari_ke = (hari - hari.astype('datetime64[Y]')).astype(np.int64)   # 0 = 1 Januari
+    g = 2 * np.pi * hari_ke / 365.0
+    deklinasi = (0.006918 - 0.399912 * np.cos(g) + 0.070257 * np.sin(g)
+                 - 0.006758 * np.cos(2 * g) + 0.000907 * np.sin(2 * g)
+                 - 0.002697 * np.cos(3 * g) + 0.00148 * np.sin(3 * g))
+    eot = 229.18 * (0.000075 + 0.001868 * np.cos(g) - 0.032077 * np.sin(g)
+                    - 0.014615 * np.cos(2 * g) - 0.040849 * np.sin(2 * g))
+    e0 = (1.000110 + 0.034221 * np.cos(g) + 0.001280 * np.sin(g)
+          + 0.000719 * np.cos(2 * g) + 0.000077 * np.sin(2 * g))
+    return deklinasi, eot, e0
+
+
+def _cos_zenit(menit_utc, deklinasi, eot, lintang, bujur):
+    """cos(zenit) dari menit UTC dalam hari + suku harian (semua array yang bisa di-broadcast)."""
+    sudut_jam = np.deg2rad((menit_utc + eot + 4.0 * bujur) / 4.0 - 180.0)
+    phi = np.deg2rad(lintang)
+    return np.sin(phi) * np.sin(deklinasi) + np.cos(phi) * np.cos(deklinasi) * np.cos(sudut_jam)
+
+
+@functools.lru_cache(maxsize=TABEL_MAKS)
+def tabel_stasiun(lintang, bujur, hari_awal, jumlah_hari):
+    """
+    Tabel (cos zenit, E0) per stasiun untuk hari [hari_awal, hari_awal + jumlah_hari):
+    cos zenit berbentuk [hari x SLOT_PER_HARI], E0 per hari. Read-only, di-cache (LRU).
+    """
+    deklinasi, eot, e0 = suku_harian(np.arange(hari_awal, hari_awal + jumlah_hari))
+    menit = np.arange(SLOT_PER_HARI) * float(INTERVAL_MENIT)
+    cos_z = _cos_zenit(menit[None, :], deklinasi[:, None], eot[:, None], lintang, bujur)
+    cos_z.flags.writeable = False
+    e0.flags.writeable = False
+    return cos_z, e0
+
+
+def geometri_matahari(fitur, lintang, bujur, cache=None):
+    """
+    {'cos_zenit', 'e0'} per baris dari fitur_waktu (waktu UTC) dan lokasi stasiun.
+    Disimpan di `cache` (dict cache KonteksQC) per lokasi.
+    """
+    kunci = ('Tanggal', 'surya', float(lintang), float(bujur))
+    if cache is not None and kunci in cache:
+        return cache[kunci]
+    id_hari = fitur['id_hari']
+    detik_hari = fitur['detik_hari']
+    if id_hari.size == 0:
+        hasil = {'cos_zenit': np.empty(0), 'e0': np.empty(0)}
+    elif not np.any(detik_hari % (INTERVAL_MENIT * 60)):
+        # Data di grid: ambil dari tabel [hari x slot]
+        hari_awal = int(id_hari.min())
+        cos_z, e0 = tabel_stasiun(float(lintang), float(bujur), hari_awal, int(id_hari.max()) - hari_awal + 1)
+        baris = id_hari - hari_awal
+        hasil = {'cos_zenit': cos_z[baris, detik_hari // (INTERVAL_MENIT * 60)], 'e0': e0[baris]}
+    else:
+        # Di luar grid: suku harian per hari unik, cos zenit per baris (tetap tervektorisasi)
+        hari_unik, indeks = np.unique(id_hari, return_inverse=True)
+        deklinasi, eot, e0 = suku_harian(hari_unik)
+        hasil = {'cos_zenit': _cos_zenit(detik_hari / 60.0, deklinasi[indeks], eot[indeks], lintang, bujur),
+                 'e0': e0[indeks]}
+    if cache is not None:
+        cache[kunci] = hasil
+    return hasil
+
+
+def batas_langit_cerah(geometri, faktor=None, pangkat=None, offset=None):
+    """
+    Batas atas radiasi global (W/m²) per baris; = `offset` saat matahari di bawah horizon.
+    None = CERAH_FAKTOR / CERAH_PANGKAT / CERAH_OFFSET saat dipanggil (ikut hash cache).
+    """
+    faktor = CERAH_FAKTOR if faktor is None else faktor
+    pangkat = CERAH_PANGKAT if pangkat is None else pangkat
+    offset = CERAH_OFFSET if offset is None else offset
+    mu0 = np.clip(geometri['cos_zenit'], 0.0, None)
+    return faktor * KONSTANTA_SURYA * geometri['e0'] * mu0 ** pangkat + offset
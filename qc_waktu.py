@@ -0,0 +1,118 @@
+import pandas as pd
+import numpy as np
+
+# =====================================================================
+#   --- 🕒 GRID 10 MENIT & FITUR WAKTU BERSAMA ---
+# =====================================================================
+# Semua modul QC menghitung jendela dalam BARIS (mis. FLAT_LINE_WINDOW =
+# jam * 6), jadi jendela hanya benar jika baris berurutan tiap 10 menit.
+#
+# snap_grid() membulatkan 'Tanggal' ke grid 10 menit dan menyisipkan baris
+# kosong (NaN) untuk timestamp yang hilang, sekali saat persiapan data,
+# sehingga jendela baris = jendela waktu meskipun ada data yang hilang.
+#
+# fitur_waktu() menghitung fitur waktu integer (detik & menit dalam hari,
+# id hari, baris pertama tiap hari) sekali per run dan dibagi ke semua
+# modul lewat cache KonteksQC, menggantikan perbandingan objek dt.time
+# dan dt.floor('D').duplicated() per modul.
+
+INTERVAL_MENIT = 10
+DETIK_PER_HARI = 86_400
+
+
+def _detik_lokal(tanggal):
+    """
+    'Tanggal' -> int64 detik sejak epoch pada jam dinding zona waktunya (UTC bila tz UTC).
+    Array datetime64 NumPy dianggap sudah jam dinding (tanpa salin ke Series).
+    """
+    if isinstance(tanggal, np.ndarray) and tanggal.dtype.kind == 'M':
+        return tanggal.astype('datetime64[s]').view('int64')
+    tanggal = pd.Series(tanggal)
+    if getattr(tanggal.dt, 'tz', None) is not None:
+        tanggal = tanggal.dt.tz_localize(None)
+    return tanggal.to_numpy().astype('datetime64[s]').view('int64')
+
+
+def fitur_waktu(tanggal, cache=None, awal_segmen=None):
+    """
+    Fitur waktu untuk satu kolom 'Tanggal' (diasumsikan berurutan):
+    - 'detik_hari'   : detik sejak 00:00 (int32)
+    - 'menit_hari'   : menit sejak 00:00 (int16)
+    - 'id_hari'      : nomor hari sejak epoch (int64)
+    - 'awal_segmen'  : baris pertama tiap runtun independen (bool); default
+                       hanya baris 0, pada frame multi-stasiun awal tiap stasiun
+    - 'first_of_day' : baris pertama tiap hari atau segmen (bool)
+    Disimpan di `cache` (dict cache KonteksQC) agar dihitung sekali per run.
+    """
+    if cache is not None and ('Tanggal', 'fitur') in cache:
+        return cache[('Tanggal', 'fitur')]
+    detik = _detik_lokal(tanggal)
+    id_hari = np.floor_divide(detik, DETIK_PER_HARI)
+    detik_hari = (detik - id_hari * DETIK_PER_HARI).astype(np.int32)
+    first_of_day = np.ones(len(detik), dtype=bool)
+    first_of_day[1:] = id_hari[1:] != id_hari[:-1]
+    if awal_segmen is None:
+        awal_segmen = np.zeros(len(detik), dtype=bool)
+        awal_segmen[:1] = True
+    else:
+        awal_segmen = np.asarray(awal_segmen, dtype=bool)
+        first_of_day |= awal_segmen
+    fitur = {
+        'detik_hari': detik_hari,
+        'menit_hari': (detik_hari // 60).astype(np.int16),
+        'id_hari': id_hari,
+        'awal_segmen': awal_segmen,
+        'first_of_day': first_of_day,
+    }
+    if cache is not None:
+        cache[('Tanggal', 'fitur')] = fitur
+    return fitur
+
+
+def pada_jam(fitur, daftar_jam):
+    """Mask baris tepat pada jam-jam 'HH:MM' tertentu (mis. ['00:00', '00:10'])."""
+    detik = [int(j[:2]) * 3600 + int(j[3:5]) * 60 for j in daftar_jam]
+    return np.isin(fitur['detik_hari'], detik)
+
+
+def snap_grid(df, interval_menit=INTERVAL_MENIT, isi_gap=True, setelah=None):
+    """
+    Membulatkan 'Tanggal' ke grid `interval_menit` dan (jika `isi_gap`)
+    menyisipkan baris NaN untuk timestamp grid yang hilang.
+    `setelah`: timestamp terakhir data sebelumnya (mode chunk); baris
+    <= `setelah` dibuang dan gap sejak `setelah` ikut diisi.
+
+    df harus sudah berurutan 'Tanggal'. Mengembalikan (df, info) dengan info
+    jumlah duplikat dibuang, baris disisipkan, jumlah gap, dan gap terpanjang.
+    """
+    frekuensi = pd.Timedelta(minutes=interval_menit)
+    info = {'duplikat_dibuang': 0, 'baris_disisipkan': 0, 'jumlah_gap': 0, 'gap_terpanjang_menit': 0}
+    df = df.assign(Tanggal=df['Tanggal'].dt.round(frekuensi))
+    if setelah is not None:
+        df = df[df['Tanggal'] > setelah]
+    duplikat = df['Tanggal'].duplicated(keep='first')
+    if duplikat.any():
+        info['duplikat_dibuang'] = int(duplikat.sum())
+        df = df[~duplikat]
+    df = df.reset_index(drop=True)
+    if df.empty:
+        return df, info
+
+    # Gap nyata: selisih antar timestamp > 1 interval (termasuk sejak `setelah`)
+    tanggal = df['Tanggal']
+    selisih = tanggal.diff()
+    if setelah is not None:
+        selisih.iloc[0] = tanggal.iloc[0] - setelah
+    langkah = (selisih / frekuensi).fillna(1).to_numpy()
+    gap = langkah > 1
+    info['jumlah_gap'] = int(gap.sum())
+    if gap.any():
+        info['gap_terpanjang_menit'] = int((langkah[gap].max() - 1) * interval_menit)
+
+    if isi_gap and gap.any():
+        mulai = setelah + frekuensi if setelah is not None else tanggal.iloc[0]
+        grid = pd.date_range(mulai, tanggal.iloc[-1], freq=frekuensi)
+        info['baris_disisipkan'] = len(grid) - len(df)
+        kolom = list(df.columns)
+        df = df.set_index('Tanggal').reindex(grid).rename_axis('Tanggal').reset_index()[kolom]
+    return df, info
@@ -0,0 +1,48 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Modul QC berada langsung di root repo (tanpa paket)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qc_common import FLAG_SUFFIX, BIT_SUFFIX  # noqa: E402
+from qc_registry import atur_bitmask  # noqa: E402
+from qc_sintetis import buat_data_aws  # noqa: E402
+
+
+@pytest.fixture(params=[False, True], ids=['flag', 'bitmask'])
+def bitmask(request):
+    """Menjalankan test dengan dan tanpa kolom bitmask '<kolom>_qcbit'."""
+    atur_bitmask(request.param)
+    yield request.param
+    atur_bitmask(False)
+
+
+@pytest.fixture
+def data_aws():
+    """20 hari data sintetis + logger mati (semua parameter kosong) + lonjakan radiasi
+    + hujan lebat 6 mm saat radiasi penuh (baris 27, 04:30 UTC)."""
+    df = buat_data_aws(144 * 20, seed=4)
+    df.loc[27:143, 'rr'] += 6.0
+    df.loc[1000:1010, ['rr', 'pp_air', 'sr_avg']] = np.nan
+    df.loc[2000:2003, 'sr_avg'] = 1500.0
+    return df
+
+
+def kolom_qc(df):
+    return sorted(c for c in df.columns if c.endswith((FLAG_SUFFIX, BIT_SUFFIX)))
+
+
+def _kode(kolom):
+    """Kode flag/bitmask sebagai float, sel kosong (NaN/<NA>) = 0 (data baik)."""
+    return pd.to_numeric(kolom).astype('float64').fillna(0).to_numpy()
+
+
+def assert_qc_sama(ref, got):
+    """Kolom flag & bitmask `got` identik dengan `ref`."""
+    assert kolom_qc(got) == kolom_qc(ref)
+    for col in kolom_qc(ref):
+        np.testing.assert_array_equal(_kode(got[col]), _kode(ref[col]), err_msg=col)
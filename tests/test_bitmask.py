@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from conftest import assert_qc_sama
+from main import jalankan_semua_qc
+from qc_common import FLAG_BAIK, BIT_DTYPE
+from qc_registry import PARAMETERS, TAHAP, resolusi_flag, atur_bitmask
+from qc_konsistensi import FLAG_KONSISTENSI, BIT_KONSISTENSI
+from qc_spasial import FLAG_BUDDY, BIT_BUDDY
+
+
+def flag_berurutan(bits, checks):
+    """Acuan: check dijalankan berurutan, baris yang sudah ber-flag tidak ditimpa."""
+    flags = np.full(len(bits), FLAG_BAIK, dtype=np.uint8)
+    for i, cfg in enumerate(checks):
+        gagal = (bits >> i) & 1 == 1
+        flags[gagal & (flags == FLAG_BAIK)] = cfg['flag']
+    return flags
+
+
+@pytest.mark.parametrize('nama', sorted(PARAMETERS))
+def test_resolusi_urutan_check(nama):
+    checks = PARAMETERS[nama]['checks']
+    bits = np.arange(1 << len(checks), dtype=BIT_DTYPE)
+    np.testing.assert_array_equal(resolusi_flag(bits, checks), flag_berurutan(bits, checks))
+
+
+def test_resolusi_bit_tahap():
+    assert sorted(TAHAP.values()) == [(BIT_KONSISTENSI, FLAG_KONSISTENSI), (BIT_BUDDY, FLAG_BUDDY)]
+    checks = PARAMETERS['hujan']['checks']
+    bits = np.array([0, 1, BIT_KONSISTENSI, 1 | BIT_KONSISTENSI, BIT_BUDDY, BIT_KONSISTENSI | BIT_BUDDY],
+                    dtype=BIT_DTYPE)
+    harapan = [FLAG_BAIK, checks[0]['flag'], FLAG_KONSISTENSI, FLAG_KONSISTENSI, FLAG_BUDDY, FLAG_BUDDY]
+    np.testing.assert_array_equal(resolusi_flag(bits, checks), harapan)
+
+
+def test_bitmask_sama_dengan_kolom_flag(data_aws):
+    atur_bitmask(False)
+    tanpa = jalankan_semua_qc(data_aws.copy())
+    atur_bitmask(True)
+    try:
+        dengan = jalankan_semua_qc(data_aws.copy())
+    finally:
+        atur_bitmask(False)
+
+    for param in PARAMETERS.values():
+        bits = dengan[param['bit_kolom']].to_numpy()
+        np.testing.assert_array_equal(resolusi_flag(bits, param['checks']),
+                                      dengan[param['flag_kolom']].to_numpy(), err_msg=param['kolom'])
+    # Hujan lebat saat radiasi penuh di data uji -> tahap konsistensi ikut tercatat di bitmask
+    assert (dengan[PARAMETERS['hujan']['flag_kolom']] == FLAG_KONSISTENSI).any()
+    # Kolom flag tidak berubah karena bitmask
+    assert_qc_sama(tanpa, dengan.drop(columns=[p['bit_kolom'] for p in PARAMETERS.values()]))
@@ -0,0 +1,115 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import assert_qc_sama
+from main import jalankan_semua_qc, siapkan_data
+import qc_io
+from qc_io import baca_data, tulis_data, baca_data_per_chunk, PenulisBertahap
+from qc_sqlite import baca_sqlite, daftar_stasiun_sqlite, pisah_path
+
+
+@pytest.fixture
+def hasil_qc(data_aws, bitmask):
+    return jalankan_semua_qc(data_aws.iloc[:144 * 3].copy())
+
+
+def assert_data_sama(ref, got):
+    assert len(got) == len(ref)
+    # Excel tidak menyimpan zona waktu: nilainya tetap UTC
+    pd.testing.assert_series_equal(pd.to_datetime(got['Tanggal'], utc=True).dt.as_unit('s'),
+                                   pd.to_datetime(ref['Tanggal'], utc=True).dt.as_unit('s'), check_index=False)
+    for col in ['rr', 'pp_air', 'sr_avg']:
+        np.testing.assert_allclose(pd.to_numeric(got[col]).to_numpy(dtype='float64'),
+                                   ref[col].to_numpy(dtype='float64'), rtol=0, atol=1e-9, err_msg=col)
+    assert_qc_sama(ref, got)
+
+
+@pytest.mark.parametrize('nama', ['hasil.csv', 'hasil.xlsx', 'hasil.parquet', 'hasil.feather', 'hasil.sqlite#Uji'])
+def test_round_trip(hasil_qc, tmp_path, nama):
+    path = str(tmp_path / nama)
+    asli = hasil_qc.copy()
+    tulis_data(hasil_qc, path)
+    # Penulis tidak mengubah DataFrame pemanggil (mis. tz 'Tanggal' untuk Excel)
+    pd.testing.assert_frame_equal(hasil_qc, asli)
+    assert_data_sama(hasil_qc, baca_data(path))
+
+
+def test_csv_tanggal_non_iso(tmp_path):
+    path = tmp_path / 'lama.csv'
+    path.write_text('Tanggal,rr,pp_air,sr_avg\n01/02/2020 00:10,0.0,1010.1,0.0\n01/02/2020 00:20,0.2,1010.3,0.0\n')
+    df = siapkan_data(baca_data(str(path)))
+    assert df['Tanggal'].tolist() == [pd.Timestamp('2020-01-02 00:10', tz='UTC'),
+                                      pd.Timestamp('2020-01-02 00:20', tz='UTC')]
+
+
+@pytest.mark.parametrize('nama', ['hasil.csv', 'hasil.parquet', 'hasil.feather', 'hasil.sqlite#Uji'])
+def test_round_trip_bertahap(hasil_qc, tmp_path, nama):
+    path = str(tmp_path / nama)
+    with PenulisBertahap(path) as penulis:
+        for a in range(0, len(hasil_qc), 100):
+            penulis.tulis(hasil_qc.iloc[a:a + 100])
+    assert_data_sama(hasil_qc, pd.concat(baca_data_per_chunk(path, 150), ignore_index=True))
+
+
+def test_sqlite_upsert_per_stasiun(hasil_qc, tmp_path):
+    path = str(tmp_path / 'hasil.sqlite')
+    tulis_data(hasil_qc, path + '#A')
+    tulis_data(hasil_qc.iloc[:50], path + '#B')
+    # Upsert: baris dengan (stasiun, Tanggal) sama ditimpa, bukan digandakan
+    koreksi = hasil_qc.iloc[100:110].copy()
+    koreksi['pp_air'] += 1.0
+    tulis_data(koreksi, path + '#A')
+
+    assert daftar_stasiun_sqlite(path) == ['A', 'B']
+    harapan = hasil_qc.copy()
+    harapan.loc[100:109, 'pp_air'] += 1.0
+    assert_data_sama(harapan, baca_data(path + '#A'))
+    assert_data_sama(hasil_qc.iloc[:50], baca_data(path + '#B'))
+
+    mulai, akhir = hasil_qc['Tanggal'].iloc[[20, 39]]
+    rentang = baca_sqlite(path, stasiun='A', mulai=mulai, akhir=akhir)
+    assert_data_sama(harapan.iloc[20:40], rentang)
+
+
+def test_sidecar_excel(hasil_qc, tmp_path):
+    path = str(tmp_path / 'hasil.xlsx')
+    tulis_data(hasil_qc, path)
+    pertama = baca_data(path)
+    assert os.path.exists(qc_io._path_sidecar(path))
+    # Bacaan kedua dari sidecar, identik dengan parse Excel
+    kedua = baca_data(path)
+    pd.testing.assert_frame_equal(kedua, pertama)
+    assert_data_sama(hasil_qc, kedua)
+
+    # Workbook berubah -> sidecar lama tidak dipakai
+    lain = hasil_qc.iloc[:100].copy()
+    tulis_data(lain, path)
+    assert_data_sama(lain, baca_data(path))
+
+
+def test_csv_sel_non_numerik(tmp_path):
+    path = tmp_path / 'kotor.csv'
+    path.write_text('Tanggal,rr,pp_air,sr_avg\n'
+                    '2020-01-01T00:00:00+00:00,0.0,1010.1,0.0\n'
+                    '2020-01-01T00:10:00+00:00,-,x,12.5\n')
+    df = baca_data(str(path))
+    assert df[['rr', 'pp_air', 'sr_avg']].dtypes.eq('float64').all()
+    assert df['rr'].isna().tolist() == [False, True]
+    assert df['pp_air'].isna().tolist() == [False, True]
+    assert df['sr_avg'].tolist() == [0.0, 12.5]
+
+
+@pytest.mark.parametrize('path, harapan', [
+    ('hasil.sqlite#Tangsel', ('hasil.sqlite', 'Tangsel')),
+    ('arsip/HASIL.DB#Tangsel', ('arsip/HASIL.DB', 'Tangsel')),
+    ('hasil.sqlite3#', ('hasil.sqlite3', None)),
+    ('hasil.sqlite#stasiun#2', ('hasil.sqlite', 'stasiun#2')),
+    ('hasil.sqlite', ('hasil.sqlite', None)),
+    ('data#2/Tangsel.csv', ('data#2/Tangsel.csv', None)),
+    ('run#1.xlsx', ('run#1.xlsx', None)),
+])
+def test_pisah_path(path, harapan):
+    assert pisah_path(path) == harapan
@@ -0,0 +1,145 @@
+import os
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import assert_qc_sama
+from main import jalankan_semua_qc
+from qc_cache import CacheQC, jalankan_qc_dengan_cache, hash_konfigurasi
+from qc_chunk import run_qc_per_chunk
+from qc_inkremental import StatusStasiun, qc_inkremental
+from qc_paralel import jalankan_modul_paralel
+from qc_patch import patch_qc
+import qc_hujan
+import qc_radiasi
+import qc_surya
+from qc_ambang import TabelAmbang, atur_ambang
+
+# Setiap jalur QC harus menghasilkan flag (dan bitmask) yang identik dengan satu kali
+# proses penuh jalankan_semua_qc atas data yang sama.
+
+
+class Penampung:
+    """Penulis bertahap yang menampung chunk di memori."""
+
+    def __init__(self):
+        self.bagian = []
+
+    def tulis(self, df):
+        self.bagian.append(df)
+
+
+@pytest.fixture
+def penuh(data_aws, bitmask):
+    return jalankan_semua_qc(data_aws.copy())
+
+
+@pytest.mark.parametrize('ukuran', [37, 500])
+def test_inkremental(data_aws, penuh, ukuran):
+    status = StatusStasiun('uji')
+    bagian = [qc_inkremental(status, data_aws.iloc[a:a + ukuran]) for a in range(0, len(data_aws), ukuran)]
+    # Baris revisi dari batch berikutnya menggantikan hasil sebelumnya
+    hasil = pd.concat(bagian)
+    hasil = hasil[~hasil.index.duplicated(keep='last')].sort_index()
+    assert hasil.index.tolist() == list(range(len(data_aws)))
+    assert_qc_sama(penuh, hasil)
+
+
+def test_inkremental_tolak_data_lama(data_aws):
+    status = StatusStasiun('uji')
+    qc_inkremental(status, data_aws.iloc[:300])
+    with pytest.raises(ValueError):
+        qc_inkremental(status, data_aws.iloc[200:400])
+
+
+@pytest.mark.parametrize('ukuran', [97, 700, 5000])
+def test_chunk(data_aws, penuh, ukuran):
+    penulis = Penampung()
+    chunks = (data_aws.iloc[a:a + ukuran].copy() for a in range(0, len(data_aws), ukuran))
+    assert run_qc_per_chunk(chunks, penulis) == len(data_aws)
+    assert_qc_sama(penuh, pd.concat(penulis.bagian, ignore_index=True))
+
+
+def test_cache(data_aws, penuh, tmp_path):
+    cache = CacheQC(str(tmp_path))
+    assert_qc_sama(penuh, jalankan_qc_dengan_cache(data_aws.copy(), 'uji', cache))
+    assert_qc_sama(penuh, jalankan_qc_dengan_cache(data_aws.copy(), 'uji', cache))
+
+    # Satu hari berubah: hanya hari itu (dan tetangganya) di-QC ulang
+    ubah = data_aws.copy()
+    ubah.loc[1500, 'pp_air'] += 20.0
+    assert_qc_sama(jalankan_semua_qc(ubah.copy()), jalankan_qc_dengan_cache(ubah, 'uji', cache))
+
+
+def test_cache_batas_ukuran(data_aws, tmp_path):
+    kecil = data_aws.iloc[:144 * 2]
+    cache = CacheQC(str(tmp_path))
+    jalankan_qc_dengan_cache(kecil.copy(), 'A', cache)
+    # Batas cukup untuk dua file stasiun kecil
+    cache.maks_byte = int(2.5 * os.path.getsize(tmp_path / 'A.npz'))
+    for stasiun in ['B', 'C']:
+        jalankan_qc_dengan_cache(kecil.copy(), stasiun, cache)
+    # Lebih dari batas -> stasiun lain yang paling lama tidak dipakai dihapus, bukan yang baru ditulis
+    assert sorted(os.listdir(tmp_path)) == ['B.npz', 'C.npz']
+
+    # Satu stasiun yang sendirian melebihi batas tidak di-cache dan tidak mengusir yang lain
+    hasil = jalankan_qc_dengan_cache(data_aws.copy(), 'BESAR', cache)
+    assert_qc_sama(jalankan_semua_qc(data_aws.copy()), hasil)
+    assert sorted(os.listdir(tmp_path)) == ['B.npz', 'C.npz']
+
+
+
+@pytest.mark.parametrize('modul, nama, nilai', [
+    (qc_surya, 'CERAH_FAKTOR', 1.1),
+    (qc_surya, 'CERAH_PANGKAT', 1.3),
+    (qc_surya, 'CERAH_OFFSET', 0.0),
+    (qc_radiasi, 'ELEVASI_MALAM', -2.0),
+    (qc_hujan, 'HARDCODED_RESET_TIMES', []),
+])
+def test_cache_hash_pengaturan(data_aws, tmp_path, monkeypatch, modul, nama, nilai):
+    # Pengaturan yang mengubah flag juga mengubah kunci cache: entri lama tidak terpakai
+    cache = CacheQC(str(tmp_path))
+    jalankan_qc_dengan_cache(data_aws.copy(), 'uji', cache)
+    lama = hash_konfigurasi()
+    monkeypatch.setattr(modul, nama, nilai)
+    assert hash_konfigurasi() != lama
+    assert_qc_sama(jalankan_semua_qc(data_aws.copy()), jalankan_qc_dengan_cache(data_aws.copy(), 'uji', cache))
+
+
+def test_patch(data_aws, penuh):
+    hilang = np.zeros(len(data_aws), dtype=bool)
+    hilang[990:1020] = True
+    lama = jalankan_semua_qc(data_aws[~hilang].reset_index(drop=True))
+    hasil, _ = patch_qc(lama, data_aws[hilang])
+    assert_qc_sama(penuh, hasil)
+
+    # Koreksi nilai lama: hasil sama dengan QC penuh atas data terkoreksi
+    koreksi = data_aws.iloc[[1500]].copy()
+    koreksi['pp_air'] += 20.0
+    ubah = data_aws.copy()
+    ubah.loc[1500, 'pp_air'] += 20.0
+    hasil, _ = patch_qc(penuh, koreksi)
+    assert_qc_sama(jalankan_semua_qc(ubah), hasil)
+
+
+@pytest.mark.parametrize('mode', ['thread', 'process'])
+def test_paralel(data_aws, penuh, mode):
+    assert_qc_sama(penuh, jalankan_modul_paralel(data_aws.copy(), mode))
+
+
+@pytest.mark.parametrize('metode', ['fork', 'spawn'])
+def test_paralel_pengaturan_run(data_aws, bitmask, metode):
+    # Lokasi & tabel ambang non-default harus sampai ke worker, apa pun start method-nya
+    tabel = TabelAmbang(pd.DataFrame({'stasiun': ['uji'], 'bulan': [None], 'parameter': ['tekanan'],
+                                      'check': ['range'], 'kunci': ['min'], 'nilai': [1009.0]}))
+    qc_radiasi.atur_lokasi(40.0, -100.0)
+    atur_ambang(tabel, 'uji')
+    try:
+        harapan = jalankan_semua_qc(data_aws.copy())
+        hasil = jalankan_modul_paralel(data_aws.copy(), 'process', multiprocessing.get_context(metode))
+    finally:
+        qc_radiasi.atur_lokasi()
+        atur_ambang()
+    assert_qc_sama(harapan, hasil)
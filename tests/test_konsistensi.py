@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from main import jalankan_semua_qc
+from qc_konsistensi import FLAG_KONSISTENSI, atur_konsistensi
+from qc_metrik import kumpulkan_metrik, hitung_flag
+from qc_paralel import jalankan_modul_paralel
+from qc_registry import PARAMETERS
+
+
+@pytest.fixture
+def tanpa_tahap(data_aws):
+    atur_konsistensi(False)
+    try:
+        return jalankan_semua_qc(data_aws.copy())
+    finally:
+        atur_konsistensi()
+
+
+def test_logger_mati_tetap_flag_hilang(data_aws, tanpa_tahap):
+    with kumpulkan_metrik('uji') as metrik:
+        hasil = jalankan_semua_qc(data_aws.copy())
+    for param in PARAMETERS.values():
+        kolom = param['flag_kolom']
+        # Data hilang serentak (baris 1000-1010) tetap Flag 9; hanya kombinasi tidak fisis jadi Flag 7
+        assert (hasil.loc[1000:1010, kolom] == 9).all(), kolom
+        beda = hasil[kolom].to_numpy() != tanpa_tahap[kolom].to_numpy()
+        assert (hasil[kolom].to_numpy()[beda] == FLAG_KONSISTENSI).all(), kolom
+    assert np.flatnonzero(hasil['rr_flagging'] == FLAG_KONSISTENSI).tolist() == [27]
+
+    catatan = next(c for c in metrik.catatan if c['nama'] == 'konsistensi')
+    assert catatan['hilang_serentak'] == 11
+    assert catatan['logger_mati'] == [[data_aws['Tanggal'][1000].isoformat(), data_aws['Tanggal'][1010].isoformat()]]
+
+
+def test_tahap_bisa_dimatikan(tanpa_tahap):
+    for param in PARAMETERS.values():
+        assert not (tanpa_tahap[param['flag_kolom']] == FLAG_KONSISTENSI).any()
+
+
+@pytest.mark.parametrize('mode', [None, 'thread', 'process'])
+def test_ringkasan_setelah_tahap(data_aws, capsys, mode):
+    with kumpulkan_metrik('uji') as metrik:
+        hasil = jalankan_modul_paralel(data_aws.copy(), mode) if mode else jalankan_semua_qc(data_aws.copy())
+    # Jumlah flag per modul di laporan = flag akhir, termasuk Flag 7
+    modul = {c['nama']: c for c in metrik.catatan if c['kategori'] == 'modul'}
+    assert modul['run_qc_hujan']['jumlah_flag'] == hitung_flag(hasil['rr_flagging'].to_numpy())
+    assert modul['run_qc_hujan']['jumlah_flag'][FLAG_KONSISTENSI] == 1
+    # Ringkasan dicetak setelah tahap konsistensi dan ikut menampilkan Flag 7
+    keluaran = capsys.readouterr().out
+    assert keluaran.index('Konsistensi antar parameter') < keluaran.index("Ringkasan QC untuk 'rr_flagging'")
+    assert 'Tidak Konsisten' in keluaran.split("Ringkasan QC untuk 'rr_flagging'")[1]
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import qc_rekap
+from main import jalankan_semua_qc
+from qc_chunk import run_qc_per_chunk
+from qc_rekap import RekapQC, PenulisRekap, rekap_harian
+
+
+@pytest.fixture
+def penuh(data_aws):
+    return jalankan_semua_qc(data_aws.copy())
+
+
+@pytest.mark.parametrize('ukuran, batch_hari', [(97, 1), (500, 3), (1000, 366)])
+def test_rekap_chunk_sama_dengan_penuh(data_aws, penuh, tmp_path, monkeypatch, ukuran, batch_hari):
+    monkeypatch.setattr(qc_rekap, 'REKAP_BATCH_HARI', batch_hari)
+    rekap = RekapQC(str(tmp_path))
+    simpan = []
+    perbarui = rekap.perbarui
+    monkeypatch.setattr(rekap, 'perbarui', lambda r: simpan.append(len(r)) or perbarui(r))
+
+    penulis = PenulisRekap(rekap, 'uji')
+    run_qc_per_chunk((data_aws.iloc[a:a + ukuran].copy() for a in range(0, len(data_aws), ukuran)), penulis)
+    penulis.tutup()
+
+    harapan = rekap_harian(penuh, 'uji')
+    hasil = rekap.baca('uji')
+    pd.testing.assert_frame_equal(hasil.drop(columns='hujan_mm'), harapan.drop(columns='hujan_mm'))
+    np.testing.assert_allclose(hasil['hujan_mm'], harapan['hujan_mm'], rtol=0, atol=1e-9)
+    # Hari yang sudah lengkap disimpan per batch, tidak per chunk
+    assert len(simpan) <= -(-20 // batch_hari) + 1